@@ -0,0 +1,328 @@
+"""
+A benchmark suite for the main stages of the assistant
+
+Each size tier writes a seeded, synthetic data set (a roster of thousands of dinos, a recipe DAG several tiers deep in which
+popular dinos are shared by many hybrids, and years of AmountHistory.txt entries) into a temporary directory, then times
+each stage on it. Results are saved as JSON and can be compared against a baseline from an earlier run on the same machine,
+so regressions can be caught:
+
+    python Benchmarks.py --output results.json
+    python Benchmarks.py --baseline results.json --tolerance 0.25
+
+Timings are only compared when --baseline is given, since they depend on the machine. Every run checks the startup import
+time against IMPORT_BUDGET.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import LevelCosts
+
+RARITIES = "CRELUA"
+
+# The number of dinos and days of history in each size tier
+SIZE_TIERS = {
+    "small": {"dinos": 500, "days": 365},
+    "medium": {"dinos": 2000, "days": 2*365},
+    "large": {"dinos": 5000, "days": 4*365},
+}
+
+# The modules imported on startup (main.py itself, and the modules it and DNAAnalytics.py import),
+# and how long importing them and building main.py's argument parser may take
+STARTUP_MODULES = ("main", "FileFunctions", "GettingInfo", "UnlockingInfo", "UpdatingInfo", "DNAAnalytics")
+IMPORT_BUDGET = 0.5
+# Stages must also get at least this much slower to count as a regression, so timer noise on very fast stages is ignored
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def generate_dataset(directory: str, dino_count: int, day_count: int, seed: int = 0, hybrid_tiers: int = 5) -> None:
+    """
+    Writes CurrentDinos.txt, DinoRecipes.txt, DinosToGet.txt and AmountHistory.txt for a synthetic roster
+
+    About a third of the dinos are roots, and the rest are split into hybrid tiers. Each hybrid's parents are picked from
+    the earlier tiers, favoring a small set of popular dinos so that ancestors are shared heavily, like in the real game.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to write the files to
+    dino_count : int
+        The number of dinos in the roster
+    day_count : int
+        The number of days in the history
+    seed : int
+        The seed for the random generator, so the same arguments always give the same data
+    hybrid_tiers : int
+        The number of hybrid tiers above the roots
+    """
+    rng = random.Random(seed)
+    root_count = max(2, dino_count//3)
+    tier_size = max(1, (dino_count-root_count)//hybrid_tiers)
+
+    names = []
+    ranks = {}
+    levels = {}
+    amounts = {}
+    recipes = {}
+    for index in range(dino_count):
+        name = "Dino" + str(index).zfill(5)
+        if index < root_count:
+            rank = rng.choice((0, 0, 1, 1, 2, 3))
+        else:
+            # Popular dinos are picked from the start of the candidate list far more often
+            tier_end = root_count + ((index-root_count)//tier_size)*tier_size
+            candidates = [candidate for candidate in names[:tier_end] if ranks[candidate] < 5]
+            first = candidates[int(len(candidates)*rng.random()**3)]
+            second = first
+            while second == first:
+                second = candidates[int(len(candidates)*rng.random()**3)]
+            recipes[name] = (first, second)
+            rank = min(5, max(ranks[first], ranks[second]) + rng.choice((0, 1, 1)))
+
+        names.append(name)
+        ranks[name] = rank
+        activation_level = 5*rank
+        if index < root_count or rng.random() < 0.6:
+            levels[name] = min(LevelCosts.MAX_LEVEL-5, activation_level + rng.randint(1, 10))
+        else:
+            levels[name] = activation_level
+        amounts[name] = rng.randint(0, 4*LevelCosts.DNA_for_one_lvl(rank, levels[name]))
+
+    needed = [name for name in names if name in recipes and levels[name] == 5*ranks[name]]
+    roots = [name for name in names if name not in recipes]
+
+    with open(os.path.join(directory, "CurrentDinos.txt"), "w") as writer:
+        writer.write('\n'.join(name + ' ' + str(levels[name]) + ' ' + str(amounts[name]) + ' ' + RARITIES[ranks[name]] for name in names))
+    with open(os.path.join(directory, "DinoRecipes.txt"), "w") as writer:
+        writer.write('\n'.join(name + ': ' + first + ' ' + second for name, (first, second) in recipes.items()))
+    with open(os.path.join(directory, "DinosToGet.txt"), "w") as writer:
+        writer.write('\n'.join(needed))
+
+    # Each day records the roots whose needed amounts changed, and a few roots are archived along the way
+    history = {name: rng.randint(1000, 100000) for name in roots}
+    archived = set()
+    start_date = datetime.date(2020, 1, 1)
+    days = []
+    for day in range(day_count):
+        lines = [(start_date + datetime.timedelta(days=day)).strftime("%m/%d/%Y")]
+        for name in rng.sample(roots, max(1, len(roots)//10)):
+            history[name] = max(0, history[name] - rng.randint(0, 500))
+            lines.append(("# " if name in archived else "") + name + ": " + str(history[name]))
+        if rng.random() < 0.01:
+            archived.add(rng.choice(roots))
+        days.append('\n'.join(lines))
+    with open(os.path.join(directory, "AmountHistory.txt"), "w") as writer:
+        writer.write('\n\n'.join(days))
+
+
+def time_stage(stage, repeat: int) -> float:
+    """
+    Returns the fastest of several runs of a stage, in seconds
+
+    Parameters
+    ----------
+    stage : callable
+        A function that sets up and runs the stage, returning the time the stage itself took
+    repeat : int
+        The number of runs
+
+    Returns
+    -------
+    float
+        The fastest time
+    """
+    return min(stage() for _ in range(repeat))
+
+
+def time_import() -> float:
+    """
+    Returns how long a fresh interpreter takes to import the startup modules and build main.py's argument parser
+    Building the parser also checks that main.py's command line arguments don't conflict
+
+    Returns
+    -------
+    float
+        The import time in seconds
+    """
+    code = "import time; start = time.perf_counter(); import " + ", ".join(STARTUP_MODULES) + "; main.build_parser(); print(time.perf_counter() - start)"
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-c", code], cwd=package_directory, capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+def run_tier(tier: str, repeat: int = 3, seed: int = 0) -> dict[str : float]:
+    """
+    Generates the data set for a size tier in a temporary directory and times each stage on it
+
+    Parameters
+    ----------
+    tier : str
+        The name of the size tier (see SIZE_TIERS)
+    repeat : int
+        The number of runs of each stage (the fastest is kept)
+    seed : int
+        The seed for the data set
+
+    Returns
+    -------
+    dict[str : float]
+        A mapping of stage names to their times in seconds
+    """
+    import FileFunctions
+    import HistorySnapshot
+    from DNAAnalytics import DNAAnalytics
+    from HistoryPlotting import HistoryPlotting
+    from UnlockingInfo import UnlockingInfo
+
+    results = {}
+    original_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        generate_dataset(directory, SIZE_TIERS[tier]["dinos"], SIZE_TIERS[tier]["days"], seed)
+        os.chdir(directory)
+        try:
+            def create_dino_info():
+                start = time.perf_counter()
+                FileFunctions.create_dino_info()
+                return time.perf_counter() - start
+            results["create_dino_info"] = time_stage(create_dino_info, repeat)
+
+            current_dinos, needed_dinos = FileFunctions.create_dino_info()
+            for engine in ("recursive", "wavefront"):
+                def analytics_init():
+                    start = time.perf_counter()
+                    DNAAnalytics(current_dinos, set(needed_dinos), engine)
+                    return time.perf_counter() - start
+                results["DNAAnalytics.__init__[" + engine + "]"] = time_stage(analytics_init, repeat)
+
+            analytics = DNAAnalytics(current_dinos, set(needed_dinos))
+            def print_limiting_factors():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    analytics.print_limiting_factors()
+                    return time.perf_counter() - start
+            results["print_limiting_factors"] = time_stage(print_limiting_factors, repeat)
+
+            def clear_dinos():
+                roster, needed = FileFunctions.create_dino_info()
+                unlocked = set(sorted(needed)[::10])
+                if os.path.exists(HistorySnapshot.get_archive_file(HistorySnapshot.HISTORY_FILE)):
+                    os.remove(HistorySnapshot.get_archive_file(HistorySnapshot.HISTORY_FILE))
+                start = time.perf_counter()
+                UnlockingInfo(roster, needed, unlocked)
+                return time.perf_counter() - start
+            results["UnlockingInfo.clear_dinos"] = time_stage(clear_dinos, repeat)
+
+            def build_snapshot():
+                start = time.perf_counter()
+                HistorySnapshot.build_snapshot()
+                return time.perf_counter() - start
+            results["HistorySnapshot.build_snapshot"] = time_stage(build_snapshot, repeat)
+
+            def parse_amount_input(cold: bool):
+                def stage():
+                    if cold:
+                        shutil.rmtree(HistorySnapshot.get_snapshot_dir(), ignore_errors=True)
+                    start = time.perf_counter()
+                    HistoryPlotting().parse_amount_input()
+                    return time.perf_counter() - start
+                return stage
+            results["parse_amount_input[cold]"] = time_stage(parse_amount_input(True), repeat)
+            results["parse_amount_input[warm]"] = time_stage(parse_amount_input(False), repeat)
+        finally:
+            os.chdir(original_directory)
+    return results
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compares benchmark results against a baseline and describes every stage that got slower than the tolerance allows
+
+    Parameters
+    ----------
+    results : dict
+        The new results, as returned by run_benchmarks()
+    baseline : dict
+        The baseline results, in the same format
+    tolerance : float
+        How much slower a stage may get before it counts as a regression (0.25 = 25% slower)
+
+    Returns
+    -------
+    list[str]
+        A description of each regression (empty if there were none)
+    """
+    regressions = []
+    for tier, stages in results["tiers"].items():
+        for stage, seconds in stages.items():
+            baseline_seconds = baseline.get("tiers", {}).get(tier, {}).get(stage)
+            if baseline_seconds is not None and seconds > max(baseline_seconds*(1+tolerance), baseline_seconds + MIN_REGRESSION_SECONDS):
+                regressions.append(tier + " " + stage + ": " + format(seconds, ".4f") + "s (baseline " + format(baseline_seconds, ".4f") + "s)")
+    baseline_import = baseline.get("import")
+    if baseline_import is not None and results["import"] > max(baseline_import*(1+tolerance), baseline_import + MIN_REGRESSION_SECONDS):
+        regressions.append("import: " + format(results["import"], ".4f") + "s (baseline " + format(baseline_import, ".4f") + "s)")
+    return regressions
+
+
+def run_benchmarks(tiers: list[str], repeat: int = 3, seed: int = 0) -> dict:
+    """
+    Runs the benchmarks for each of the given size tiers, along with the startup import time
+
+    Parameters
+    ----------
+    tiers : list[str]
+        The names of the size tiers to run (see SIZE_TIERS)
+    repeat : int
+        The number of runs of each stage (the fastest is kept)
+    seed : int
+        The seed for the data sets
+
+    Returns
+    -------
+    dict
+        The import time, and a mapping of each tier to its stage times, in seconds
+    """
+    results = {"seed": seed, "import": time_stage(time_import, repeat), "tiers": {}}
+    for tier in tiers:
+        results["tiers"][tier] = run_tier(tier, repeat, seed)
+    return results
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Time each stage of the assistant on synthetic data sets")
+    parser.add_argument("--tiers", nargs="+", choices=list(SIZE_TIERS), default=list(SIZE_TIERS), help="the size tiers to run")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of runs of each stage (the fastest is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed for the synthetic data")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results against this JSON file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="how much slower a stage may get before it counts as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.tiers, args.repeat, args.seed)
+    print("import: " + format(results["import"], ".4f") + "s")
+    for tier, stages in results["tiers"].items():
+        print(tier + ":")
+        for stage, seconds in stages.items():
+            print("    " + stage + ": " + format(seconds, ".4f") + "s")
+
+    if args.output:
+        with open(args.output, "w") as writer:
+            json.dump(results, writer, indent=4)
+
+    regressions = []
+    if results["import"] > IMPORT_BUDGET:
+        regressions.append("import: " + format(results["import"], ".4f") + "s (budget " + format(IMPORT_BUDGET, ".4f") + "s)")
+    if args.baseline:
+        with open(args.baseline) as reader:
+            regressions += compare_results(results, json.load(reader), args.tolerance)
+    for regression in regressions:
+        print("Regression: " + regression)
+    sys.exit(1 if regressions else 0)
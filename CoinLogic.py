@@ -1,263 +1,556 @@
 from Dino import Dino
+from DinoRoster import DinoRoster
+import FileFunctions
+import LevelCosts
+import Stats
 import math
-DNA_PER_FUSE = 20
-
-def checkIfLvlingEligible(dino, child):
-    if dinos[dino].getLvl() > dinos[dino].activationLvl():
-        if dinos[child].activationLvl() > dinos[dino].getLvl():
-            return [dino]
-    else:
-        if dino in recipes:
-            p1, p2 = recipes[dino]
-            return checkIfLvlingEligible(p1, dino) + checkIfLvlingEligible(p2, dino)
-    return []
-
-def getChild(anc, neededDino):
-    if neededDino in recipes:
-        p1, p2 = recipes[neededDino]
-        if (p1 == anc) or (p2 == anc):
-            return neededDino
-        return getChild(anc, p1) + getChild(anc, p2)
-    return ''
-
-def getDNAandCost(dino):
-    if dino in recipes:
-        p1, p2 = recipes[dino]
-        p1DNA, p1Cost = getDNAandCost(p1)
-        p1Fuses = math.floor(p1DNA/DNAforEachFuse(dinos[p1], dinos[dino]))
-        p2DNA, p2Cost = getDNAandCost(p2)
-        p2Fuses = math.floor(p2DNA/DNAforEachFuse(dinos[p2], dinos[dino]))
-        rR = dinos[dino].rarityRank()
-        costPerFuse = 10*(2 if rR%2 else 1)*10**int(rR/2)
-        minFuses = min(p1Fuses, p2Fuses)
-        totalFuseCost = minFuses*costPerFuse
-        return DNA_PER_FUSE*minFuses+dinos[dino].getDNA(), p1Cost+p2Cost+totalFuseCost
-    return dinos[dino].getDNA(), 0
-
-def DNAforEachFuse(dinosaur, childDino):
-    diff = childDino.rarityRank() - dinosaur.rarityRank()
-    return 10*(5 if diff%2 else 2)*10**int(diff/2)
-    
-def neededForFusing(dinosaur, childDino, neededChildDNA):
-    neededFuses = math.ceil(neededChildDNA/DNA_PER_FUSE)
-    return neededFuses*DNAforEachFuse(dinosaur, childDino)
-
-
-def getCost(dino, child):
-    enoughForFusing = False
-    allTheWay = False
-    addedCost = 0
-    dinosaur = dinos[dino]
-    childDino = dinos[child]
-    DNAleft, addedCost = getDNAandCost(dino)
-    currentLvl = dinosaur.getLvl()
-    while DNAleft >= dinosaur.DNAforLvl(currentLvl+1):
-        currentLvl += 1
-        DNAleft -= dinosaur.DNAforLvl(currentLvl)
-        addedCost += levelingCost[currentLvl]
-        if currentLvl == childDino.activationLvl():
-            enoughForFusing = True
-            break
-    
-    if enoughForFusing:
-        allTheWay = DNAleft >= neededForFusing(dinosaur, childDino, childDino.activationDNA() - childDino.getDNA())
-    
-    priority = (not allTheWay) + (not enoughForFusing) + 1
-    return priority, addedCost, dino
-
-
-def getNeededAmounts(dino, neededAmount, amountForH):
-    tag = 'blue'
-    dinosaur = dinos[dino]
-    readyToLvl = True
-    if dino in recipes:
-        p1, p2 = recipes[dino]
-        p1Dino = dinos[p1]
-        p2Dino = dinos[p2]
-        p1DNA = neededForFusing(p1Dino, dinosaur, neededAmount)
-        p2DNA = neededForFusing(p2Dino, dinosaur, neededAmount)
-        if p1Dino.getLvl() < dinosaur.activationLvl():
-            readyToLvl = False
-            temp = p1Dino.getLvl()
-            while temp < dinosaur.activationLvl():
-                temp += 1
-                p1DNA += p1Dino.DNAforLvl(temp)
-
-        if p2Dino.getLvl() < dinosaur.activationLvl():
-            readyToLvl = False
-            temp = p2Dino.getLvl()
-            while temp < dinosaur.activationLvl():
-                temp += 1
-                p2DNA += p2Dino.DNAforLvl(temp)
-            
-    totalDNA = (getDNAandCost(dino)[0] if readyToLvl else dinosaur.getDNA())
-    if totalDNA < neededAmount:
-        if amountForH != 0:
-            if totalDNA < amountForH:
+
+DNA_PER_FUSE = LevelCosts.DNA_PER_FUSE
+
+# The coins needed to reach each level from the level below it
+LEVELING_COST = {2: 5, 3: 10, 4: 25, 5: 50, 6: 100, 7: 200, 8: 400, 9: 600, 10: 800,
+                 11: 1000, 12: 2000, 13: 4000, 14: 6000, 15: 8000, 16: 10000, 17: 15000, 18: 20000, 19: 30000, 20: 40000,
+                 21: 50000, 22: 60000, 23: 70000, 24: 80000, 25: 100000}
+
+# The highest level with a known coin cost; the levels above it, up to LevelCosts.MAX_LEVEL, are left out of coin totals
+# and reported instead (see has_unknown_coin_cost())
+MAX_COIN_LEVEL = max(LEVELING_COST)
+
+# The coins needed to get from level 1 to each level, so the cost between any two levels is a single subtraction
+LEVELING_COST_PREFIX_SUMS = [0, 0]
+for coin_level in range(2, max(LEVELING_COST)+1):
+    LEVELING_COST_PREFIX_SUMS.append(LEVELING_COST_PREFIX_SUMS[-1] + LEVELING_COST[coin_level])
+
+
+def coins_between_levels(dino: Dino, start_level: int, final_level: int) -> int:
+    """
+    Returns the coins needed to level a dinosaur from one level to another
+    Unlocking a dinosaur (going from its activation level to the level above) is free, and levels above MAX_COIN_LEVEL
+    are left out since their coin cost isn't known
+
+    Parameters
+    ----------
+    dino : Dino
+        The dinosaur being leveled
+    start_level : int
+        The level the dinosaur is currently at
+    final_level : int
+        The level the dinosaur needs to get to
+
+    Returns
+    -------
+    int
+        The coins needed to reach the final level (0 if it has already been reached)
+
+    Raises
+    ------
+    ValueError
+        If the final level is above LevelCosts.MAX_LEVEL
+    """
+    if start_level >= final_level:
+        return 0
+    unlock_level = dino.activation_level()+1
+    if start_level < unlock_level <= final_level:
+        return coins_between_levels(dino, start_level, unlock_level-1) + coins_between_levels(dino, unlock_level, final_level)
+    if final_level > LevelCosts.MAX_LEVEL:
+        raise ValueError("Level " + str(final_level) + " is above the level cap of " + str(LevelCosts.MAX_LEVEL))
+    return LEVELING_COST_PREFIX_SUMS[min(final_level, MAX_COIN_LEVEL)] - LEVELING_COST_PREFIX_SUMS[min(max(start_level, 1), MAX_COIN_LEVEL)]
+
+
+def has_unknown_coin_cost(dino: Dino, start_level: int, final_level: int) -> bool:
+    """
+    Returns whether leveling a dinosaur from one level to another goes through a level above MAX_COIN_LEVEL that isn't free,
+    i.e. whether coins_between_levels() left some of the cost out
+
+    Parameters
+    ----------
+    dino : Dino
+        The dinosaur being leveled
+    start_level : int
+        The level the dinosaur is currently at
+    final_level : int
+        The level the dinosaur needs to get to
+
+    Returns
+    -------
+    bool
+        Whether the coins for some of the levels are unknown
+    """
+    unlock_level = dino.activation_level()+1
+    return any(level != unlock_level for level in range(max(start_level, MAX_COIN_LEVEL)+1, final_level+1))
+
+
+def coins_per_fuse(dino: Dino) -> int:
+    """
+    Returns the coins needed for a single fuse of a hybrid
+
+    Parameters
+    ----------
+    dino : Dino
+        The hybrid being fused
+
+    Returns
+    -------
+    int
+        The coins needed for one fuse
+    """
+    rank = dino.rarity_rank()
+    return 10*(2 if rank%2 else 1)*10**int(rank/2)
+
+
+class CoinLogic:
+    """
+    A class in charge of working out the coins needed to level and fuse the dinosaurs in the needed dinosaurs' trees
+    Calculations are memoized by everything they depend on, so shared ancestors are only worked out again when they are
+    asked for a different amount
+    ...
+
+    Attributes
+    ----------
+    current_dinos : DinoRoster
+        A current collection of dinosaur names mapped to their corresponding Dino objects, indexed by parent
+    needed_dinos : set[str]
+        A set of names of dinosaurs that need to be unlocked
+    DNA_and_cost : dict[str : tuple[int, int]]
+        A memo of get_DNA_and_cost() for each dinosaur
+    unlock_plans : dict[tuple[str, int] : tuple[int, int, list[tuple[str, int, int]]]]
+        A memo of get_unlock_plan() for each dinosaur and level
+    unlock_costs : dict[tuple[str, int, int] : int]
+        A memo of get_unlock_cost() for each dinosaur, level, and number of fuses needed
+    needed_amounts : dict[tuple[str, int, int] : list[tuple[str, str]]]
+        A memo of get_needed_amounts() for each dinosaur and pair of amounts
+    eligible_dinos : dict[tuple[str, str] : list[str]]
+        A memo of check_if_leveling_eligible() for each dinosaur and target
+    consumers : dict[tuple[str, str] : tuple[list[str], int]]
+        An index of the hybrids that use each ancestor in a target's tree, and the ancestor's fuse level (see DinoRoster.build_consumer_index())
+    indexed_targets : set[str]
+        The targets whose trees are in the consumer index
+    unknown_cost_dinos : set[str]
+        The dinosaurs whose coins left out levels above MAX_COIN_LEVEL (see has_unknown_coin_cost())
+
+    Methods
+    -------
+    check_if_leveling_eligible()
+        Returns the dinosaurs in a tree that are unlocked but not yet at the level needed for fusing
+    get_child()
+        Returns the hybrids in a target's tree that are fused from a given ancestor
+    get_fuse_level()
+        Returns the level an ancestor needs to reach to fuse the hybrids in a target's tree that use it
+    get_DNA_and_cost()
+        Returns the DNA a dinosaur could have by fusing everything possible, and the coins that would take
+    get_cost()
+        Returns how much progress leveling a dinosaur makes towards fusing its child, and the coins needed
+    get_needed_amounts()
+        Returns the root dinosaurs a dinosaur still needs DNA from, tagged by how urgently they're needed
+    get_unlock_plan()
+        Returns the level up coins, leftover DNA, and parents of a dinosaur for a level, which don't depend on the DNA needed
+    get_unlock_cost()
+        Returns the coins needed to get a dinosaur to a level with some DNA left over for fusing
+    get_coin_totals()
+        Returns the coins needed to unlock each needed dinosaur
+    get_priorities()
+        Returns every leveling option for the needed dinosaurs, sorted by priority and cost
+    get_all_needed_amounts()
+        Returns the tagged root dinosaurs for every needed dinosaur
+    """
+
+    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str]) -> None:
+        """
+        Initializes class variables
+
+        Parameters
+        ----------
+        c_dinos : dict[str : Dino]
+            A current collection of dinosaur names mapped to their corresponding Dino objects
+        n_dinos : set[str]
+            A set of names of dinosaurs that need to be unlocked
+        """
+        self.current_dinos = c_dinos if isinstance(c_dinos, DinoRoster) else DinoRoster(c_dinos)
+        self.needed_dinos = n_dinos
+
+        self.DNA_and_cost = {}
+        self.unlock_plans = {}
+        self.unlock_costs = {}
+        self.needed_amounts = {}
+        self.eligible_dinos = {}
+        self.consumers = {}
+        self.indexed_targets = set()
+        self.unknown_cost_dinos = set()
+
+    def check_if_leveling_eligible(self, dino_name: str, target: str) -> list[str]:
+        """
+        Returns the dinosaurs in a dinosaur's tree that are unlocked, but not yet at the level needed to fuse the hybrids
+        in the target's tree that use them
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur whose tree should be checked
+        target : str
+            The name of the needed dinosaur whose tree is being checked
+
+        Returns
+        -------
+        list[str]
+            The names of the dinosaurs that can be leveled
+        """
+        key = (dino_name, target)
+        if key not in self.eligible_dinos:
+            dino = self.current_dinos[dino_name]
+            eligible = []
+            if dino.get_level() > dino.activation_level():
+                if dino_name != target and self.get_fuse_level(dino_name, target) > dino.get_level():
+                    eligible = [dino_name]
+            elif dino.is_hybrid():
+                first, second = dino.get_parents()
+                first_eligible = self.check_if_leveling_eligible(first, target)
+                eligible = first_eligible + [name for name in self.check_if_leveling_eligible(second, target) if name not in first_eligible]
+            self.eligible_dinos[key] = eligible
+        return self.eligible_dinos[key]
+
+    def get_child(self, ancestor: str, target: str) -> list[str]:
+        """
+        Returns the hybrids in a target's tree that are fused directly from the given ancestor
+
+        Parameters
+        ----------
+        ancestor : str
+            The name of the ancestor
+        target : str
+            The name of the needed dinosaur
+
+        Returns
+        -------
+        list[str]
+            The names of the hybrids that use the ancestor as a parent, ordered from highest to lowest activation level
+            (empty if it isn't in the target's tree)
+        """
+        return self.get_consumers(ancestor, target)[0]
+
+    def get_fuse_level(self, ancestor: str, target: str) -> int:
+        """
+        Returns the level an ancestor needs to reach to fuse every hybrid in a target's tree that uses it
+
+        Parameters
+        ----------
+        ancestor : str
+            The name of the ancestor
+        target : str
+            The name of the needed dinosaur
+
+        Returns
+        -------
+        int
+            The highest activation level of the hybrids that use the ancestor (None if it isn't in the target's tree)
+        """
+        return self.get_consumers(ancestor, target)[1]
+
+    def get_consumers(self, ancestor: str, target: str) -> tuple[list[str], int]:
+        """
+        Looks up an ancestor and a target in the consumer index, building the index for the target's tree the first time it is needed
+
+        Parameters
+        ----------
+        ancestor : str
+            The name of the ancestor
+        target : str
+            The name of the needed dinosaur
+
+        Returns
+        -------
+        list[str]
+            The names of the hybrids that use the ancestor as a parent, ordered from highest to lowest activation level
+        int
+            The highest activation level of those hybrids (None if the ancestor isn't in the target's tree)
+        """
+        if target not in self.indexed_targets:
+            self.consumers.update(self.current_dinos.build_consumer_index([target]))
+            self.indexed_targets.add(target)
+        return self.consumers.get((ancestor, target), ([], None))
+
+    def get_DNA_and_cost(self, dino_name: str) -> tuple[int, int]:
+        """
+        Returns the DNA a dinosaur would have after fusing as much as possible from the DNA its ancestors have now,
+        and the coins needed for all of those fuses
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+
+        Returns
+        -------
+        int
+            The DNA the dinosaur would have
+        int
+            The coins needed for the fuses
+        """
+        if Stats.enabled:
+            Stats.cache_lookup("DNA_and_cost", dino_name in self.DNA_and_cost)
+        if dino_name not in self.DNA_and_cost:
+            dino = self.current_dinos[dino_name]
+            if dino.is_hybrid():
+                min_fuses = None
+                total_cost = 0
+                for parent in dino.get_parents():
+                    parent_DNA, parent_cost = self.get_DNA_and_cost(parent)
+                    parent_fuses = math.floor(parent_DNA/LevelCosts.parent_DNA_per_fuse(self.current_dinos[parent].rarity_rank(), dino.rarity_rank()))
+                    min_fuses = parent_fuses if min_fuses is None else min(min_fuses, parent_fuses)
+                    total_cost += parent_cost
+                total_cost += min_fuses*coins_per_fuse(dino)
+                self.DNA_and_cost[dino_name] = (DNA_PER_FUSE*min_fuses + dino.get_amount(), total_cost)
+            else:
+                self.DNA_and_cost[dino_name] = (dino.get_amount(), 0)
+        return self.DNA_and_cost[dino_name]
+
+    def needed_for_fusing(self, dino_name: str, child: str, needed_child_DNA: int) -> int:
+        """
+        Returns the DNA of a parent needed to fuse the given amount of DNA for its child
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the parent
+        child : str
+            The name of the child
+        needed_child_DNA : int
+            The amount of DNA needed for the child
+
+        Returns
+        -------
+        int
+            The amount of the parent's DNA needed
+        """
+        needed_fuses = math.ceil(needed_child_DNA/DNA_PER_FUSE)
+        return needed_fuses*LevelCosts.parent_DNA_per_fuse(self.current_dinos[dino_name].rarity_rank(), self.current_dinos[child].rarity_rank())
+
+    def get_cost(self, dino_name: str, child: str) -> tuple[int, int, str]:
+        """
+        Returns how much progress leveling a dinosaur as far as possible makes towards fusing its child, and the coins needed for it
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur to level
+        child : str
+            The name of the hybrid that uses the dinosaur
+
+        Returns
+        -------
+        int
+            The priority of leveling (1 if the dinosaur can be leveled and fused all the way, 2 if it can be leveled to the
+            child's activation level, and 3 otherwise)
+        int
+            The coins needed for the fuses and level ups
+        str
+            The name of the dinosaur
+        """
+        dino = self.current_dinos[dino_name]
+        child_dino = self.current_dinos[child]
+        DNA_left, added_cost = self.get_DNA_and_cost(dino_name)
+        current_level = dino.get_level()
+        new_level = min(dino.level_reachable_with(DNA_left, current_level), max(child_dino.activation_level(), current_level))
+        DNA_left -= dino.DNA_to_certain_level(current_level, new_level)
+        added_cost += coins_between_levels(dino, current_level, new_level)
+        if has_unknown_coin_cost(dino, current_level, new_level):
+            self.unknown_cost_dinos.add(dino_name)
+
+        enough_for_fusing = new_level == child_dino.activation_level()
+        all_the_way = False
+        if enough_for_fusing:
+            all_the_way = DNA_left >= self.needed_for_fusing(dino_name, child, child_dino.activation_amount() - child_dino.get_amount())
+
+        priority = (not all_the_way) + (not enough_for_fusing) + 1
+        return priority, added_cost, dino_name
+
+    def get_needed_amounts(self, dino_name: str, needed_amount: int, amount_for_hybrid: int) -> list[tuple[str, str]]:
+        """
+        Returns the root dinosaurs that a dinosaur still needs DNA from, each tagged with how urgently it's needed
+            blue: it is needed, but not urgently
+            purple: it doesn't even have enough for the next fuse (or level)
+            orange: the dinosaur already has enough DNA
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+        needed_amount : int
+            The amount of DNA the dinosaur needs
+        amount_for_hybrid : int
+            The amount of DNA the dinosaur needs for a single fuse of its child (0 for a needed dinosaur)
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            The names of the dinosaurs and their tags
+        """
+        key = (dino_name, needed_amount, amount_for_hybrid)
+        if key in self.needed_amounts:
+            return self.needed_amounts[key]
+
+        tag = 'blue'
+        dino = self.current_dinos[dino_name]
+        ready_to_level = True
+        if dino.is_hybrid():
+            first, second = dino.get_parents()
+            parent_amounts = []
+            for parent in (first, second):
+                parent_dino = self.current_dinos[parent]
+                parent_amount = self.needed_for_fusing(parent, dino_name, needed_amount)
+                if parent_dino.get_level() < dino.activation_level():
+                    ready_to_level = False
+                    parent_amount += parent_dino.DNA_to_certain_level(parent_dino.get_level(), dino.activation_level())
+                parent_amounts.append(parent_amount)
+
+        total_DNA = self.get_DNA_and_cost(dino_name)[0] if ready_to_level else dino.get_amount()
+        if total_DNA < needed_amount:
+            if amount_for_hybrid != 0:
+                if total_DNA < amount_for_hybrid:
+                    tag = 'purple'
+            elif total_DNA < dino.DNA_for_one_lvl(dino.get_level()):
                 tag = 'purple'
+            if dino.is_hybrid():
+                needed = self.get_needed_amounts(first, parent_amounts[0], self.needed_for_fusing(first, dino_name, DNA_PER_FUSE)) + \
+                         self.get_needed_amounts(second, parent_amounts[1], self.needed_for_fusing(second, dino_name, DNA_PER_FUSE))
+            else:
+                needed = [(dino_name, tag)]
+        elif dino.is_hybrid():
+            needed = self.get_needed_amounts(first, 0, 0) + self.get_needed_amounts(second, 0, 0)
         else:
-            if totalDNA < dinosaur.DNAforLvl(dinosaur.getLvl()+1):
-                tag = 'purple'
-        if dino in recipes:
-            return getNeededAmounts(p1, p1DNA, DNAforEachFuse(p1Dino, dinosaur)) + getNeededAmounts(p2, p2DNA, DNAforEachFuse(p2Dino, dinosaur))
-        return [(dino, tag)]
-
-    if dino in recipes:
-            p1, p2 = recipes[dino]
-            return getNeededAmounts(p1, 0, 0) + getNeededAmounts(p1, 0, 0)
-    return [(dino, 'orange')]
-
-#--------------------------------------------------------------------------------------------------------------------------------------------------
-
-recipes = {}
-dinos = {}
-
-levelingCost = {2: 5, 3: 10, 4: 25, 5: 50, 6: 100, 7: 200, 8: 400, 9: 600, 10: 800,
-                11: 1000, 12: 2000, 13: 4000, 14: 6000, 15: 8000, 16: 10000, 17: 15000, 18: 20000, 19: 30000, 20: 40000,
-                21: 50000, 22: 60000, 23: 70000, 24: 80000, 25: 100000}
-
-recipeReader = open("DinoRecipes.txt", "r")
-recipeLines = recipeReader.read().split("\n")
-for line in recipeLines:
-    recipeDinos = line.split(" ")
-    recipes[recipeDinos[0][:-1]] = [recipeDinos[1], recipeDinos[2]]
-
-dinoReader = open("DinosToGet.txt", "r")
-neededDinos = dinoReader.read().split("\n")
-
-currentReader = open("CurrentDinos.txt", "r")
-currentDinos = currentReader.read().split("\n")
-for currentDino in currentDinos:
-    [dinoName, dinoLVL, dinoDNA, dinoRarity] = currentDino.split(" ")
-    if dinoName in dinos:
-        dinos[dinoName].updateInfo(int(dinoDNA), int(dinoLVL), dinoRarity)
-    else:
-        dinos[dinoName] = Dino(dinoName, int(dinoLVL), int(dinoDNA), dinoRarity)
-
-# --------------------------------------------------------------------------------------------------------------------
-
-dinosForLvling = {}
-
-for neededDino in neededDinos:
-    dinosForLvling[neededDino] = checkIfLvlingEligible(neededDino, None)
-
-priorities = []
-for neededDino in neededDinos:
-    requirements = dinosForLvling[neededDino]
-    for req in requirements:
-        child = getChild(req, neededDino)
-        cost = getCost(req, child)
-        if (cost[1] != 0):
-            priorities.append(getCost(req, child))
-
-priorities = sorted(priorities)
-
-amounts = []
-for neededDino in neededDinos:
-    neededDNA = dinos[neededDino].activationDNA() - dinos[neededDino].getDNA()
-    needed = getNeededAmounts(neededDino, neededDNA, 0)
-    origIn = False
-    for i in needed:
-        if neededDino == i[0]:
-            origIn = True
-            break
-    
-    if origIn: needed = needed.remove(i)
-    if needed:
-        amounts += needed
-
-print(sorted(amounts))
-
-
-# First, is the dinosaur above its activation level?
-    # If it is not, check its children
-    # If it is, is it not yet at fuse level?
-        # If it is at fuse level, don't bother
-        # If it is not, it is viable for leveling
-
-
-
-# For each dino in requirements:
-    # Hypothetically, level up each dino as far as it can go
-    # If it is a hybrid, take that into account
-
-
-
-
-
-
-
-
-
-# def getAncestors(child):
-#     if child in recipes:
-#         parent1, parent2 = recipes[child]
-#         gen1 = getAncestors(parent1)
-#         gen2 = getAncestors(parent2)
-#         return gen1 + gen2 + [child]
-#     return [child]
-
-# def getAncsWithNeededDNA(child, childDNA):
-#     if child in recipes:
-#         parent1, parent2 = recipes[child]
-#         diffP1 = dinos[child].rarityRank() - dinos[parent1].rarityRank()
-#         DNAForP1 = childDNA*(5 if diffP1%2 else 2)*10**int(diffP1/2)
-#         diffP2 = dinos[child].rarityRank() - dinos[parent2].rarityRank()
-#         DNAForP2 = childDNA*(5 if diffP2%2 else 2)*10**int(diffP2/2)
-#         return getAncsWithNeededDNA(parent1, DNAForP1) + getAncsWithNeededDNA(parent2, DNAForP2)
-#     return [(child, childDNA)]
-
-
-# def getFuseLvl(neededAnc, currentChild):
-#     if (currentChild == neededAnc): 
-#         return dinos[currentChild].activationLVL()+1
-#     if currentChild in recipes:
-#         anc1, anc2 = recipes[currentChild]
-#         if (anc1 == neededAnc or anc2 == neededAnc):
-#             return dinos[currentChild].activationLVL()
-#         maxLvl = 0
-#         if getFuseLvl(neededAnc, anc1) != None:
-#             maxLvl = getFuseLvl(neededAnc, anc1)
-#         if getFuseLvl(neededAnc, anc2) != None:
-#             maxLvl = max(maxLvl, getFuseLvl(neededAnc, anc2))
-#         return maxLvl
-#     return None
-
-
-# for every needed dino, I want to look at what is required to get it
-# as I go through each dino, I will sort it according to a pre-determined system
-
-# for neededDino in neededDinos:
-#     allFusingDNA = {}
-#     allLvlingDNA = {}
-#     priority = 1
-#     ancestors = getAncestors(neededDino)
-#     for anc in ancestors:
-#         allFusingDNA[anc] = 0
-#         allLvlingDNA[anc] = 0
-
-#     for anc in ancestors:
-#         if dinos[anc].getLvl() >= getFuseLvl(anc, neededDino):
-#             continue
-
-#         neededLVL = getFuseLvl(anc, neededDino)
-#         lvlingDNA = dinos[anc].DNAupToLVL(neededLVL)
-#         returnedFusingDNA = getAncsWithNeededDNA(anc, lvlingDNA)
-#         if len(returnedFusingDNA) == 1:
-#             allLvlingDNA[anc] += lvlingDNA
-#         else:
-#             for dinoInfo in returnedFusingDNA:
-#                 allFusingDNA[dinoInfo[0]] += dinoInfo[1]
-
-#     for anc in ancestors:
-#         if dinos[anc].getDNA() < allLvlingDNA[anc]:
-#             priority = 3
-#         elif dinos[anc].getDNA() < allFusingDNA[anc] + allLvlingDNA[anc]:
-#             priority = 2
-        
-
-
-
-# Is not at hybrid level, has enough to take it all the way
-# Is not at hybrid level, has enough to get to hybrid level
-# Is not at hybrid level, doesn't have enough
+            needed = [(dino_name, 'orange')]
+        self.needed_amounts[key] = needed
+        return needed
+
+    def get_unlock_plan(self, dino_name: str, level: int) -> tuple[int, int, list[tuple[str, int, int]]]:
+        """
+        Returns the part of unlocking a dinosaur to a level that doesn't depend on how much DNA is needed for fusing afterwards
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+        level : int
+            The level the dinosaur needs to reach
+
+        Returns
+        -------
+        int
+            The coins needed for the level ups
+        int
+            The DNA the dinosaur has left over after reaching the level (negative if it doesn't have enough)
+        list[tuple[str, int, int]]
+            For each parent (none for a root dinosaur), its name, the level it needs to reach to fuse the dinosaur,
+            and the DNA of it used in a single fuse
+        """
+        key = (dino_name, level)
+        if key not in self.unlock_plans:
+            dino = self.current_dinos[dino_name]
+            coins = coins_between_levels(dino, dino.get_level(), level)
+            if has_unknown_coin_cost(dino, dino.get_level(), level):
+                self.unknown_cost_dinos.add(dino_name)
+            DNA_left = dino.get_amount() - dino.DNA_to_certain_level(dino.get_level(), level)
+            parents = []
+            if dino.is_hybrid():
+                for parent in dino.get_parents():
+                    parent_dino = self.current_dinos[parent]
+                    parents.append((parent, max(dino.activation_level(), parent_dino.get_level()),
+                                    LevelCosts.parent_DNA_per_fuse(parent_dino.rarity_rank(), dino.rarity_rank())))
+            self.unlock_plans[key] = (coins, DNA_left, parents)
+        return self.unlock_plans[key]
+
+    def get_unlock_cost(self, dino_name: str, level: int, amount: int = 0) -> int:
+        """
+        Returns the coins needed to get a dinosaur to the given level with the given amount of DNA left over for fusing
+        Each parent's share is worked out on its own, so DNA from an ancestor shared by both parents isn't split between them
+        The amount only matters through the number of fuses it takes, so results are memoized by that number
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+        level : int
+            The level the dinosaur needs to reach
+        amount : int
+            The amount of DNA the dinosaur needs after reaching the level
+
+        Returns
+        -------
+        int
+            The coins needed for the fuses and level ups
+        """
+        coins, DNA_left, parents = self.get_unlock_plan(dino_name, level)
+        if amount <= DNA_left or not parents:
+            return coins
+
+        fuses = math.ceil((amount - DNA_left)/DNA_PER_FUSE)
+        key = (dino_name, level, fuses)
+        if Stats.enabled:
+            Stats.cache_lookup("unlock_costs", key in self.unlock_costs)
+        if key not in self.unlock_costs:
+            fuse_coins = fuses*coins_per_fuse(self.current_dinos[dino_name])
+            for parent, parent_level, parent_DNA_per_fuse in parents:
+                fuse_coins += self.get_unlock_cost(parent, parent_level, fuses*parent_DNA_per_fuse)
+            self.unlock_costs[key] = coins + fuse_coins
+        return self.unlock_costs[key]
+
+    def get_coin_totals(self) -> dict[str : int]:
+        """
+        Returns the coins needed to unlock each of the needed dinosaurs
+        Levels above MAX_COIN_LEVEL are left out of the totals, and the dinosaurs they were left out for are added to
+        unknown_cost_dinos
+
+        Returns
+        -------
+        dict[str : int]
+            A mapping of needed dinosaur names to the coins needed to unlock them
+        """
+        return {dino_name: self.get_unlock_cost(dino_name, self.current_dinos[dino_name].activation_level()+1)
+                for dino_name in sorted(self.needed_dinos)}
+
+    def get_priorities(self) -> list[tuple[int, int, str]]:
+        """
+        Returns every dinosaur that can be leveled towards a needed dinosaur, along with the priority and coins of doing so
+
+        Returns
+        -------
+        list[tuple[int, int, str]]
+            The priority, the coins, and the name for each dinosaur, sorted
+        """
+        priorities = []
+        for needed_dino in sorted(self.needed_dinos):
+            for dino_name in self.check_if_leveling_eligible(needed_dino, needed_dino):
+                cost = self.get_cost(dino_name, self.get_child(dino_name, needed_dino)[0])
+                if cost[1] != 0:
+                    priorities.append(cost)
+        return sorted(priorities)
+
+    def get_all_needed_amounts(self) -> list[tuple[str, str]]:
+        """
+        Returns the tagged root dinosaurs that each needed dinosaur still needs DNA from (see get_needed_amounts())
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            The names of the dinosaurs and their tags, sorted
+        """
+        amounts = []
+        for needed_dino in sorted(self.needed_dinos):
+            dino = self.current_dinos[needed_dino]
+            needed_DNA = dino.activation_amount() - dino.get_amount()
+            amounts += [needed for needed in self.get_needed_amounts(needed_dino, needed_DNA, 0) if needed[0] != needed_dino]
+        return sorted(amounts)
+
+
+if __name__=='__main__':
+    """
+    Grabs dinosaur information from the database and prints the leveling priorities, the tagged DNA needed,
+    and the coins needed to unlock each needed dinosaur
+    """
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+    coin_logic = CoinLogic(current_dinos, needed_dinos)
+    print(coin_logic.get_priorities())
+    print(coin_logic.get_all_needed_amounts())
+    for dino_name, coins in coin_logic.get_coin_totals().items():
+        print(dino_name + ': ' + str(coins))
+    if coin_logic.unknown_cost_dinos:
+        print('Coins for levels above ' + str(MAX_COIN_LEVEL) + ' are unknown and were left out for: ' + ', '.join(sorted(coin_logic.unknown_cost_dinos)))
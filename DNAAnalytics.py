@@ -1,11 +1,20 @@
 from Dino import Dino
+from DinoRoster import DinoRoster
 from HistoryPlotting import HistoryPlotting
 import FileFunctions
+import LevelCosts
+import ResultCache
+import Stats
+import argparse
 import math
 from collections import Counter, defaultdict
-from collections import Counter, defaultdict
 
-DNA_PER_FUSE = 20
+DNA_PER_FUSE = LevelCosts.DNA_PER_FUSE
+ENGINES = ("recursive", "wavefront")
+
+# The results worked out in __init__ that are saved to and loaded from ResultCache
+CACHED_ATTRIBUTES = ("updated_levels", "updated_amounts", "topological_order", "ancestor_masks", "tree_masks", "ancestors",
+                     "target_needed_DNA", "total_needed_DNA", "tags")
 
 class DNAAnalytics:
     """
@@ -13,25 +22,39 @@ class DNAAnalytics:
 
     Attributes
     ----------
-    current_dinos : dict[str : Dino]
-        A current collection of dinosaur names mapped to their corresponding Dino objects
+    current_dinos : DinoRoster
+        A current collection of dinosaur names mapped to their corresponding Dino objects, indexed by parent
     needed_dinos : set[str]
         A set of names of dinosaurs that need to be unlocked
     updated_levels : dict[str : int]
         A mapping of dinosaur names to a level; used for one dinosaur being used for multiple descendants
     updated_amounts : dict[str : int]
         A mapping of dinosaur names to an amount; used for one dinosaur being used for multiple descendants
+    engine : str
+        The engine used to work out needed DNA, either "recursive" (get_needed_DNA) or "wavefront" (DNAWavefront)
+    dino_ids : dict[str : int]
+        A mapping of dinosaur names to the interned ids used as bit positions in ancestor masks
+    dino_names : list[str]
+        A list of dinosaur names indexed by their interned ids
+    topological_order : list[str]
+        Every dinosaur name, ordered so that each dinosaur comes after both of its parents
+    ancestor_masks : dict[str : int]
+        A mapping of every dinosaur to a bitmask of the ids of its root (non-hybrid) ancestors
+    tree_masks : dict[str : int]
+        A mapping of every dinosaur to a bitmask of the ids of itself and all of its ancestors, hybrids included
     ancestors : dict[str : set[str]]
         A mapping of each needed dinosaur to a set of its ancestors
     history : HistoryPlotting
         A class instantiation to keep track of amount history
     tags : dict[str : str]
         A mapping of dinosaur names to their tag color
+    target_needed_DNA : dict[str : Counter]
+        A mapping of each needed dinosaur to its share of total_needed_DNA
     total_needed_DNA : dict[str : int]
         A mapping of dinosaur names to amounts of DNA needed to unlock all needed dinosaurs
     """
 
-    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str]) -> None:
+    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str], engine: str = "recursive", cache_key: str = None) -> None:
         """
         Initializes class variables and calculates all needed DNA
         
@@ -41,15 +64,43 @@ class DNAAnalytics:
             A current collection of dinosaur names mapped to their corresponding Dino objects
         n_dinos : set[str]
             A set of names of dinosaurs that need to be unlocked
+        engine : str
+            The engine used to work out needed DNA, either "recursive" or "wavefront"
+        cache_key : str
+            The ResultCache key of the files c_dinos and n_dinos were loaded from (see ResultCache.get_input_key())
+            If given, results saved under this key are loaded instead of worked out, and new results are saved under it
         """
-        self.current_dinos = c_dinos
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine " + engine + ", expected one of " + ", ".join(ENGINES))
+        self.engine = engine
+        self.current_dinos = c_dinos if isinstance(c_dinos, DinoRoster) else DinoRoster(c_dinos)
         self.needed_dinos = n_dinos
         self.updated_levels = self.get_default_levels()
         self.updated_amounts = self.get_default_amounts()
-        self.ancestors = self.get_all_ancestors()
+        self.dino_names = sorted(self.current_dinos)
+        self.dino_ids = {dino_name: dino_id for dino_id, dino_name in enumerate(self.dino_names)}
         self.history = HistoryPlotting()
 
-        self.total_needed_DNA = self.determine_all_needed_DNA()
+        cached_results = ResultCache.load(cache_key) if cache_key is not None else None
+        if cached_results is not None:
+            for attribute in CACHED_ATTRIBUTES:
+                setattr(self, attribute, cached_results[attribute])
+            return
+
+        with Stats.phase("ancestors"):
+            self.topological_order = self.get_topological_order()
+            self.ancestor_masks = self.get_ancestor_masks()
+            self.tree_masks = self.get_tree_masks()
+            self.ancestors = self.get_all_ancestors()
+
+        self.target_needed_DNA = {}
+        with Stats.phase("needed_DNA"):
+            self.total_needed_DNA = self.determine_all_needed_DNA()
+        self.tags = {}
+        self.determine_all_tags()
+
+        if cache_key is not None:
+            ResultCache.store(cache_key, {attribute: getattr(self, attribute) for attribute in CACHED_ATTRIBUTES})
 
     # NEEDED DNA FUNCTIONS -------------------------------------------------------------------------
 
@@ -103,8 +154,7 @@ class DNAAnalytics:
         """
         child = self.current_dinos[child_name]
         parent = self.current_dinos[parent_name]
-        parent_rank_diff = (child.rarity_rank()-parent.rarity_rank())
-        parent_cost_per_fuse = 10*(5 if parent_rank_diff%2 else 2)*10**int(parent_rank_diff/2)
+        parent_cost_per_fuse = LevelCosts.parent_DNA_per_fuse(parent.rarity_rank(), child.rarity_rank())
         return parent_cost_per_fuse*math.ceil(child_amount/DNA_PER_FUSE)
            
     def get_needed_DNA(self, dino_name: str, needed_level: int, needed_amount: int) -> dict[str : int]:
@@ -125,6 +175,8 @@ class DNAAnalytics:
         dict[str : int]
             A mapping of dinosaur names to the total DNA needed to get the specified dinosaur to the indicated level
         """
+        if Stats.enabled:
+            Stats.count("get_needed_DNA.calls")
         dino = self.current_dinos[dino_name]
         # if dino_name == 'Velociraptor':
         #     pass
@@ -160,21 +212,266 @@ class DNAAnalytics:
     def determine_all_needed_DNA(self) -> dict[str : int]:
         """
         Return all the amounts of DNA needed to unlock all needed dinosaurs
+        The needed dinosaurs are worked out in name order, since shared ancestors hand out their DNA to whichever one reaches
+        them first (iterating the set would follow the string hashes of the process)
 
         Returns
         -------
         dict[str : int]
             A mapping of dinosaur names to amounts of DNA needed to unlock all needed dinosaurs
         """
+        self.target_needed_DNA = self.compute_target_needed_DNA(sorted(self.needed_dinos))
         total_DNA_count = Counter()
-        for dino_name in self.needed_dinos:
-            dino = self.current_dinos[dino_name]
-            needed_DNA = self.get_needed_DNA(dino_name, dino.activation_level()+1, 0)
-            total_DNA_count += Counter(needed_DNA)
+        for needed_DNA in self.target_needed_DNA.values():
+            total_DNA_count += needed_DNA
         return total_DNA_count
+
+    def compute_target_needed_DNA(self, targets: list[str]) -> dict[str : Counter]:
+        """
+        Return the DNA needed to unlock each of the provided needed dinosaurs, worked out in the order given
+        using the selected engine
+
+        Parameters
+        ----------
+        targets : list[str]
+            The names of the needed dinosaurs
+
+        Returns
+        -------
+        dict[str : Counter]
+            A mapping of each needed dinosaur to the amounts of root dinosaur DNA it still needs
+        """
+        if self.engine == "wavefront":
+            import DNAWavefront
+            return DNAWavefront.propagate_needed_DNA(self.current_dinos, targets, self.updated_levels, self.updated_amounts)
+
+        target_needed_DNA = {}
+        for dino_name in targets:
+            dino = self.current_dinos[dino_name]
+            target_needed_DNA[dino_name] = +Counter(self.get_needed_DNA(dino_name, dino.activation_level()+1, 0))
+        return target_needed_DNA
+
+    # INCREMENTAL UPDATE FUNCTIONS ---------------------------------------------------------------
+
+    def update_dino(self, dino_name: str, amount: int = None, level: int = None) -> None:
+        """
+        Updates the amount and/or level of a single dinosaur and recalculates only the needed DNA that depends on it
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur that changed
+        amount : int
+            The new amount of DNA for the dinosaur (unchanged if None)
+        level : int
+            The new level of the dinosaur (unchanged if None)
+        """
+        self.update_dinos({dino_name: (amount, level)})
+
+    def update_dinos(self, updates: dict[str : tuple[int, int]]) -> None:
+        """
+        Updates the amounts and/or levels of several dinosaurs at once and recalculates the needed DNA that depends on any
+        of them in a single pass
+
+        Parameters
+        ----------
+        updates : dict[str : tuple[int, int]]
+            A mapping of the names of the dinosaurs that changed to their new amount and level (either unchanged if None)
+        """
+        for dino_name, (amount, level) in updates.items():
+            dino = self.current_dinos[dino_name]
+            if amount is not None:
+                dino.set_amount(amount)
+            if level is not None:
+                dino.set_level(level)
+        self.recalculate_needed_DNA(set(updates))
+
+    def unlock_dino(self, dino_name: str) -> None:
+        """
+        Marks a needed dinosaur as unlocked and recalculates only the needed DNA of the targets it shared ancestors with
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur that was unlocked
+        """
+        if dino_name not in self.needed_dinos:
+            return
+        affected = self.get_affected_targets(set([dino_name]))
+        self.needed_dinos.remove(dino_name)
+        self.ancestors.pop(dino_name)
+        self.total_needed_DNA -= self.target_needed_DNA.pop(dino_name)
+        affected.remove(dino_name)
+        self.recalculate_targets(affected, set(self.names_from_mask(self.tree_masks[dino_name])))
+
+    def get_affected_targets(self, changed_dinos: set[str]) -> set[str]:
+        """
+        Return the needed dinosaurs whose needed DNA could change when the provided dinosaurs change
+        These are the needed dinosaurs reached by following child links from the changed dinosaurs, along with any
+        needed dinosaurs that share part of a tree with them (since shared ancestors pass their DNA from one target to the next)
+
+        Parameters
+        ----------
+        changed_dinos : set[str]
+            The names of the dinosaurs that changed
+
+        Returns
+        -------
+        set[str]
+            The names of the needed dinosaurs that have to be recalculated
+        """
+        descendants = set(changed_dinos)
+        stack = list(changed_dinos)
+        while stack:
+            for child in self.current_dinos.get_children(stack.pop()):
+                if child not in descendants:
+                    descendants.add(child)
+                    stack.append(child)
+
+        affected = set(dino_name for dino_name in descendants if dino_name in self.needed_dinos)
+        affected_mask = 0
+        for dino_name in affected:
+            affected_mask |= self.tree_masks[dino_name]
+
+        # Grow the set until no other needed dinosaur shares a tree with it
+        growing = True
+        while growing:
+            growing = False
+            for dino_name in self.needed_dinos:
+                if dino_name not in affected and self.tree_masks[dino_name] & affected_mask:
+                    affected.add(dino_name)
+                    affected_mask |= self.tree_masks[dino_name]
+                    growing = True
+        return affected
+
+    def recalculate_needed_DNA(self, changed_dinos: set[str]) -> None:
+        """
+        Recalculates the needed DNA of every target affected by the provided dinosaurs and updates total_needed_DNA
+
+        Parameters
+        ----------
+        changed_dinos : set[str]
+            The names of the dinosaurs that changed
+        """
+        with Stats.phase("incremental_recompute"):
+            self.recalculate_targets(self.get_affected_targets(changed_dinos), changed_dinos)
+
+    def recalculate_targets(self, targets: set[str], reset_dinos: set[str]) -> None:
+        """
+        Recalculates the needed DNA of the provided targets from the current state of every dinosaur in their trees
+
+        Parameters
+        ----------
+        targets : set[str]
+            The names of the needed dinosaurs to recalculate, which must not share any ancestor with the other needed dinosaurs
+        reset_dinos : set[str]
+            The names of any dinosaurs outside of the targets' trees whose working level and amount should also be reset
+        """
+        # Reset the working levels and amounts of every dinosaur in the affected trees
+        reset_mask = 0
+        for dino_name in targets:
+            reset_mask |= self.tree_masks[dino_name]
+        for dino_name in set(self.names_from_mask(reset_mask)) | reset_dinos:
+            self.updated_levels[dino_name] = self.current_dinos[dino_name].get_level()
+            self.updated_amounts[dino_name] = self.current_dinos[dino_name].get_amount()
+
+        for dino_name in targets:
+            self.total_needed_DNA -= self.target_needed_DNA[dino_name]
+
+        # Keep the name order of determine_all_needed_DNA(), since shared DNA goes to whichever target asks for it first
+        target_needed_DNA = self.compute_target_needed_DNA(sorted(targets))
+        for dino_name, needed_DNA in target_needed_DNA.items():
+            self.target_needed_DNA[dino_name] = needed_DNA
+            self.total_needed_DNA += needed_DNA
+        self.tags = {}
             
     # ANCESTOR FUNCTIONS ------------------------------------------------------------------------
 
+    def get_topological_order(self) -> list[str]:
+        """
+        Return every current dinosaur ordered so that each dinosaur comes after both of its parents
+
+        Returns
+        -------
+        list[str]
+            The names of all current dinosaurs in topological order of the recipe tree
+        """
+        order = []
+        visited = set()
+        for start_name in self.dino_names:
+            if start_name in visited:
+                continue
+            visited.add(start_name)
+            stack = [(start_name, iter(self.current_dinos[start_name].get_parents()))]
+            while stack:
+                dino_name, parents = stack[-1]
+                for parent in parents:
+                    if parent and parent not in visited:
+                        visited.add(parent)
+                        stack.append((parent, iter(self.current_dinos[parent].get_parents())))
+                        break
+                else:
+                    stack.pop()
+                    order.append(dino_name)
+        return order
+
+    def get_ancestor_masks(self) -> dict[str : int]:
+        """
+        Return a mapping of every dinosaur to a bitmask of its root ancestors
+        Each dinosaur's mask is computed once, after its parents' masks, by combining the masks of its parents
+
+        Returns
+        -------
+        dict[str : int]
+            A mapping of every dinosaur to a bitmask of the ids of its root ancestors
+        """
+        ancestor_masks = {}
+        for dino_name in self.topological_order:
+            dino = self.current_dinos[dino_name]
+            if dino.is_hybrid():
+                ancestor_masks[dino_name] = ancestor_masks[dino.first] | ancestor_masks[dino.second]
+            else:
+                ancestor_masks[dino_name] = 1 << self.dino_ids[dino_name]
+        return ancestor_masks
+
+    def get_tree_masks(self) -> dict[str : int]:
+        """
+        Return a mapping of every dinosaur to a bitmask of itself and all of its ancestors, hybrids included
+
+        Returns
+        -------
+        dict[str : int]
+            A mapping of every dinosaur to a bitmask of the ids of the dinosaurs in its recipe tree
+        """
+        tree_masks = {}
+        for dino_name in self.topological_order:
+            dino = self.current_dinos[dino_name]
+            tree_masks[dino_name] = 1 << self.dino_ids[dino_name]
+            if dino.is_hybrid():
+                tree_masks[dino_name] |= tree_masks[dino.first] | tree_masks[dino.second]
+        return tree_masks
+
+    def names_from_mask(self, mask: int) -> list[str]:
+        """
+        Return the names of the dinosaurs whose ids are set in the provided bitmask
+
+        Parameters
+        ----------
+        mask : int
+            A bitmask of dinosaur ids
+
+        Returns
+        -------
+        list[str]
+            The names of the dinosaurs in the mask, sorted by name
+        """
+        names = []
+        while mask:
+            lowest_bit = mask & -mask
+            names.append(self.dino_names[lowest_bit.bit_length()-1])
+            mask ^= lowest_bit
+        return names
+
     def get_all_ancestors(self) -> dict[str : set[str]]:
         """
         Return a mapping of each needed dinosaur to a set of its ancestors
@@ -189,6 +486,23 @@ class DNAAnalytics:
             ancestors[dino_name] = self.get_ancestors(dino_name)
         return ancestors
 
+    def get_targets_sharing(self, root_name: str) -> set[str]:
+        """
+        Return the needed dinosaurs that have the provided dinosaur as one of their ancestors
+
+        Parameters
+        ----------
+        root_name : str
+            The name of the ancestor dinosaur
+
+        Returns
+        -------
+        set[str]
+            The names of the needed dinosaurs that share the ancestor
+        """
+        root_bit = 1 << self.dino_ids[root_name]
+        return set(dino_name for dino_name in self.needed_dinos if self.ancestor_masks[dino_name] & root_bit)
+
     def get_ancestors(self, dino_name) -> set[str]:
         """
         Return a set of all of the ancestors of the provided dinosaur
@@ -203,11 +517,7 @@ class DNAAnalytics:
         set[str]
             The ancestors of the provided dinosaur
         """
-        dino = self.current_dinos[dino_name]
-        if dino.is_hybrid():
-            return self.get_ancestors(dino.first).union(self.get_ancestors(dino.second))
-        else:
-            return set([dino_name])
+        return set(self.names_from_mask(self.ancestor_masks[dino_name]))
             
     # RESULTS FUNCTIONS -------------------------------------------------------------------------
 
@@ -221,6 +531,8 @@ class DNAAnalytics:
         dino_name : str
             The name of the dinosaur you want the tag for
         """
+        if Stats.enabled:
+            Stats.count("determine_tag.calls")
         if dino_name in self.tags:
             return
         dino = self.current_dinos[dino_name]
@@ -236,6 +548,15 @@ class DNAAnalytics:
         else:
             self.tags[dino_name] = "blue" if self.total_needed_DNA[dino_name] > 0 else "orange"
 
+    def determine_all_tags(self) -> None:
+        """
+        Determines and assigns the tag of every unlocked dinosaur (see print_tags())
+        """
+        with Stats.phase("tags"):
+            for dino in self.current_dinos:
+                if dino not in self.needed_dinos:
+                    self.determine_tag(dino)
+
     def print_tags(self) -> str:
         """
         Prints out each unlocked dinosaur and its tag according to the following conditions:
@@ -251,10 +572,8 @@ class DNAAnalytics:
                 ...
         """
 
-        self.tags = {}
-        for dino in self.current_dinos:
-            if dino not in self.needed_dinos:
-                self.determine_tag(dino)
+        if not self.tags:
+            self.determine_all_tags()
 
         output_string = ""
         for dino_name in sorted(self.tags):
@@ -263,18 +582,49 @@ class DNAAnalytics:
 
         return output_string
 
-    def print_DNA_still_needed(self) -> str:
+    def simulate_needed_DNA(self, samples: int = None, seed: int = 0) -> dict[str : dict]:
+        """
+        Returns samples of the DNA needed to unlock each needed dinosaur when every fuse gives a random amount of DNA
+        (see FuseSimulation), starting from the dinosaurs' current levels and amounts
+
+        Parameters
+        ----------
+        samples : int
+            The number of samples (FuseSimulation.SAMPLES if None)
+        seed : int
+            The seed for the random generator, so the same seed always gives the same samples
+
+        Returns
+        -------
+        dict[str : dict[str : numpy.ndarray]]
+            A mapping of each needed dinosaur to the root dinosaurs it needs DNA from, mapped to the amount needed in each sample
+        """
+        import FuseSimulation
+        samples = FuseSimulation.SAMPLES if samples is None else samples
+        with Stats.phase("fuse_simulation"):
+            return FuseSimulation.simulate_needed_DNA(self.current_dinos, sorted(self.needed_dinos), self.get_default_levels(),
+                                                      self.get_default_amounts(), samples, seed)
+
+    def print_DNA_still_needed(self, simulate: bool = False) -> str:
         """
         Prints out each blue root dinosaur (see tags) and how much DNA is still required to get it
 
+        Parameters
+        ----------
+        simulate : bool
+            Whether to also print percentiles of the DNA required when fuse outcomes are random (see simulate_needed_DNA())
+
         Results
         ----------
         str
             An output of all dinosaurs and the amount of DNA still required to get in the following format:
                 dino_name1: amount
-                dino_name2: amount
+                dino_name2: amount (P50 amount, P90 amount)
                 ...
         """
+        if simulate:
+            import FuseSimulation
+            percentiles = FuseSimulation.get_percentiles(FuseSimulation.get_total_samples(self.simulate_needed_DNA()))
 
         output_string = ""
         rarities = ["Common", "Rare", "Epic", "Legendary", "Unique"]
@@ -284,7 +634,11 @@ class DNAAnalytics:
                             if self.current_dinos[dino_name].rarity_rank() == rarity_id and self.total_needed_DNA[dino_name] > 0],
                             key = lambda x: self.total_needed_DNA[x])
             for dino_name in dinos:
-                output_string += dino_name + ": " + str(self.total_needed_DNA[dino_name]) + "\n"
+                output_string += dino_name + ": " + str(self.total_needed_DNA[dino_name])
+                if simulate:
+                    output_string += " (" + ", ".join("P" + str(percentile) + " " + str(value) for percentile, value in
+                                                      zip(FuseSimulation.PERCENTILES, percentiles.get(dino_name, (0,)*len(FuseSimulation.PERCENTILES)))) + ")"
+                output_string += "\n"
 
         return output_string
     
@@ -300,44 +654,117 @@ class DNAAnalytics:
                 dino_name2: limiting_factor (amount, name)
                 ...
         """
-        output_string = ""
-        rarities = ["Common", "Rare", "Epic", "Legendary", "Unique", "Apex"]
-        for rarity_id in range(len(rarities)):
-            output_string += "\n" + rarities[rarity_id] + "\n"
-            percentages = {}
-            for dino_name in self.needed_dinos:
-                dino = self.current_dinos[dino_name]
-                if dino.rarity_rank() == rarity_id:
-                    max = 0
-                    max_dino = ""
-                    for root in self.ancestors[dino_name]:
-                        p = self.total_needed_DNA[root]
-                        if p > max:
-                            max = p
-                            max_dino = root
-                    if max != 0:
-                        percentages[dino_name] = (max_dino, max)
-
-            for i in sorted(percentages, key = lambda x: percentages[x][1]):
-                output_string += i + ": " + percentages[i][0] + ", " + str(percentages[i][1]) + ", " + self.current_dinos[percentages[i][0]].rarity + "\n"
-
-        b = {}
-        c = defaultdict(lambda: [])
-        for needed_dino in percentages:
-            for anc in self.ancestors[needed_dino]:
-                if anc in b:
+        with Stats.phase("limiting_factors"):
+            output_string = ""
+            rarities = ["Common", "Rare", "Epic", "Legendary", "Unique", "Apex"]
+            for rarity_id in range(len(rarities)):
+                output_string += "\n" + rarities[rarity_id] + "\n"
+                percentages = {}
+                for dino_name in self.needed_dinos:
+                    dino = self.current_dinos[dino_name]
+                    if dino.rarity_rank() == rarity_id:
+                        max = 0
+                        max_dino = ""
+                        for root in self.names_from_mask(self.ancestor_masks[dino_name]):
+                            p = self.total_needed_DNA[root]
+                            if p > max:
+                                max = p
+                                max_dino = root
+                        if max != 0:
+                            percentages[dino_name] = (max_dino, max)
+
+                for i in sorted(percentages, key = lambda x: percentages[x][1]):
+                    output_string += i + ": " + percentages[i][0] + ", " + str(percentages[i][1]) + ", " + self.current_dinos[percentages[i][0]].rarity + "\n"
+
+            b = {}
+            c = defaultdict(lambda: [])
+            seen_mask = 0
+            for needed_dino in percentages:
+                ancestor_mask = self.ancestor_masks[needed_dino]
+                for anc in self.names_from_mask(ancestor_mask & seen_mask):
                     c[needed_dino].append(b[anc][-1])
-                else:
-                    b[anc] = []
-                b[anc].append(needed_dino)
+                for anc in self.names_from_mask(ancestor_mask):
+                    b.setdefault(anc, []).append(needed_dino)
+                seen_mask |= ancestor_mask
         
-        for i in sorted(b):
-            print(i, b[i])
-        print()
-        for i in sorted(c):
-            print(i, c[i])
+            for i in sorted(b):
+                print(i, b[i])
+            print()
+            for i in sorted(c):
+                print(i, c[i])
         
         #return output_string
+
+    def get_unlock_forecast(self, window: int = None) -> dict[str : tuple[float, str]]:
+        """
+        Projects how many days it will take to unlock each needed dinosaur, given how fast the DNA of its root ancestors
+        has been collected recently (see Forecasting)
+        Each needed dinosaur is limited by its slowest root, i.e. the one that will take longest to collect all of its needed DNA
+
+        Parameters
+        ----------
+        window : int
+            The number of calendar days of recent history that rates are fitted on (Forecasting.FORECAST_WINDOW if None)
+
+        Returns
+        -------
+        dict[str : tuple[float, str]]
+            A mapping of needed dinosaur names to the number of days left (infinity if one of its roots isn't being
+            collected) and the name of its slowest root (None if it can be unlocked already)
+        """
+        import Forecasting
+        window = Forecasting.FORECAST_WINDOW if window is None else window
+        root_days = Forecasting.forecast_roots(self.history.dates, self.history.amount_history, self.total_needed_DNA, window)
+
+        forecast = {}
+        for dino_name in self.needed_dinos:
+            slowest_days = 0.0
+            slowest_root = None
+            for root in self.names_from_mask(self.ancestor_masks[dino_name]):
+                days_left = root_days.get(root, 0.0)
+                if days_left > slowest_days:
+                    slowest_days = days_left
+                    slowest_root = root
+            forecast[dino_name] = (slowest_days, slowest_root)
+        return forecast
+
+    def print_unlock_forecast(self, window: int = None) -> str:
+        """
+        Prints out each needed dinosaur and the date it's projected to be unlocked, sorted by rarity and then by date
+
+        Parameters
+        ----------
+        window : int
+            The number of calendar days of recent history that rates are fitted on (Forecasting.FORECAST_WINDOW if None)
+
+        Results
+        ----------
+        str
+            An output of all needed dinosaurs and their projected unlock date in the following format:
+                dino_name1: date (limited by name)
+                dino_name2: not at the current rate (limited by name)
+                ...
+        """
+        import Forecasting
+        forecast = self.get_unlock_forecast(window)
+        last_date = self.history.dates[-1] if self.history.dates else None
+
+        output_string = ""
+        rarities = ["Common", "Rare", "Epic", "Legendary", "Unique", "Apex"]
+        for rarity_id in range(len(rarities)):
+            output_string += "\n" + rarities[rarity_id] + "\n"
+            dinos = sorted([dino_name for dino_name in forecast if self.current_dinos[dino_name].rarity_rank() == rarity_id],
+                           key = lambda x: (forecast[x][0], x))
+            for dino_name in dinos:
+                days_left, slowest_root = forecast[dino_name]
+                if slowest_root is None:
+                    output_string += dino_name + ": ready to unlock\n"
+                    continue
+                projected_date = Forecasting.get_projected_date(days_left, last_date)
+                output_string += dino_name + ": " + (projected_date or "not at the current rate") + " (limited by " + slowest_root + ")\n"
+
+        return output_string
+
     def update_amount_history(self) -> None:
         """
         Send an update of needed amounts to the HistoryPlotting class instance
@@ -347,25 +774,109 @@ class DNAAnalytics:
     def select_dinos_for_display(self):
         """
         Determine which dinosaurs to display the account history for and display it via the HistoryPlotting instance
+        The graphs can also be saved to PNG or SVG files instead, which works without a display
         """
         print("Here are the options for which dinosaurs you can display amount history for:")
         print("1: A single dinosaur")
         print("2: The ancestors of a single dinosaur")
         print("3. All dinosaurs of a certain rarity")
+        print("4. Every rarity, each saved to its own image")
+        print("5. The ancestors of each needed dinosaur, each saved to its own image")
         user_input = int(input("Select the option you'd like by typing the number (i.e. 2): "))
         if user_input == 1:
             dino_name = input("Enter the dinosaur name you'd like the history for: ")
-            self.history.display_amount_history(set([dino_name]))
+            self.display_or_render(set([dino_name]), dino_name)
         elif user_input == 2:
             dino_name = input("Enter the descendant dinosaur name you'd like the ancestors' history for: ")
-            self.history.display_amount_history(self.ancestors[dino_name])
+            self.display_or_render(self.get_ancestors(dino_name), dino_name)
         elif user_input == 3:
             rarity = input("Enter the rarity that you'd like to see all the dinosaur amount history for: ")
-            dinos_with_rarity = set()
-            for dino_name in self.total_needed_DNA:
-                if self.current_dinos[dino_name].get_rarity() == rarity:
-                    dinos_with_rarity.add(dino_name)
-            self.history.display_amount_history(dinos_with_rarity)
+            self.display_or_render(self.get_dinos_with_rarity(rarity), rarity)
+        elif user_input == 4 or user_input == 5:
+            import HistoryRendering
+            file_format = input("Enter the image format (png or svg): ").strip().lower() or "png"
+            while file_format not in HistoryRendering.IMAGE_FORMATS:
+                file_format = input(file_format + " is not an image format. Enter png or svg: ").strip().lower() or "png"
+            if user_input == 4:
+                groups = {rarity: self.get_dinos_with_rarity(rarity[0]) for rarity in ["Common", "Rare", "Epic", "Legendary", "Unique"]}
+            else:
+                groups = {dino_name: self.get_ancestors(dino_name) for dino_name in sorted(self.needed_dinos)}
+            if not groups:
+                print("There are no needed dinosaurs to save images for.")
+                return
+            output_files = [HistoryRendering.get_file_name(title, file_format) for title in groups]
+            output_files = self.history.render_amount_history_groups(groups, output_files)
+            print("Saved " + str(len(output_files)) + " images (" + output_files[0] + " to " + output_files[-1] + ")")
+
+    def get_dinos_with_rarity(self, rarity: str) -> set[str]:
+        """
+        Returns the dinosaurs of a certain rarity that still need DNA (or have in the past)
+
+        Parameters
+        ----------
+        rarity : str
+            The rarity represented as the first letter of the rarity (e.g. Epic -> E)
+
+        Returns
+        -------
+        set[str]
+            The names of the dinosaurs with that rarity
+        """
+        dinos_with_rarity = set()
+        for dino_name in self.total_needed_DNA:
+            if self.current_dinos[dino_name].get_rarity() == rarity:
+                dinos_with_rarity.add(dino_name)
+        return dinos_with_rarity
+
+    def display_or_render(self, dinos_to_display: set[str], title: str) -> None:
+        """
+        Asks whether to display the amount history for the given dinos in a window or save it to an image file, then does so
+
+        Parameters
+        ----------
+        dinos_to_display : set[str]
+            A set of dinosaur names to display the amount history for
+        title : str
+            The title of the graph, which is also the file name if only an image format is entered
+        """
+        output_file = input("Enter a .png or .svg file to save the graph to (or just png or svg to name it after the graph), "
+                            "or nothing to display it: ").strip()
+        if output_file.lower() in ("png", "svg"):
+            import HistoryRendering
+            output_file = HistoryRendering.get_file_name(title, output_file.lower())
+        if output_file:
+            print("Saved " + self.history.render_amount_history(dinos_to_display, output_file, title))
+        else:
+            self.history.display_amount_history(dinos_to_display)
+
+    def ask_for_update(self) -> None:
+        """
+        Prompts the user for a dinosaur's new amount, and its level if it has changed, and recalculates only the needed DNA
+        that depends on it
+        Like in UpdatingInfo, a needed dinosaur leveled past its activation level is marked as unlocked
+        """
+        dino_name = input("Enter the name of the dinosaur that changed: ").strip()
+        if dino_name not in self.current_dinos:
+            print(dino_name + " is not a current dinosaur.")
+            return
+        user_input = input('Enter the correct amount for ' + dino_name + ', and the level if it has changed.\nAmount: ').split()
+        amount = int(user_input[0])
+        level = None if len(user_input) == 1 else int(user_input[1])
+
+        self.update_dino(dino_name, amount, level)
+        if level is not None and level > self.current_dinos[dino_name].activation_level():
+            self.unlock_dino(dino_name)
+
+    def ask_for_unlock(self) -> None:
+        """
+        Prompts the user for a needed dinosaur that has been unlocked and recalculates only the needed DNA of the targets
+        it shared ancestors with
+        """
+        dino_name = input("Enter the needed dinosaur you have unlocked: ").strip()
+        if dino_name not in self.needed_dinos:
+            print(dino_name + " is not a needed dinosaur.")
+            return
+        self.unlock_dino(dino_name)
 
     # def get_percentages(self) -> str:
     #     """
@@ -407,8 +918,19 @@ class DNAAnalytics:
 
 
 if __name__=='__main__':
-    current_dinos, needed_dinos = FileFunctions.create_dino_info()
-    x = DNAAnalytics(current_dinos, needed_dinos)
+    parser = argparse.ArgumentParser(description="Analyze the DNA needed for every needed dinosaur")
+    parser.add_argument("--engine", choices=ENGINES, default="recursive", help="the engine used to work out needed DNA")
+    parser.add_argument("--profile", action="store_true", help="print timings, call counts, and cache hit rates after each option")
+    parser.add_argument("--no-cache", action="store_true", help="work everything out again instead of loading saved results")
+    parser.add_argument("--targets", nargs="+", help="work out only these needed dinosaurs, loading only their recipe trees")
+    args = parser.parse_args()
+    if args.profile:
+        Stats.enable()
+
+    # Results for only some targets aren't saved to the cache, which holds the results for every needed dinosaur
+    cache_key = None if args.no_cache or args.targets else ResultCache.get_input_key(args.engine)
+    current_dinos, needed_dinos = FileFunctions.create_dino_info(set(args.targets) if args.targets else None)
+    x = DNAAnalytics(current_dinos, needed_dinos, args.engine, cache_key)
     print("Welcome to Data Analytics section of this project!")
     print("Here are some options of what you can get:")
     while True:
@@ -417,6 +939,10 @@ if __name__=='__main__':
         print("3. Get the most needed dinosaur for each needed dinosaur")
         print("4. Save your current dino amounts to the historical database")
         print("5. Display a history of DNA amounts")
+        print("6. Forecast when each needed dinosaur will be unlocked")
+        print("7. Get all the DNA still needed, with percentiles for random fuse outcomes")
+        print("8. Update a dinosaur's amount or level")
+        print("9. Mark a needed dinosaur as unlocked")
         user_input = int(input("Select the option you'd like by typing the number (i.e. 2): "))
         if user_input == 0:
             break
@@ -430,6 +956,19 @@ if __name__=='__main__':
             x.update_amount_history()
         elif user_input == 5:
             x.select_dinos_for_display()
+        elif user_input == 6:
+            print(x.print_unlock_forecast())
+        elif user_input == 7:
+            print(x.print_DNA_still_needed(simulate=True))
+        elif user_input == 8 or user_input == 9:
+            # Only the targets that depend on the change are worked out again, and the roster is saved right away
+            if user_input == 8:
+                x.ask_for_update()
+            else:
+                x.ask_for_unlock()
+            FileFunctions.save_dino_info(x.current_dinos, x.needed_dinos, remove_missing=args.targets is None)
+        if args.profile:
+            print(Stats.format_stats())
         print()
         print("If you're interested in running something else, simply type it again. Otherwise, type 0 to quit the program.")
  
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+A vectorized alternative to DNAAnalytics.get_needed_DNA
+
+Instead of recursing through each needed dinosaur's tree, the recipe tree is split into layers so that every dinosaur
+sits in a later layer than all of the dinosaurs that use it as a parent. Requests for DNA ("calls") are then passed from
+children to parents one layer at a time, with each layer handled by a handful of NumPy array operations.
+
+Shared dinosaurs hand out their DNA to whichever call reaches them first in the recursive version, so every call carries a
+key that sorts calls in the same order the recursion would have made them. This keeps the results identical.
+
+This is not a speedup over the recursive version. Every dinosaur in the trees still has to be numbered and looked up in
+Python once, which costs about as much as the recursion itself, so the two run at about the same speed on the large
+Benchmarks tiers and this one is slower on small rosters. It is kept as a cross-check of the recursive version.
+"""
+from collections import Counter
+
+import numpy as np
+
+import LevelCosts
+import Stats
+from Dino import Dino
+
+# Levels are never higher than this, so it can separate segments when taking a running maximum over sorted calls
+_LEVEL_OFFSET = 1 << 10
+
+
+def _index_trees(current_dinos: dict[str: Dino], targets: list[str]) -> tuple[list[str], dict[str : int], list[int], list[tuple[int, int]], list[int]]:
+    """
+    Numbers every dinosaur in the trees of the targets so that each dinosaur comes after both of its parents, collecting
+    what the propagation needs about each one in the same pass
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A current collection of dinosaur names mapped to their corresponding Dino objects
+    targets : list[str]
+        The names of the needed dinosaurs
+
+    Returns
+    -------
+    tuple[list[str], dict[str : int], list[int], list[tuple[int, int]], list[int]]
+        The names of the dinosaurs in topological order, a mapping of the names to their numbers, the rarity rank of each
+        dinosaur, the numbers of each hybrid's parents (None for roots), and the height of each dinosaur (the length of the
+        longest chain of parents above it)
+    """
+    names = []
+    node_ids = {}
+    ranks = []
+    parent_ids = []
+    heights = []
+    for target in targets:
+        if target in node_ids:
+            continue
+        stack = [(target, current_dinos[target])]
+        while stack:
+            dino_name, dino = stack[-1]
+            if dino.is_hybrid():
+                first_id = node_ids.get(dino.first)
+                if first_id is None:
+                    stack.append((dino.first, current_dinos[dino.first]))
+                    continue
+                second_id = node_ids.get(dino.second)
+                if second_id is None:
+                    stack.append((dino.second, current_dinos[dino.second]))
+                    continue
+                parent_ids.append((first_id, second_id))
+                heights.append(max(heights[first_id], heights[second_id])+1)
+            else:
+                parent_ids.append(None)
+                heights.append(0)
+            stack.pop()
+            node_ids[dino_name] = len(names)
+            names.append(dino_name)
+            ranks.append(dino.rarity_rank())
+    return names, node_ids, ranks, parent_ids, heights
+
+
+def propagate_needed_DNA(current_dinos: dict[str: Dino], targets: list[str],
+                         updated_levels: dict[str : int], updated_amounts: dict[str : int]) -> dict[str : Counter]:
+    """
+    Returns the DNA needed to unlock each of the targets, matching what DNAAnalytics.get_needed_DNA would return
+    for each target in the given order
+    Like the recursive version, the working levels and amounts of every dinosaur used are updated in place
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A current collection of dinosaur names mapped to their corresponding Dino objects
+    targets : list[str]
+        The names of the needed dinosaurs, in the order their DNA should be worked out
+    updated_levels : dict[str : int]
+        A mapping of dinosaur names to their working level
+    updated_amounts : dict[str : int]
+        A mapping of dinosaur names to their working amount
+
+    Returns
+    -------
+    dict[str : Counter]
+        A mapping of each target to the amounts of root dinosaur DNA it still needs
+    """
+    results = {target: Counter() for target in targets}
+    if not targets:
+        return results
+
+    # Number every dinosaur in the trees and store its information in arrays
+    # Everything about a dinosaur is gathered in a single pass over the trees, since the Python work done per dinosaur is
+    # most of the cost
+    names, node_ids, rank_list, parent_list, heights = _index_trees(current_dinos, targets)
+    node_count = len(names)
+    ranks = np.array(rank_list, dtype=np.int64)
+    activation_levels = 5*ranks
+    levels = np.fromiter(map(updated_levels.__getitem__, names), dtype=np.int64, count=node_count)
+    amounts = np.fromiter(map(updated_amounts.__getitem__, names), dtype=np.int64, count=node_count)
+    parents = np.full((node_count, 2), -1, dtype=np.int64)
+    hybrid_ids = [node_id for node_id, parent_ids in enumerate(parent_list) if parent_ids]
+    if hybrid_ids:
+        parents[hybrid_ids] = [parent_list[node_id] for node_id in hybrid_ids]
+    is_hybrid = parents[:, 0] >= 0
+    rank_count = len(LevelCosts.RARITY_RANKS)
+    fuse_costs = np.array([[LevelCosts.parent_DNA_per_fuse(parent_rank, child_rank) for child_rank in range(rank_count)]
+                           for parent_rank in range(rank_count)], dtype=np.int64)
+    parent_DNA_per_fuse = np.where(is_hybrid[:, None], fuse_costs[ranks[parents], ranks[:, None]], 0)
+    level_prefix_sums = np.array(LevelCosts.LEVEL_PREFIX_SUMS, dtype=np.int64)
+
+    # Every dinosaur is taller than its parents, so placing the tallest dinosaurs in the first layer puts every dinosaur in a
+    # later layer than all of its children
+    layer_count = max(heights)+1
+    layers = layer_count-1 - np.array(heights, dtype=np.int64)
+
+    # Each call's key is its target's position followed by the parent choices (first = 0, second = 1) made on the way down,
+    # so sorting by key gives the order the recursive version would visit the calls in
+    depth_bits = layer_count
+    if (len(targets) << depth_bits).bit_length() >= 63:
+        raise ValueError("Too many targets or too deep a recipe tree for the wavefront engine")
+
+    pending = [[] for _ in range(layer_count)]
+    target_ids = np.array([node_ids[target] for target in targets], dtype=np.int64)
+    start_calls = (target_ids, activation_levels[target_ids]+1, np.zeros(len(targets), dtype=np.int64),
+                   np.arange(len(targets), dtype=np.int64) << depth_bits, np.zeros(len(targets), dtype=np.int64))
+    for layer in np.unique(layers[target_ids]):
+        in_layer = layers[target_ids] == layer
+        pending[layer].append(tuple(column[in_layer] for column in start_calls))
+
+    root_nodes = []
+    root_keys = []
+    root_deficits = []
+    for layer in range(layer_count):
+        if not pending[layer]:
+            continue
+        call_nodes, call_levels, call_amounts, call_keys, call_depths = (np.concatenate(column) for column in zip(*pending[layer]))
+        pending[layer] = None
+        if Stats.enabled:
+            Stats.count("wavefront.calls", len(call_nodes))
+
+        # Sort the calls by dinosaur, then by the order the recursion would reach them
+        order = np.lexsort((call_keys, call_nodes))
+        call_nodes, call_levels, call_amounts, call_keys, call_depths = \
+            call_nodes[order], call_levels[order], call_amounts[order], call_keys[order], call_depths[order]
+        segment_starts = np.flatnonzero(np.r_[True, call_nodes[1:] != call_nodes[:-1]])
+        segment_ids = np.cumsum(np.r_[False, call_nodes[1:] != call_nodes[:-1]])
+        segment_nodes = call_nodes[segment_starts]
+
+        # Account for the DNA required to get each requested level, given the highest level requested before it
+        start_levels = levels[call_nodes]
+        offset = segment_ids*_LEVEL_OFFSET
+        reached_levels = np.maximum.accumulate(np.maximum(call_levels, start_levels)+offset)-offset
+        previous_levels = np.r_[start_levels[:1], reached_levels[:-1]]
+        previous_levels[segment_starts] = start_levels[segment_starts]
+        call_ranks = ranks[call_nodes]
+        needed_amounts = call_amounts + level_prefix_sums[call_ranks, reached_levels] - level_prefix_sums[call_ranks, previous_levels]
+
+        # Account for the DNA that each dinosaur already has, used up by the calls in order
+        running_totals = np.cumsum(needed_amounts)
+        segment_totals = np.add.reduceat(needed_amounts, segment_starts)
+        running_totals -= np.repeat(running_totals[segment_starts]-needed_amounts[segment_starts], np.diff(np.r_[segment_starts, len(call_nodes)]))
+        deficits = np.clip(running_totals-amounts[call_nodes], 0, needed_amounts)
+
+        segment_ends = np.r_[segment_starts[1:], len(call_nodes)]-1
+        levels[segment_nodes] = reached_levels[segment_ends]
+        amounts[segment_nodes] = np.maximum(amounts[segment_nodes]-segment_totals, 0)
+
+        # Roots keep their deficits, while hybrids translate theirs into calls to their parents
+        short = deficits > 0
+        root_calls = short & ~is_hybrid[call_nodes]
+        root_nodes.append(call_nodes[root_calls])
+        root_keys.append(call_keys[root_calls])
+        root_deficits.append(deficits[root_calls])
+
+        hybrid_calls = short & is_hybrid[call_nodes]
+        child_nodes = call_nodes[hybrid_calls]
+        fuses = -(-deficits[hybrid_calls] // LevelCosts.DNA_PER_FUSE)
+        child_depths = call_depths[hybrid_calls]+1
+        for side in range(2):
+            parent_nodes = parents[child_nodes, side]
+            parent_calls = (parent_nodes, activation_levels[child_nodes], parent_DNA_per_fuse[child_nodes, side]*fuses,
+                            call_keys[hybrid_calls] | (side << (depth_bits-child_depths)), child_depths)
+            parent_layers = layers[parent_nodes]
+            for parent_layer in np.unique(parent_layers):
+                in_layer = parent_layers == parent_layer
+                pending[parent_layer].append(tuple(column[in_layer] for column in parent_calls))
+
+    # Store the working levels and amounts back
+    updated_levels.update(zip(names, levels.tolist()))
+    updated_amounts.update(zip(names, amounts.tolist()))
+
+    # Add up the deficits of the roots for each target
+    root_nodes = np.concatenate(root_nodes)
+    root_targets = np.concatenate(root_keys) >> depth_bits
+    root_deficits = np.concatenate(root_deficits)
+    if not len(root_deficits):
+        return results
+    pairs, pair_ids = np.unique(np.stack((root_targets, root_nodes)), axis=1, return_inverse=True)
+    pair_totals = np.zeros(pairs.shape[1], dtype=np.int64)
+    np.add.at(pair_totals, pair_ids.ravel(), root_deficits)
+    for (target_id, node_id), total in zip(pairs.T, pair_totals):
+        results[targets[target_id]][names[node_id]] += int(total)
+    return results
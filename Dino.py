@@ -1,3 +1,6 @@
+import sys
+import LevelCosts
+
 class Dino:
     """
     A class that keeps track of a dinosaur and all its needed information
@@ -31,6 +34,10 @@ class Dino:
     TODO
 
     """
+    # Dinos are stored in slots rather than a per-instance __dict__ since large rosters hold thousands of them,
+    # and the rarity rank is cached when the rarity is set since it is looked up in nearly every calculation
+    __slots__ = ("name", "lvl", "amount", "first", "second", "_rarity", "_rank")
+
     def __init__(self, data_list: list) -> None:
         """
         Initializes a dino with the given data
@@ -47,13 +54,27 @@ class Dino:
                 Second parent of dinosaur (str) (optional)
         """
         if len(data_list) == 4:
-            self.name, self.lvl, self.amount, self.rarity = data_list
+            name, lvl, amount, self.rarity = data_list
             self.first = None
             self.second = None
         else:
-            self.name, self.lvl, self.amount, self.rarity, self.first, self.second = data_list
-        self.lvl = int(self.lvl)
-        self.amount = int(self.amount)
+            name, lvl, amount, self.rarity, first, second = data_list
+            self.set_parents((first, second))
+        self.name = sys.intern(name)
+        self.lvl = int(lvl)
+        self.amount = int(amount)
+
+    @property
+    def rarity(self) -> str:
+        """
+        The rarity of the dinosaur represented as the first letter of the rarity (e.g. Epic -> E)
+        """
+        return self._rarity
+
+    @rarity.setter
+    def rarity(self, rarity: str) -> None:
+        self._rarity = rarity
+        self._rank = LevelCosts.rarity_rank(rarity)
 
     # def updateInfo(self, newDNA, newLvl, newRarity):
     #     self.amount = newDNA
@@ -70,8 +91,8 @@ class Dino:
             The names of the two parents, stored as strings in a tuple
         """
         
-        self.first = parents[0]
-        self.second = parents[1]
+        self.first = sys.intern(parents[0]) if parents[0] else None
+        self.second = sys.intern(parents[1]) if parents[1] else None
 
     def is_hybrid(self) -> bool:
         """
@@ -175,19 +196,7 @@ class Dino:
         int
             The integer value of the rarity
         """
-        if self.rarity == "C":
-            return 0
-        if self.rarity == "R":
-            return 1
-        if self.rarity == "E":
-            return 2
-        if self.rarity == "L":
-            return 3
-        if self.rarity == "U":
-            return 4
-        if self.rarity == "A":
-            return 5
-        return 0
+        return self._rank
 
     def DNA_for_one_lvl(self, lvl):
         """
@@ -203,19 +212,7 @@ class Dino:
         int
             The amount of DNA required to level up
         """
-        
-        diff = lvl - self.activation_level()
-        if diff == 0:
-            return self.activation_amount()
-        if diff < 8:
-            return (50*diff)+50
-        if diff < 9:
-            return (100*diff)-300
-        if diff < 13:
-            return (250*diff)-1500
-        if diff < 17:
-            return (500*diff)-4500
-        return 10*self.DNA_for_one_lvl(lvl-10)
+        return LevelCosts.DNA_for_one_lvl(self.rarity_rank(), lvl)
     
     def DNA_to_certain_level(self, start_level, final_level):
         """
@@ -231,12 +228,27 @@ class Dino:
         int
             The amount of DNA required to reach the given level
         """
-        total_amount = 0
-        level = start_level
-        while level < final_level:
-            total_amount += self.DNA_for_one_lvl(level)
-            level += 1
-        return total_amount
+        return LevelCosts.DNA_between_levels(self.rarity_rank(), start_level, final_level)
+
+    def level_reachable_with(self, amount: int, start_level: int = None) -> int:
+        """
+        Returns the highest level the dino can reach with the given amount of DNA
+
+        Parameters
+        ----------
+        amount : int
+            The amount of DNA available for leveling
+        start_level : int
+            The level to start leveling from (defaults to the dino's current level)
+
+        Returns
+        -------
+        int
+            The highest level that the DNA can pay for
+        """
+        if start_level is None:
+            start_level = self.lvl
+        return LevelCosts.levels_for_DNA(self.rarity_rank(), start_level, amount)
     
     def get_parents(self) -> list[str]:
         return [self.first, self.second]
@@ -0,0 +1,222 @@
+from Dino import Dino
+
+class DinoRoster(dict):
+    """
+    A dictionary of dinosaur names mapped to their Dino objects that also keeps a reverse recipe index,
+    mapping each dinosaur to the hybrids it is a parent of
+    The index is kept up to date as dinosaurs are added to or removed from the roster
+    ...
+
+    Attributes
+    ----------
+    children : dict[str : set[str]]
+        A mapping of dinosaur names to the names of the hybrids that use them as a parent
+
+    Methods
+    -------
+    set_parents()
+        Sets the parents of a dinosaur in the roster and updates the index
+    get_children()
+        Returns the names of the hybrids that use a dinosaur as a parent
+    has_children()
+        Returns whether any hybrid in the roster uses a dinosaur as a parent
+    build_consumer_index()
+        Returns the hybrids that consume each ancestor in the targets' trees, and the level the ancestor needs for fusing
+    get_trees()
+        Returns a new roster with only the given dinosaurs and the dinosaurs in their recipe trees
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initializes the roster the same way as a dictionary and builds the reverse recipe index
+
+        Parameters
+        ----------
+        args, kwargs
+            A mapping or iterable of dinosaur names and Dino objects, as accepted by dict()
+        """
+        super().__init__()
+        self.children = {}
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __setitem__(self, dino_name: str, dino: Dino) -> None:
+        if dino_name in self:
+            self._unlink(dino_name)
+        super().__setitem__(dino_name, dino)
+        self._link(dino_name)
+
+    def __delitem__(self, dino_name: str) -> None:
+        self._unlink(dino_name)
+        super().__delitem__(dino_name)
+
+    def pop(self, dino_name: str, *default) -> Dino:
+        if dino_name in self:
+            self._unlink(dino_name)
+        return super().pop(dino_name, *default)
+
+    def popitem(self) -> tuple[str, Dino]:
+        if not self:
+            raise KeyError("popitem(): roster is empty")
+        dino_name = next(reversed(self))
+        return dino_name, self.pop(dino_name)
+
+    def setdefault(self, dino_name: str, dino: Dino = None) -> Dino:
+        if dino_name not in self:
+            self[dino_name] = dino
+        return self[dino_name]
+
+    def update(self, *args, **kwargs) -> None:
+        for dino_name, dino in dict(*args, **kwargs).items():
+            self[dino_name] = dino
+
+    def clear(self) -> None:
+        super().clear()
+        self.children.clear()
+
+    def copy(self) -> "DinoRoster":
+        return self.__class__(self)
+
+    def _link(self, dino_name: str) -> None:
+        """
+        Adds a dinosaur to the children of each of its parents in the index
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur to add
+        """
+        dino = self[dino_name]
+        if dino is not None and dino.is_hybrid():
+            for parent in dino.get_parents():
+                self.children.setdefault(parent, set()).add(dino_name)
+
+    def _unlink(self, dino_name: str) -> None:
+        """
+        Removes a dinosaur from the children of each of its parents in the index
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur to remove
+        """
+        dino = self[dino_name]
+        if dino is not None and dino.is_hybrid():
+            for parent in dino.get_parents():
+                parent_children = self.children.get(parent)
+                if parent_children is not None:
+                    parent_children.discard(dino_name)
+                    if not parent_children:
+                        del self.children[parent]
+
+    def set_parents(self, dino_name: str, parents: tuple[str, str]) -> None:
+        """
+        Sets the parents of a dinosaur in the roster and updates the index
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+        parents : tuple[str, str]
+            The names of the two parents, stored as strings in a tuple
+        """
+        self._unlink(dino_name)
+        self[dino_name].set_parents(parents)
+        self._link(dino_name)
+
+    def get_children(self, dino_name: str) -> set[str]:
+        """
+        Returns the names of the hybrids that use the given dinosaur as a parent
+        The returned set belongs to the index and should not be modified
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the parent dinosaur
+
+        Returns
+        -------
+        set[str]
+            The names of the hybrids that use the dinosaur as a parent
+        """
+        return self.children.get(dino_name, set())
+
+    def has_children(self, dino_name: str) -> bool:
+        """
+        Returns whether any hybrid in the roster uses the given dinosaur as a parent
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the parent dinosaur
+
+        Returns
+        -------
+        bool
+            Whether or not the dinosaur is still a parent of another dinosaur
+        """
+        return dino_name in self.children
+
+    def get_trees(self, targets) -> "DinoRoster":
+        """
+        Returns a new roster with only the given dinosaurs and every dinosaur in their recipe trees
+        The Dino objects are shared with this roster
+
+        Parameters
+        ----------
+        targets : iterable of str
+            The names of the target dinosaurs (names that aren't in the roster are skipped)
+
+        Returns
+        -------
+        DinoRoster
+            The dinosaurs in the targets' trees
+        """
+        tree = set()
+        stack = [target for target in targets if target in self]
+        while stack:
+            dino_name = stack.pop()
+            if dino_name in tree:
+                continue
+            tree.add(dino_name)
+            if self[dino_name].is_hybrid():
+                stack.extend(self[dino_name].get_parents())
+        return DinoRoster((dino_name, self[dino_name]) for dino_name in tree)
+
+    def build_consumer_index(self, targets) -> dict[tuple[str, str] : tuple[list[str], int]]:
+        """
+        Walks the tree of each target once and indexes, for every ancestor in it, the hybrids in that tree that are fused
+        directly from the ancestor and the level the ancestor needs to reach to fuse all of them
+        The index is a snapshot, so it should be rebuilt after the roster changes
+
+        Parameters
+        ----------
+        targets : iterable of str
+            The names of the target dinosaurs
+
+        Returns
+        -------
+        dict[tuple[str, str] : tuple[list[str], int]]
+            A mapping of (ancestor, target) pairs to the names of the consuming hybrids, ordered from highest to lowest
+            activation level, and the highest of those activation levels (the fuse level)
+        """
+        index = {}
+        for target in targets:
+            consumers = {}
+            visited = {target}
+            stack = [target]
+            while stack:
+                dino = self[stack.pop()]
+                if not dino.is_hybrid():
+                    continue
+                for parent in set(dino.get_parents()):
+                    consumers.setdefault(parent, []).append(dino)
+                    if parent not in visited:
+                        visited.add(parent)
+                        stack.append(parent)
+            for ancestor, children in consumers.items():
+                children.sort(key=lambda child: (-child.activation_level(), child.name))
+                index[(ancestor, target)] = ([child.name for child in children], children[0].activation_level())
+        return index
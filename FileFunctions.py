@@ -1,42 +1,469 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 from Dino import Dino
+from DinoRoster import DinoRoster
+import LevelCosts
+import Stats
 
-def create_dino_info() -> tuple[dict[str: Dino], set[str]]:
+# Either "text" for the .txt files or "sqlite" for the database in SQLiteStorage
+STORAGE_BACKEND = os.environ.get("JWA_STORAGE", "text")
+
+CURRENT_DINOS_FILE = "CurrentDinos.txt"
+RECIPES_FILE = "DinoRecipes.txt"
+NEEDED_DINOS_FILE = "DinosToGet.txt"
+
+# The digest and lines of what each file held when it was last read or written, keyed by absolute path, used to skip
+# rewriting files that haven't changed and to count the changed records without reading the file again
+saved_files = {}
+
+def create_dino_info(targets: set[str] = None) -> tuple[DinoRoster, set[str]]:
     """
-    Grabs current dinosaur information from CurrentDinos.txt, recipes from DinoRecipes.txt, and needed dinosaurs from DinosToGet.txt
+    Grabs current dinosaur information, recipes, and needed dinosaurs from the selected storage backend
     Makes a set of needed dinos, as well as a dictionary that maps names of current dinos to the Dino objects
+    The dictionary is a DinoRoster, which also indexes which hybrids each dinosaur is a parent of
+    If targets are provided, only those needed dinosaurs and the dinosaurs in their recipe trees are kept (the SQLite backend
+    only reads those rows), and the result has to be saved with save_dino_info(remove_missing=False)
+
+    Parameters
+    ----------
+    targets : set[str]
+        The names of the needed dinosaurs to load (all of them if None)
 
     Returns
     -------
-    dict[str: Dino]
+    DinoRoster
         A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
     set[str]
         A set of needed dinosaur names
     """
+    with Stats.phase("create_dino_info"):
+        if STORAGE_BACKEND == "sqlite":
+            import SQLiteStorage
+            return SQLiteStorage.create_dino_info(targets=targets)
+        current_dinos, needed_dinos = read_text_dino_info()
+        if targets is None:
+            return current_dinos, needed_dinos
+        return current_dinos.get_trees(targets), needed_dinos & set(targets)
+
+
+class RosterFormatError(ValueError):
+    """
+    An error for a malformed line in one of the roster files
+    ...
+
+    Attributes
+    ----------
+    file_name : str
+        The name of the file with the malformed line
+    line_number : int
+        The line number of the malformed line (starting at 1)
+    """
+
+    def __init__(self, file_name: str, line_number: int, message: str) -> None:
+        """
+        Initializes the error with the location of the malformed line
+
+        Parameters
+        ----------
+        file_name : str
+            The name of the file with the malformed line
+        line_number : int
+            The line number of the malformed line (starting at 1)
+        message : str
+            A description of what is wrong with the line
+        """
+        super().__init__(file_name + ", line " + str(line_number) + ": " + message)
+        self.file_name = file_name
+        self.line_number = line_number
+
+
+def iter_lines(file_name: str):
+    """
+    Reads a file one line at a time, remembering a digest of its contents and its lines in saved_files once the whole file
+    has been read
+    Blank lines are skipped
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Yields
+    ------
+    tuple[int, str]
+        The line number (starting at 1) and the line without its line ending
+    """
+    path = os.path.abspath(file_name)
+    digest = hashlib.sha1()
+    lines = []
+    file_reader = open(file_name, "r")
+    try:
+        for line_number, line in enumerate(file_reader, 1):
+            line = line.rstrip('\n')
+            # The digest covers the same text save_lines() writes: the lines joined by newlines, with no newline at the end
+            digest.update(("\n" if line_number > 1 else "").encode() + line.encode())
+            lines.append(line)
+            if line.strip():
+                yield line_number, line
+    finally:
+        file_reader.close()
+    saved_files[path] = (digest.hexdigest(), lines)
+
+
+def iter_dino_records(file_name: str = CURRENT_DINOS_FILE):
+    """
+    Reads dinosaurs from a file in the CurrentDinos.txt format ("name level amount rarity") one line at a time
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Yields
+    ------
+    tuple[int, Dino]
+        The line number of the dinosaur and its Dino object
+
+    Raises
+    ------
+    RosterFormatError
+        If a line is not in the expected format
+    """
+    for line_number, line in iter_lines(file_name):
+        fields = line.split(' ')
+        if len(fields) != 4:
+            raise RosterFormatError(file_name, line_number, "expected 'name level amount rarity' but got '" + line + "'")
+        name, level, amount, rarity = fields
+        if not level.isdigit() or not amount.isdigit():
+            raise RosterFormatError(file_name, line_number, "the level and amount of " + name + " must be whole numbers")
+        if rarity not in LevelCosts.RARITY_RANKS:
+            raise RosterFormatError(file_name, line_number, "unknown rarity '" + rarity + "' for " + name)
+        yield line_number, Dino(fields)
+
+
+def iter_recipe_records(file_name: str = RECIPES_FILE):
+    """
+    Reads recipes from a file in the DinoRecipes.txt format ("child: first second") one line at a time
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Yields
+    ------
+    tuple[int, str, str, str]
+        The line number of the recipe, the child, and its first and second parents
+
+    Raises
+    ------
+    RosterFormatError
+        If a line is not in the expected format
+    """
+    for line_number, line in iter_lines(file_name):
+        child, separator, parent_string = line.partition(': ')
+        parents = parent_string.split(' ')
+        if not separator or not child or len(parents) != 2 or not all(parents):
+            raise RosterFormatError(file_name, line_number, "expected 'child: first second' but got '" + line + "'")
+        yield line_number, child, parents[0], parents[1]
+
+
+def iter_needed_records(file_name: str = NEEDED_DINOS_FILE):
+    """
+    Reads needed dinosaur names from a file in the DinosToGet.txt format (one name per line) one line at a time
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Yields
+    ------
+    tuple[int, str]
+        The line number and the name of the needed dinosaur
+
+    Raises
+    ------
+    RosterFormatError
+        If a line is not in the expected format
+    """
+    for line_number, line in iter_lines(file_name):
+        if ' ' in line:
+            raise RosterFormatError(file_name, line_number, "expected a single dinosaur name but got '" + line + "'")
+        yield line_number, line
+
+
+def _parse_update_row(file_name: str, row_number: int, row) -> tuple[str, int, int]:
+    """
+    Checks a row from an update file and returns the name, amount, and level in it
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the update file
+    row_number: int
+        The line or row number of the row (starting at 1)
+    row: list | dict
+        The row, either as a list of [name, amount, level] or as an object with "name", "amount", and "level" keys
+        (the level is optional in both)
+
+    Returns
+    -------
+    tuple[str, int, int]
+        The name, the new amount, and the new level (None if the level shouldn't change)
+
+    Raises
+    ------
+    RosterFormatError
+        If the row is not in the expected format
+    """
+    if isinstance(row, dict):
+        row = [row.get("name"), row.get("amount"), row.get("level")]
+    if not isinstance(row, list) or not 2 <= len(row) <= 3:
+        raise RosterFormatError(file_name, row_number, "expected 'name, amount[, level]' but got " + repr(row))
+    if len(row) == 2 or row[2] in (None, ''):
+        row = row[:2] + [None]
+    name, amount, level = row
+    try:
+        amount = int(amount)
+        level = None if level is None else int(level)
+    except (TypeError, ValueError):
+        raise RosterFormatError(file_name, row_number, "the amount and level of " + str(name) + " must be whole numbers")
+    if not name or amount < 0 or (level is not None and level < 0):
+        raise RosterFormatError(file_name, row_number, "expected 'name, amount[, level]' but got " + repr(row))
+    return str(name).strip(), amount, level
+
+
+def iter_update_records(file_name: str):
+    """
+    Reads new dinosaur amounts and levels from a CSV, JSON, or JSON Lines file, chosen by its extension
+        CSV: rows of "name,amount[,level]", with an optional "name,amount,level" header
+        JSON: a list of [name, amount, level] lists or {"name": ..., "amount": ..., "level": ...} objects
+        JSON Lines: one such list or object per line
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Yields
+    ------
+    tuple[int, str, int, int]
+        The row number, the name, the new amount, and the new level (None if the level shouldn't change)
+
+    Raises
+    ------
+    RosterFormatError
+        If the file or one of its rows is not in the expected format
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    file_reader = open(file_name, "r", newline='')
+    try:
+        if extension == ".json":
+            try:
+                rows = json.load(file_reader)
+            except json.JSONDecodeError as error:
+                raise RosterFormatError(file_name, error.lineno, error.msg)
+            if not isinstance(rows, list):
+                raise RosterFormatError(file_name, 1, "expected a list of updates")
+            for row_number, row in enumerate(rows, 1):
+                yield (row_number,) + _parse_update_row(file_name, row_number, row)
+        elif extension == ".jsonl":
+            for row_number, line in enumerate(file_reader, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as error:
+                    raise RosterFormatError(file_name, row_number, error.msg)
+                yield (row_number,) + _parse_update_row(file_name, row_number, row)
+        elif extension == ".csv":
+            csv_reader = csv.reader(file_reader)
+            for row in csv_reader:
+                row = [field.strip() for field in row]
+                if not any(row) or row[0].lower() == "name":
+                    continue
+                yield (csv_reader.line_num,) + _parse_update_row(file_name, csv_reader.line_num, row)
+        else:
+            raise RosterFormatError(file_name, 0, "updates must be in a .csv, .json, or .jsonl file")
+    finally:
+        file_reader.close()
+
+
+def read_text_dino_info(current_dinos_file: str = CURRENT_DINOS_FILE, recipes_file: str = RECIPES_FILE,
+                        needed_dinos_file: str = NEEDED_DINOS_FILE) -> tuple[DinoRoster, set[str]]:
+    """
+    Grabs current dinosaur information from CurrentDinos.txt, recipes from DinoRecipes.txt, and needed dinosaurs from DinosToGet.txt
+    Each file is read one line at a time, and every line is checked as it is read
+
+    Parameters
+    ----------
+    current_dinos_file: str
+        The name of the file with the current dinosaurs
+    recipes_file: str
+        The name of the file with the recipes
+    needed_dinos_file: str
+        The name of the file with the needed dinosaurs
+
+    Returns
+    -------
+    DinoRoster
+        A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
+    set[str]
+        A set of needed dinosaur names
+
+    Raises
+    ------
+    RosterFormatError
+        If a line is malformed, a dinosaur is listed twice, or a recipe or needed dinosaur names an unknown dinosaur
+    """
 
     # Adds each dinosaur from CurrentDinos.txt into self.current_dinos as a map from a name to a Dino object
-    dino_reader = open("CurrentDinos.txt", "r")
-    current_dinos = {i.split(' ')[0]: Dino(i.split(' ')) for i in dino_reader.read().split('\n')}
-    dino_reader.close()
+    current_dinos = DinoRoster()
+    for line_number, dino in iter_dino_records(current_dinos_file):
+        if dino.name in current_dinos:
+            raise RosterFormatError(current_dinos_file, line_number, dino.name + " is listed more than once")
+        current_dinos[dino.name] = dino
 
     # Takes each pair of parents from DinoRecipes.txt and adds them to the corresponding child in self.current_dinos
-    dino_reader = open("DinoRecipes.txt", "r")
-    for recipe in dino_reader.read().split("\n"):
-        child, parent_string = recipe.split(': ')
-        parents = parent_string.split(' ')
-        current_dinos[child].set_parents(parents)
-    dino_reader.close()
+    for line_number, child, first, second in iter_recipe_records(recipes_file):
+        for dino_name in (child, first, second):
+            if dino_name not in current_dinos:
+                raise RosterFormatError(recipes_file, line_number, "unknown dinosaur " + dino_name)
+        current_dinos.set_parents(child, (first, second))
 
     # Adds each needed dinosaur from DinosToGet.txt to self.needed_dinos
-    dino_reader = open("DinosToGet.txt", "r")
-    needed_dinos = set(dino_reader.read().split("\n"))
-    dino_reader.close()
+    needed_dinos = set()
+    for line_number, dino_name in iter_needed_records(needed_dinos_file):
+        if dino_name not in current_dinos:
+            raise RosterFormatError(needed_dinos_file, line_number, "unknown dinosaur " + dino_name)
+        needed_dinos.add(dino_name)
 
     return current_dinos, needed_dinos
 
 
-def save_dino_info(current_dinos, needed_dinos) -> None:
+def read_lines(file_name: str) -> list[str]:
+    """
+    Returns the lines of a file, or an empty list if the file doesn't exist
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to read
+
+    Returns
+    -------
+    list[str]
+        The lines of the file
+    """
+    if not os.path.exists(file_name):
+        return []
+    file_reader = open(file_name, "r")
+    lines = file_reader.read().split("\n")
+    file_reader.close()
+    return lines
+
+
+def write_file_atomically(file_name: str, output: str) -> None:
+    """
+    Writes the output to a temporary file next to the given file and then moves it into place,
+    so the file either keeps its old contents or gets all of the new ones, even if the program stops partway through
+    The file keeps its permissions (or gets the usual permissions for a new file, if it didn't exist)
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to write
+    output: str
+        The new contents of the file
+    """
+    file_descriptor, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_name)), prefix=os.path.basename(file_name), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as dino_writer:
+            dino_writer.write(output)
+            dino_writer.flush()
+            os.fsync(dino_writer.fileno())
+        # mkstemp only lets the owner read and write the temporary file, which would otherwise replace the file's permissions
+        if os.path.exists(file_name):
+            shutil.copymode(file_name, temp_name)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_name, 0o666 & ~umask)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def count_changed_records(old_lines: list[str], new_lines: list[str]) -> int:
+    """
+    Returns the number of records (keyed by the first word of each line) that were added, changed, or removed
+
+    Parameters
+    ----------
+    old_lines: list[str]
+        The lines the file currently holds
+    new_lines: list[str]
+        The lines that should be saved
+
+    Returns
+    -------
+    int
+        The number of records that differ between the two
+    """
+    old_records = {line.split(' ')[0]: line for line in old_lines if line}
+    new_records = {line.split(' ')[0]: line for line in new_lines if line}
+    return sum(old_records.get(key) != new_records.get(key) for key in old_records.keys() | new_records.keys())
+
+
+def save_lines(file_name: str, lines: list[str]) -> int:
+    """
+    Saves the lines to the given file, but only if they differ from what the file held when it was last read or written
+
+    Parameters
+    ----------
+    file_name: str
+        The name of the file to save
+    lines: list[str]
+        The lines that should be saved
+
+    Returns
+    -------
+    int
+        The number of records that were written (0 if the file was left alone)
+    """
+    output = '\n'.join(lines)
+    digest = hashlib.sha1(output.encode()).hexdigest()
+    path = os.path.abspath(file_name)
+    if not os.path.exists(file_name):
+        old_digest, old_lines = None, []
+    elif path in saved_files:
+        old_digest, old_lines = saved_files[path]
+    else:
+        # The file hasn't been read yet, so read it once, dropping the empty line after a final newline like iter_lines() does
+        old_lines = read_lines(file_name)
+        if old_lines and not old_lines[-1]:
+            old_lines.pop()
+        old_digest = hashlib.sha1('\n'.join(old_lines).encode()).hexdigest()
+    if old_digest == digest:
+        return 0
+    records_written = count_changed_records(old_lines, lines)
+    write_file_atomically(file_name, output)
+    saved_files[path] = (digest, list(lines))
+    return records_written
+
+
+def save_dino_info(current_dinos, needed_dinos, remove_missing: bool = True) -> int:
     """
     Writes each list of dinosaurs (needed, current, and their recipes) as output strings and saves them to their corresponding files
+    Files whose contents haven't changed are left alone, and every file is replaced atomically
+    With the SQLite backend, the records are upserted into the database instead
 
     Parameters
     ----------
@@ -44,19 +471,31 @@ def save_dino_info(current_dinos, needed_dinos) -> None:
         A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
     needed_dinos: set[str]
         A set of needed dinosaur names
-    """
-    needed_dinos_output = '\n'.join(sorted(needed_dinos))
-    current_dinos_output = '\n'.join(sorted([current_dinos[dino].to_string() for dino in current_dinos]))
-    recipe_output = '\n'.join(sorted([current_dinos[dino].parent_to_string() for dino in current_dinos if current_dinos[dino].is_hybrid()]))
+    remove_missing: bool
+        Whether dinosaurs that aren't in current_dinos are removed; turn this off to save a roster that was loaded for only
+        some targets (see create_dino_info()), which updates the dinosaurs it has and leaves every other dinosaur alone
 
-    dino_writer = open("DinosToGet.txt", "w")
-    dino_writer.write(needed_dinos_output)
-    dino_writer.close()
-
-    dino_writer = open("CurrentDinos.txt", "w")
-    dino_writer.write(current_dinos_output)
-    dino_writer.close()
+    Returns
+    -------
+    int
+        The number of records that were added, changed, or removed across all files
+    """
+    with Stats.phase("save_dino_info"):
+        if STORAGE_BACKEND == "sqlite":
+            import SQLiteStorage
+            records_written = SQLiteStorage.save_dino_info(current_dinos, needed_dinos, remove_missing=remove_missing)
+        else:
+            if not remove_missing:
+                all_dinos, all_needed_dinos = read_text_dino_info()
+                all_dinos.update(current_dinos)
+                needed_dinos = (all_needed_dinos - set(current_dinos)) | set(needed_dinos)
+                current_dinos = all_dinos
+            needed_dinos_output = sorted(needed_dinos)
+            current_dinos_output = sorted([current_dinos[dino].to_string() for dino in current_dinos])
+            recipe_output = sorted([current_dinos[dino].parent_to_string() for dino in current_dinos if current_dinos[dino].is_hybrid()])
 
-    dino_writer = open("DinoRecipes.txt", "w")
-    dino_writer.write(recipe_output)
-    dino_writer.close()
\ No newline at end of file
+            records_written = save_lines(NEEDED_DINOS_FILE, needed_dinos_output)
+            records_written += save_lines(CURRENT_DINOS_FILE, current_dinos_output)
+            records_written += save_lines(RECIPES_FILE, recipe_output)
+    Stats.count("save_dino_info.records_written", records_written)
+    return records_written
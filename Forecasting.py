@@ -0,0 +1,232 @@
+"""
+Forecasts of how long it will take to collect the DNA that is still needed
+
+AmountHistory records how much DNA each dinosaur still needs on each day. A straight line is fitted to every dinosaur's recent
+history at once by least squares over the dino x day matrix, and the slope of that line is taken as the rate the dinosaur's
+DNA is being collected. Amounts added to the history since it was loaded are placed on the latest days, days before a
+dinosaur first appeared are masked out, and the matrix is only built for the days inside the window, so a forecast takes a
+handful of array operations on a window-sized matrix no matter how many days of history there are.
+"""
+import datetime
+import math
+
+import numpy as np
+
+import Stats
+
+# The number of calendar days of recent history that rates are fitted on
+FORECAST_WINDOW = 60
+DATE_FORMAT = "%m/%d/%Y"
+
+
+def get_day_numbers(dates: list[str]) -> np.ndarray:
+    """
+    Converts the dates of the history into day numbers, so the gaps between days in the history can be measured
+
+    Parameters
+    ----------
+    dates : list[str]
+        The dates in the history, in the format "%m/%d/%Y"
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of days between 1970-01-01 and each date
+    """
+    date_array = np.array(dates, dtype="U10")
+    if len(dates) and all(len(date) == 10 for date in dates):
+        # Rearranging the characters of "MM/DD/YYYY" into "YYYY-MM-DD" lets NumPy parse every date at once
+        characters = date_array.view("U1").reshape(-1, 10)[:, [6, 7, 8, 9, 2, 0, 1, 5, 3, 4]]
+        characters[:, [4, 7]] = "-"
+        iso_dates = np.ascontiguousarray(characters).view("U10").ravel()
+    else:
+        iso_dates = [datetime.datetime.strptime(date, DATE_FORMAT).date().isoformat() for date in dates]
+    return np.array(iso_dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def get_window_start(day_numbers: np.ndarray, window: int = FORECAST_WINDOW) -> int:
+    """
+    Returns the index of the first day in the history that is inside the window
+
+    Parameters
+    ----------
+    day_numbers : numpy.ndarray
+        The day number of each day in the history (see get_day_numbers())
+    window : int
+        The number of calendar days, counting back from the latest day in the history, that the window covers
+
+    Returns
+    -------
+    int
+        The index of the first day in the window (0 for an empty history)
+    """
+    if not len(day_numbers):
+        return 0
+    return int(np.searchsorted(day_numbers, day_numbers[-1] - window))
+
+
+def get_history_matrix(amount_history, dino_names: list[str], day_count: int, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the amount history of some dinosaurs as a dino x day matrix that covers the days of the history from start on,
+    including the amounts added since the history was loaded
+    A dinosaur's added amounts are its latest days, and any days between its loaded amounts and those keep its last loaded
+    amount, just as days without a change do in AmountHistory.txt
+
+    Parameters
+    ----------
+    amount_history : HistorySnapshot.AmountHistory
+        A mapping of dinosaur names to their needed amounts on each day since they first appeared
+    dino_names : list[str]
+        The names of the dinosaurs to include, in row order
+    day_count : int
+        The number of days in the history
+    start : int
+        The index of the first day to include (see get_window_start()); earlier days are never copied
+
+    Returns
+    -------
+    numpy.ndarray
+        A dino x day matrix of needed amounts, with a column for each day from start to the end of the history
+    numpy.ndarray
+        The index of the first day each dinosaur appears in the history (day_count if it has no history)
+    """
+    loaded_days = amount_history.amounts.shape[1]
+    amounts = np.zeros((len(dino_names), day_count-start), dtype=np.int64)
+    first_days = np.full(len(dino_names), day_count, dtype=np.int64)
+    rows = np.array([amount_history.rows.get(dino_name, -1) for dino_name in dino_names], dtype=np.int64)
+    loaded = rows >= 0
+    if loaded_days:
+        if start < loaded_days:
+            amounts[loaded, :loaded_days-start] = amount_history.amounts[rows[loaded], start:]
+        amounts[loaded, max(loaded_days-start, 0):] = amount_history.amounts[rows[loaded], -1:]
+    first_days[loaded] = amount_history.first_days[rows[loaded]]
+
+    for index, dino_name in enumerate(dino_names):
+        added = amount_history.added.get(dino_name)
+        if added:
+            first_day = day_count - len(added)
+            amounts[index, max(first_day-start, 0):] = added[max(start-first_day, 0):]
+            first_days[index] = min(first_days[index], first_day)
+    return amounts, first_days
+
+
+def fit_rates(amounts: np.ndarray, first_days: np.ndarray, day_numbers: np.ndarray, window: int = FORECAST_WINDOW) -> np.ndarray:
+    """
+    Fits a line to the recent needed amounts of every dinosaur at once and returns how fast each amount is falling
+
+    Parameters
+    ----------
+    amounts : numpy.ndarray
+        A dino x day matrix of needed amounts, whose columns are the latest days of the history (it may cover the whole
+        history, or only the days from get_window_start() on)
+    first_days : numpy.ndarray
+        The index of the first day each dinosaur appears in the history
+    day_numbers : numpy.ndarray
+        The day number of each day in the history (see get_day_numbers())
+    window : int
+        The number of calendar days, counting back from the latest day in the history, that the lines are fitted on
+
+    Returns
+    -------
+    numpy.ndarray
+        The amount of DNA collected per day for each dinosaur (NaN if it has fewer than two days in the window)
+    """
+    if not len(day_numbers):
+        return np.full(len(first_days), np.nan)
+    start = get_window_start(day_numbers, window)
+    skipped_days = len(day_numbers) - amounts.shape[1]
+    if skipped_days > start:
+        raise ValueError("The amounts start after the window does")
+    x = (day_numbers[start:] - day_numbers[-1]).astype(np.float64)
+    valid = np.arange(start, len(day_numbers))[np.newaxis, :] >= np.asarray(first_days)[:, np.newaxis]
+    x_valid = np.where(valid, x, 0.0)
+    y_valid = np.where(valid, amounts[:, start-skipped_days:], 0).astype(np.float64)
+
+    count = valid.sum(axis=1)
+    sum_x = x_valid.sum(axis=1)
+    sum_y = y_valid.sum(axis=1)
+    sum_xx = (x_valid*x_valid).sum(axis=1)
+    sum_xy = (x_valid*y_valid).sum(axis=1)
+    denominator = count*sum_xx - sum_x*sum_x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(denominator > 0, (count*sum_xy - sum_x*sum_y)/denominator, np.nan)
+    return -slopes
+
+
+def get_days_left(remaining: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """
+    Returns how many days it will take to collect the remaining DNA of each dinosaur at its current rate
+
+    Parameters
+    ----------
+    remaining : numpy.ndarray
+        The amount of DNA each dinosaur still needs
+    rates : numpy.ndarray
+        The amount of DNA collected per day for each dinosaur (see fit_rates())
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of days left (0 if nothing is needed, infinity if the amount isn't falling or has no rate)
+    """
+    remaining = np.asarray(remaining, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_left = np.where(rates > 0, remaining/rates, np.inf)
+    return np.where(remaining > 0, days_left, 0.0)
+
+
+def forecast_roots(dates: list[str], amount_history, total_needed_DNA: dict[str : int],
+                   window: int = FORECAST_WINDOW) -> dict[str : float]:
+    """
+    Returns how many days it will take to collect the DNA still needed for each dinosaur that needs any
+
+    Parameters
+    ----------
+    dates : list[str]
+        The dates in the history
+    amount_history : HistorySnapshot.AmountHistory
+        A mapping of dinosaur names to their needed amounts on each day since they first appeared
+    total_needed_DNA : dict[str : int]
+        A mapping of dinosaur names to amounts of DNA needed to unlock all needed dinosaurs
+    window : int
+        The number of calendar days of recent history that rates are fitted on
+
+    Returns
+    -------
+    dict[str : float]
+        A mapping of dinosaur names to the number of days left (infinity if their DNA isn't being collected)
+    """
+    with Stats.phase("forecast"):
+        needed_names = [dino_name for dino_name in total_needed_DNA if total_needed_DNA[dino_name] > 0]
+        day_numbers = get_day_numbers(dates)
+        amounts, first_days = get_history_matrix(amount_history, needed_names, len(dates), get_window_start(day_numbers, window))
+        rates = fit_rates(amounts, first_days, day_numbers, window)
+        Stats.count("forecast.dinos_fitted", len(rates))
+        days_left = get_days_left([total_needed_DNA[dino_name] for dino_name in needed_names], rates)
+    return dict(zip(needed_names, days_left.tolist()))
+
+
+def get_projected_date(days_left: float, last_date: str = None) -> str:
+    """
+    Returns the date a number of days after the latest day in the history, or None if it will never come at the current rate
+    Rates are fitted up to the latest day in the history, so the days left are counted from there rather than from today
+
+    Parameters
+    ----------
+    days_left : float
+        The number of days left
+    last_date : str
+        The latest date in the history, in the format "%m/%d/%Y" (the current date if None, e.g. for an empty history)
+
+    Returns
+    -------
+    str
+        The projected date in the format "%m/%d/%Y"
+    """
+    if math.isinf(days_left):
+        return None
+    start_date = datetime.date.today() if last_date is None else datetime.datetime.strptime(last_date, DATE_FORMAT).date()
+    try:
+        return (start_date + datetime.timedelta(days=math.ceil(days_left))).strftime(DATE_FORMAT)
+    except OverflowError:
+        return None
@@ -0,0 +1,209 @@
+"""
+A Monte Carlo version of DNAAnalytics.get_needed_DNA in which every fuse gives a random amount of DNA
+
+DNAAnalytics assumes every fuse gives exactly DNA_PER_FUSE of the hybrid's DNA. Here, the needed DNA of every dinosaur is
+an array with one entry per sample, and the number of fuses needed for each sample is drawn from the fuse outcomes. Fuses
+are counted in bulk by drawing how many of each outcome they gave, and the last few are drawn in blocks across every sample
+at once, so millions of fuses take well under a second. The same seed always gives the same samples, and with a single
+outcome of DNA_PER_FUSE, every sample matches the deterministic result.
+"""
+from collections import Counter
+
+import numpy as np
+
+import LevelCosts
+from Dino import Dino
+
+# The amounts of hybrid DNA a single fuse can give, and how likely each one is (the average is DNA_PER_FUSE)
+FUSE_OUTCOMES = (10, 20, 30, 40, 50)
+FUSE_PROBABILITIES = (0.45, 0.3, 0.1, 0.1, 0.05)
+SAMPLES = 2000
+PERCENTILES = (50, 90)
+
+# The most random numbers drawn at once while sampling fuses
+_BLOCK_SIZE = 1 << 22
+
+
+def sample_fuse_counts(needed_amounts: np.ndarray, rng: np.random.Generator, outcomes: tuple[int] = FUSE_OUTCOMES,
+                       probabilities: tuple[float] = FUSE_PROBABILITIES) -> np.ndarray:
+    """
+    Returns how many fuses it takes to collect each of the needed amounts of hybrid DNA, drawn at random
+
+    Parameters
+    ----------
+    needed_amounts : numpy.ndarray
+        The amount of hybrid DNA needed in each sample
+    rng : numpy.random.Generator
+        The random generator
+    outcomes : tuple[int]
+        The amounts of DNA a single fuse can give
+    probabilities : tuple[float]
+        How likely each outcome is
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of fuses needed in each sample
+    """
+    outcome_values = np.array(outcomes, dtype=np.int64)
+    outcome_probabilities = np.array(probabilities, dtype=np.float64)/sum(probabilities)
+    cumulative_probabilities = np.cumsum(outcome_probabilities)
+    average = float(outcome_values @ outcome_probabilities)
+    spread = float(np.sqrt(((outcome_values - average)**2) @ outcome_probabilities))
+
+    fuse_counts = np.zeros(len(needed_amounts), dtype=np.int64)
+    remaining = np.asarray(needed_amounts, dtype=np.int64).copy()
+
+    # Most of the fuses are counted with a single draw of how many of each outcome they gave, stopping a few standard
+    # deviations short of the needed amount so that the bulk almost never collects all of it
+    expected = remaining/average
+    bulk = np.floor(expected - 4*np.sqrt(expected)*spread/average - 1).clip(0).astype(np.int64)
+    if bulk.any():
+        outcome_counts = rng.multinomial(bulk, outcome_probabilities)
+        collected = outcome_counts @ outcome_values
+        passed = (bulk > 0) & (collected >= remaining)
+        # The fuses in the bulk happen in a random order, so shuffling their outcomes shows where the needed amount was reached
+        for sample in np.flatnonzero(passed):
+            fuses = rng.permutation(np.repeat(outcome_values, outcome_counts[sample]))
+            fuse_counts[sample] = np.searchsorted(np.cumsum(fuses), remaining[sample]) + 1
+        fuse_counts[~passed] = bulk[~passed]
+        remaining = np.where(passed, 0, remaining - collected)
+
+    active = np.flatnonzero(remaining > 0)
+    while len(active):
+        # Draw enough fuses for most samples to finish in this block, without drawing too many at once
+        block = int(np.ceil(remaining[active].max()/average*1.1)) + 1
+        block = max(1, min(block, _BLOCK_SIZE//len(active)))
+        draws = np.searchsorted(cumulative_probabilities, rng.random((len(active), block)), side="right")
+        collected = np.cumsum(outcome_values[np.minimum(draws, len(outcome_values)-1)], axis=1)
+
+        reached = collected >= remaining[active, np.newaxis]
+        finished = reached[:, -1]
+        fuse_counts[active[finished]] += reached[finished].argmax(axis=1) + 1
+        unfinished = active[~finished]
+        fuse_counts[unfinished] += block
+        remaining[unfinished] -= collected[~finished, -1]
+        remaining[active[finished]] = 0
+        active = unfinished
+    return fuse_counts
+
+
+def simulate_needed_DNA(current_dinos: dict[str: Dino], targets: list[str], updated_levels: dict[str : int],
+                        updated_amounts: dict[str : int], samples: int = SAMPLES, seed: int = 0,
+                        outcomes: tuple[int] = FUSE_OUTCOMES, probabilities: tuple[float] = FUSE_PROBABILITIES) -> dict[str : dict]:
+    """
+    Returns samples of the DNA needed to unlock each of the targets, working out each target in the given order
+    like DNAAnalytics.get_needed_DNA, but with random fuse outcomes
+    The provided levels and amounts are not changed
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A current collection of dinosaur names mapped to their corresponding Dino objects
+    targets : list[str]
+        The names of the needed dinosaurs, in the order their DNA should be worked out
+    updated_levels : dict[str : int]
+        A mapping of dinosaur names to their working level
+    updated_amounts : dict[str : int]
+        A mapping of dinosaur names to their working amount
+    samples : int
+        The number of samples
+    seed : int
+        The seed for the random generator, so the same arguments always give the same samples
+    outcomes : tuple[int]
+        The amounts of DNA a single fuse can give
+    probabilities : tuple[float]
+        How likely each outcome is
+
+    Returns
+    -------
+    dict[str : dict[str : numpy.ndarray]]
+        A mapping of each target to the root dinosaurs it needs DNA from, mapped to the amount needed in each sample
+    """
+    rng = np.random.default_rng(seed)
+    levels = {}
+    amounts = {}
+
+    def get_needed_DNA(dino_name: str, needed_level: int, needed_amounts: np.ndarray, called: np.ndarray) -> Counter:
+        # called marks the samples in which the recursive version would have reached this dinosaur
+        dino = current_dinos[dino_name]
+        if dino_name not in levels:
+            levels[dino_name] = np.full(samples, updated_levels[dino_name], dtype=np.int64)
+            amounts[dino_name] = np.full(samples, updated_amounts[dino_name], dtype=np.int64)
+
+        # Account for the DNA required to get the specified level
+        dino_levels = levels[dino_name]
+        leveled = called & (dino_levels < needed_level)
+        if leveled.any():
+            prefix = np.array(LevelCosts.LEVEL_PREFIX_SUMS[dino.rarity_rank()], dtype=np.int64)
+            needed_amounts = needed_amounts + np.where(leveled, prefix[needed_level] - prefix[np.minimum(dino_levels, needed_level)], 0)
+            dino_levels[leveled] = needed_level
+
+        # Account for the DNA that the dinosaur already has in each sample
+        used_amounts = np.minimum(amounts[dino_name], needed_amounts)
+        amounts[dino_name] -= used_amounts
+        needed_amounts = needed_amounts - used_amounts
+        still_needed = needed_amounts > 0
+        if not still_needed.any():
+            return Counter()
+
+        # Translate the DNA amounts to parent amounts if applicable
+        if dino.is_hybrid():
+            fuse_counts = sample_fuse_counts(needed_amounts, rng, outcomes, probabilities)
+            results = Counter()
+            for parent in dino.get_parents():
+                parent_cost_per_fuse = LevelCosts.parent_DNA_per_fuse(current_dinos[parent].rarity_rank(), dino.rarity_rank())
+                results.update(get_needed_DNA(parent, dino.activation_level(), parent_cost_per_fuse*fuse_counts, still_needed))
+            return results
+        return Counter({dino_name: needed_amounts})
+
+    results = {}
+    for target in targets:
+        dino = current_dinos[target]
+        results[target] = dict(get_needed_DNA(target, dino.activation_level()+1, np.zeros(samples, dtype=np.int64),
+                                                   np.ones(samples, dtype=bool)))
+    return results
+
+
+def get_total_samples(target_samples: dict[str : dict]) -> dict[str : np.ndarray]:
+    """
+    Adds up the samples of every target into the DNA needed from each root dinosaur to unlock all of them
+
+    Parameters
+    ----------
+    target_samples : dict[str : dict[str : numpy.ndarray]]
+        The samples of each target (see simulate_needed_DNA())
+
+    Returns
+    -------
+    dict[str : numpy.ndarray]
+        A mapping of root dinosaur names to the amount needed in each sample
+    """
+    total_samples = {}
+    for root_samples in target_samples.values():
+        for root, needed_amounts in root_samples.items():
+            if root in total_samples:
+                total_samples[root] = total_samples[root] + needed_amounts
+            else:
+                total_samples[root] = needed_amounts
+    return total_samples
+
+
+def get_percentiles(sample_mapping: dict[str : np.ndarray], percentiles: tuple[int] = PERCENTILES) -> dict[str : tuple[int]]:
+    """
+    Returns percentiles of the samples for each dinosaur
+
+    Parameters
+    ----------
+    sample_mapping : dict[str : numpy.ndarray]
+        A mapping of dinosaur names to samples of an amount
+    percentiles : tuple[int]
+        The percentiles to return, e.g. (50, 90) for P50 and P90
+
+    Returns
+    -------
+    dict[str : tuple[int]]
+        A mapping of dinosaur names to each percentile of their samples, rounded up
+    """
+    return {dino_name: tuple(int(value) for value in np.ceil(np.percentile(samples, percentiles)))
+            for dino_name, samples in sample_mapping.items()}
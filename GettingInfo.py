@@ -1,4 +1,6 @@
-import os
+import argparse
+from collections import deque
+import Terminal
 from Dino import Dino
 import FileFunctions
 
@@ -15,9 +17,9 @@ class GettingInfo:
         A set of names of dinosaurs that need to be unlocked
     """
     
-    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str]) -> None:
+    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str], recipes_file: str = None, stats_file: str = None) -> None:
         """
-        Initializes class variables and runs the user input process
+        Initializes class variables and runs the user input process, or imports the dinosaurs in the given files without any prompts
         
         Parameters
         ----------
@@ -25,11 +27,18 @@ class GettingInfo:
             A current collection of dinosaur names mapped to their corresponding Dino objects
         n_dinos : set[str]
             A set of names of dinosaurs that need to be unlocked
+        recipes_file : str
+            A file of new recipes in the DinoRecipes.txt format ("child: first second")
+        stats_file : str
+            A file of new dinosaurs in the CurrentDinos.txt format ("name level amount rarity")
         """
         self.current_dinos = c_dinos
         self.needed_dinos = n_dinos
 
-        self.ask_for_dinos()
+        if recipes_file is None and stats_file is None:
+            self.ask_for_dinos()
+        else:
+            self.import_dinos(recipes_file, stats_file)
 
     def ask_for_dinos(self) -> None:
         """
@@ -42,7 +51,7 @@ class GettingInfo:
             print()
             self.get_dino_info(wanted_input)
             self.needed_dinos.add(wanted_input)
-            os.system('cls')
+            Terminal.clear_screen()
 
     def get_dino_info(self, dino_name: str) -> None:
         """
@@ -58,12 +67,12 @@ class GettingInfo:
 
         # Only getting dinosaur info for dinosaurs that aren't in the database
         if dino_name not in self.current_dinos:
-            os.system('cls')
+            Terminal.clear_screen()
             first = None
             second = None
 
             # Get needed dinosaur info
-            os.system('cls')
+            Terminal.clear_screen()
             level = input('What level is ' + dino_name + '? ')
             amount = input('How much DNA does ' + dino_name + ' have? ')
             rarity = input('What rarity is ' + dino_name + '? ')
@@ -83,6 +92,87 @@ class GettingInfo:
             if self.current_dinos[dino_name].activation_level() == level:
                 self.needed_dinos.add(dino_name)
 
+    def import_dinos(self, recipes_file: str = None, stats_file: str = None) -> list[str]:
+        """
+        Adds every new dinosaur in a stats file to the database, along with the recipes for them in a recipes file
+        Parents are always added before their children, and dinosaurs that are already in the database are left alone
+        The new dinosaurs that aren't a parent of another new dinosaur are the targets, and the ones that are still locked are
+        added to the needed dinosaurs
+
+        Parameters
+        ----------
+        recipes_file : str
+            A file of recipes in the DinoRecipes.txt format ("child: first second")
+        stats_file : str
+            A file of dinosaurs in the CurrentDinos.txt format ("name level amount rarity")
+
+        Returns
+        -------
+        list[str]
+            The names of the dinosaurs that were added, in the order they were added
+
+        Raises
+        ------
+        FileFunctions.RosterFormatError
+            If a line is malformed, or a new dinosaur is missing its stats or a parent
+        """
+        new_dinos = {}
+        if stats_file is not None:
+            for line_number, dino in FileFunctions.iter_dino_records(stats_file):
+                if dino.name not in self.current_dinos:
+                    new_dinos[dino.name] = dino
+
+        recipes = {}
+        if recipes_file is not None:
+            for line_number, child, first, second in FileFunctions.iter_recipe_records(recipes_file):
+                if child in self.current_dinos:
+                    continue
+                if child not in new_dinos:
+                    raise FileFunctions.RosterFormatError(recipes_file, line_number, "no stats were given for " + child)
+                for parent in (first, second):
+                    if parent not in self.current_dinos and parent not in new_dinos:
+                        raise FileFunctions.RosterFormatError(recipes_file, line_number, "unknown dinosaur " + parent)
+                recipes[child] = (first, second, line_number)
+
+        # Add the new dinosaurs in dependency order with a topological sort, so each one is added after its parents
+        children = {dino_name: [] for dino_name in new_dinos}
+        waiting_parents = {}
+        for child, (first, second, line_number) in recipes.items():
+            new_parents = {parent for parent in (first, second) if parent in new_dinos}
+            waiting_parents[child] = len(new_parents)
+            for parent in new_parents:
+                children[parent].append(child)
+        ready = deque(dino_name for dino_name in new_dinos if not waiting_parents.get(dino_name))
+        added_dinos = []
+        while ready:
+            dino_name = ready.popleft()
+            if dino_name in recipes:
+                new_dinos[dino_name].set_parents(recipes[dino_name][:2])
+            self.current_dinos[dino_name] = new_dinos[dino_name]
+            added_dinos.append(dino_name)
+            for child in children[dino_name]:
+                waiting_parents[child] -= 1
+                if not waiting_parents[child]:
+                    ready.append(child)
+
+        if len(added_dinos) < len(new_dinos):
+            # Every dinosaur left is waiting on a parent that is also left, so following those parents has to loop back
+            dino_name = next(dino_name for dino_name in new_dinos if waiting_parents.get(dino_name))
+            seen = set()
+            while dino_name not in seen:
+                seen.add(dino_name)
+                dino_name = next(parent for parent in recipes[dino_name][:2] if waiting_parents.get(parent))
+            raise FileFunctions.RosterFormatError(recipes_file, recipes[dino_name][2], dino_name + " is its own ancestor")
+
+        # Like the dinosaurs asked for interactively, the targets' ancestors aren't needed dinosaurs themselves, and targets
+        # that are already unlocked aren't either
+        new_parents = {parent for first, second, line_number in recipes.values() for parent in (first, second)}
+        self.needed_dinos.update(dino_name for dino_name in added_dinos if dino_name not in new_parents
+                                 and self.current_dinos[dino_name].activation_level() == self.current_dinos[dino_name].get_level())
+
+        print('Added ' + str(len(added_dinos)) + ' dinos.')
+        return added_dinos
+
     def get_all_dino_info(self) -> tuple[dict[str: Dino], set[str]]:
         """
         A getter for the current dinosaur information and the needed dinosaur information
@@ -104,7 +194,12 @@ if __name__=='__main__':
         2. Adds any additional dinosaur information using the GettingInfo class
         3. Puts all compiled dinosaur information back in the database
     """
+    parser = argparse.ArgumentParser(description="Add new dinosaurs and their parents")
+    parser.add_argument("--recipes", help="import the recipes in this file (formatted like DinoRecipes.txt) without any prompts")
+    parser.add_argument("--stats", help="import the dinosaurs in this file (formatted like CurrentDinos.txt) without any prompts")
+    args = parser.parse_args()
+
     current_dinos, needed_dinos = FileFunctions.create_dino_info()
-    getting_info = GettingInfo(current_dinos, needed_dinos)
+    getting_info = GettingInfo(current_dinos, needed_dinos, args.recipes, args.stats)
     current_dinos, needed_dinos = getting_info.get_all_dino_info()
     FileFunctions.save_dino_info(current_dinos, needed_dinos)
\ No newline at end of file
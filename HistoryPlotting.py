@@ -1,64 +1,95 @@
 import datetime
-from matplotlib import pyplot as plt
+import FileFunctions
+import Stats
 
 class HistoryPlotting:
     """
     A class for storing and plotting historical data
+    The history is only loaded the first time amount_history or dates is used, and matplotlib is only imported when plotting
 
     Attributes
     ----------
-    amount_history : dict[str : list[int]]
+    amount_history : HistorySnapshot.AmountHistory
         A collection of dinosaur names mapped to their DNA amounts on certain days
     dates : list[str]
         A list of dates that correspond to the DNA amounts in amount_history
     """
 
     def __init__(self) -> None:
-        self.amount_history = {}
-        self.dates = []
+        self._amount_history = None
+        self._dates = None
+        self._day_numbers = None
 
-        self.parse_amount_input()
+    @property
+    def amount_history(self):
+        if self._amount_history is None:
+            self.parse_amount_input()
+        return self._amount_history
+
+    @property
+    def dates(self) -> list[str]:
+        if self._dates is None:
+            self.parse_amount_input()
+        return self._dates
 
     def parse_amount_input(self) -> None:
         """
         Sets amount_history and dates to the values specified in AmountHistory.txt
+        These are loaded from the binary snapshot of the history, which is rebuilt first if AmountHistory.txt has changed
+        (or from the database with the SQLite backend)
         """
-        amount_reader = open("AmountHistory.txt", "r")
-        day_amounts = amount_reader.read().split('\n\n')
-        all_dino_names = set()
-        for day in day_amounts:
-            amounts = day.split('\n')
-            self.dates.append(amounts[0])
-            amount_changed = {name: False for name in all_dino_names}
-            for i in range(1,len(amounts)):
-                dino_name, amount = amounts[i].split(': ')
-                amount = int(amount)
-                if dino_name[0] == '#': continue
-                if dino_name not in all_dino_names:
-                    all_dino_names.add(dino_name)
-                    self.amount_history[dino_name] = [amount]
-                else:
-                    self.amount_history[dino_name].append(amount)
-                    amount_changed[dino_name] = True
-            for dino_name in amount_changed:
-                if not amount_changed[dino_name]:
-                    self.amount_history[dino_name].append(self.amount_history[dino_name][-1])
-                    amount_changed[dino_name] = True
+        self._day_numbers = None
+        with Stats.phase("parse_amount_input"):
+            if FileFunctions.STORAGE_BACKEND == "sqlite":
+                import SQLiteStorage
+                self._dates, self._amount_history = SQLiteStorage.load_history()
+            else:
+                import HistorySnapshot
+                self._dates, self._amount_history = HistorySnapshot.load_history()
 
     def archive_dino(self, dino_name: str) -> None:
         """
         Takes in a dinosaur name and comments out all of its amount history
+        This only appends the dinosaur to the archive index; use compact_archive() to comment out its lines in AmountHistory.txt
 
         Parameters
         ----------
         dino_name: str
             Name of the dinosaur to archive
         """
-        f = open("AmountHistory.txt", "r")
-        original = f.read()
-        changed = original.replace(dino_name + ":", "# " + dino_name + ":")
-        f = open("AmountHistory.txt", "w")
-        f.write(changed)
+        self.archive_dinos([dino_name])
+
+    def archive_dinos(self, dino_names: list[str]) -> None:
+        """
+        Takes in dinosaur names and comments out all of their amount history with a single write
+
+        Parameters
+        ----------
+        dino_names: list[str]
+            Names of the dinosaurs to archive
+        """
+        if not dino_names:
+            return
+        if FileFunctions.STORAGE_BACKEND == "sqlite":
+            import SQLiteStorage
+            SQLiteStorage.archive_dinos(dino_names)
+        else:
+            import HistorySnapshot
+            HistorySnapshot.archive_dinos(dino_names)
+
+    def compact_archive(self) -> int:
+        """
+        Comments out the amount history of every archived dinosaur in AmountHistory.txt and clears the archive index
+
+        Returns
+        -------
+        int
+            The number of lines that were commented out
+        """
+        if FileFunctions.STORAGE_BACKEND == "sqlite":
+            return 0
+        import HistorySnapshot
+        return HistorySnapshot.compact_history()
    
     def send_amount_update(self, needed_amounts: dict[str : int]) -> None:
         """
@@ -72,34 +103,121 @@ class HistoryPlotting:
         formatted_date = datetime.datetime.now().strftime("%m/%d/%Y")
         self.dates.append(formatted_date)
 
-        amount_writer = open("AmountHistory.txt", "a")
-        amount_writer.write('\n')
-        amount_writer.write('\n' + formatted_date)
+        changed_amounts = {}
         for dino_name in sorted(needed_amounts):
-            if dino_name not in self.amount_history or needed_amounts[dino_name] != self.amount_history[dino_name][-1]:
-                amount_writer.write('\n' + dino_name + ": " + str(needed_amounts[dino_name]))
+            if dino_name not in self.amount_history or needed_amounts[dino_name] != self.amount_history.last(dino_name):
+                changed_amounts[dino_name] = needed_amounts[dino_name]
+
+        if FileFunctions.STORAGE_BACKEND == "sqlite":
+            import SQLiteStorage
+            SQLiteStorage.add_history_day(formatted_date, changed_amounts)
+        else:
+            amount_writer = open("AmountHistory.txt", "a")
+            amount_writer.write('\n')
+            amount_writer.write('\n' + formatted_date)
+            for dino_name in changed_amounts:
+                amount_writer.write('\n' + dino_name + ": " + str(changed_amounts[dino_name]))
+            amount_writer.close()
 
         for dino_name in needed_amounts:
-            if dino_name not in self.amount_history:
-                self.amount_history[dino_name] = []
-            self.amount_history[dino_name].append(needed_amounts[dino_name])
+            self.amount_history.append(dino_name, needed_amounts[dino_name])
+
+    def get_series(self, dino_name: str, buckets: int = None) -> tuple:
+        """
+        Returns the dates and amounts in the history of a dinosaur, downsampled to a number of buckets if one is given
+
+        Parameters
+        ----------
+        dino_name: str
+            The name of the dinosaur
+        buckets: int
+            The number of buckets to downsample to, usually the width of the graph in pixels (see HistoryRendering.downsample())
+
+        Returns
+        -------
+        numpy.ndarray
+            The dates of the points, as numpy.datetime64
+        numpy.ndarray
+            The amounts of the points
+        """
+        import numpy as np
+        import Forecasting
+        import HistoryRendering
+        if self._day_numbers is None or len(self._day_numbers) != len(self.dates):
+            self._day_numbers = Forecasting.get_day_numbers(self.dates).astype("datetime64[D]")
+        amounts = np.array(self.amount_history[dino_name], dtype=np.int64)
+        dates = self._day_numbers[len(self._day_numbers)-len(amounts):]
+        if buckets is not None:
+            kept = HistoryRendering.downsample(amounts, buckets)
+            dates, amounts = dates[kept], amounts[kept]
+        return dates, amounts
 
     def display_amount_history(self, dinos_to_display: set[str]) -> None:
         """
         Displays a line graph of the amount history for the given dinos
+        Long histories are downsampled to the width of the window first
 
         Parameters
         ----------
         dinos_to_display: set[str]
             A set of dinosaur names that we should display that data for
         """
+        from matplotlib import pyplot as plt
+        import HistoryRendering
+        buckets = HistoryRendering.get_point_budget(plt.rcParams["figure.figsize"], plt.rcParams["figure.dpi"])
         for dino_name in dinos_to_display:
             if dino_name not in self.amount_history: continue
-            x_axis = self.dates
-            y_axis = [int(i) for i in self.amount_history[dino_name]]
-            len_of_history = len(self.amount_history[dino_name])
-            if len(self.amount_history[dino_name]) != len(self.dates):
-                x_axis = self.dates[-len_of_history:]
+            x_axis, y_axis = self.get_series(dino_name, buckets)
             plt.plot(x_axis,y_axis,label=dino_name)
         plt.legend()
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+    def render_amount_history(self, dinos_to_display: set[str], output_file: str, title: str = "") -> str:
+        """
+        Saves a line graph of the amount history for the given dinos to a PNG or SVG file (by its extension), without
+        needing a display
+
+        Parameters
+        ----------
+        dinos_to_display: set[str]
+            A set of dinosaur names that we should display that data for
+        output_file: str
+            The path of the image file
+        title: str
+            The title of the graph
+
+        Returns
+        -------
+        str
+            The path of the image file
+        """
+        return self.render_amount_history_groups({title: dinos_to_display}, [output_file])[0]
+
+    def render_amount_history_groups(self, groups: dict[str : set[str]], output_files: list[str], max_workers: int = None) -> list[str]:
+        """
+        Saves a line graph of the amount history for each group of dinos (such as each rarity) to its own image file,
+        spreading the rendering across worker processes
+
+        Parameters
+        ----------
+        groups: dict[str : set[str]]
+            A mapping of graph titles to the dinosaur names in each graph
+        output_files: list[str]
+            The path of the image file for each group, in the same order
+        max_workers: int
+            The number of worker processes (as many as there are CPUs if None, and no extra processes if 1)
+
+        Returns
+        -------
+        list[str]
+            The path of each image file
+        """
+        import HistoryRendering
+        with Stats.phase("render_amount_history"):
+            buckets = HistoryRendering.get_point_budget()
+            figures = []
+            for (title, dinos_to_display), output_file in zip(groups.items(), output_files):
+                series = {dino_name: self.get_series(dino_name, buckets) for dino_name in sorted(dinos_to_display)
+                          if dino_name in self.amount_history}
+                figures.append((title, series, output_file))
+            return HistoryRendering.render_figures(figures, max_workers)
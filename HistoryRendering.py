@@ -0,0 +1,167 @@
+"""
+Headless rendering of amount history graphs to image files
+
+Long histories are downsampled to the width of the image before plotting: the days are split into one bucket per pixel
+column, and only the first, lowest, highest, and last amount of each bucket are kept, which draws the same line at that
+resolution. Figures are drawn with the Agg backend straight to PNG or SVG files, so no display is needed. When several
+figures are rendered at once (such as one per rarity), they are spread across worker processes, and only the downsampled
+points are sent to each worker.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import re
+
+import numpy as np
+
+# The image formats figures can be saved in
+IMAGE_FORMATS = ("png", "svg")
+# The size of each rendered figure in inches, and its resolution
+FIGURE_SIZE = (10, 6)
+DPI = 100
+# Figures with more lines than this leave out the legend, which would otherwise cover the graph
+MAX_LEGEND_ENTRIES = 20
+
+
+def get_file_name(title: str, file_format: str) -> str:
+    """
+    Returns a file name for a figure based on its title, with any characters that aren't safe in file names replaced
+
+    Parameters
+    ----------
+    title : str
+        The title of the figure (such as a dinosaur name or rarity)
+    file_format : str
+        The image format, either "png" or "svg"
+
+    Returns
+    -------
+    str
+        The file name, e.g. "Indominus_Rex.png" for the title "Indominus Rex"
+    """
+    return (re.sub(r"[^A-Za-z0-9_-]+", "_", title).strip("_") or "graph") + "." + file_format
+
+
+def get_point_budget(figure_size: tuple[float, float] = FIGURE_SIZE, dpi: int = DPI) -> int:
+    """
+    Returns the number of pixel columns a figure has, which is the most buckets a series needs to be split into
+
+    Parameters
+    ----------
+    figure_size : tuple[float, float]
+        The width and height of the figure in inches
+    dpi : int
+        The resolution of the figure
+
+    Returns
+    -------
+    int
+        The width of the figure in pixels
+    """
+    return int(figure_size[0]*dpi)
+
+
+def downsample(amounts: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Returns the indices of the points to keep so a series draws the same line at a width of the given number of buckets
+    The first, lowest, highest, and last point of each bucket are kept (at most four points per bucket)
+
+    Parameters
+    ----------
+    amounts : numpy.ndarray
+        The amounts in the series
+    buckets : int
+        The number of buckets (usually the number of pixel columns)
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted indices of the points to keep
+    """
+    point_count = len(amounts)
+    if point_count <= 4*buckets:
+        return np.arange(point_count)
+    bucket_ids = np.arange(point_count)*buckets//point_count
+    # Sorting by bucket and then amount puts the lowest point of each bucket first and the highest last
+    order = np.lexsort((amounts, bucket_ids))
+    starts = np.flatnonzero(np.diff(bucket_ids, prepend=-1))
+    ends = np.append(starts[1:], point_count) - 1
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+
+def render_figure(title: str, series: dict[str : tuple[np.ndarray, np.ndarray]], output_file: str,
+                  figure_size: tuple[float, float] = FIGURE_SIZE, dpi: int = DPI) -> str:
+    """
+    Draws a line graph of already downsampled series with the Agg backend and saves it (as PNG or SVG, by its extension)
+
+    Parameters
+    ----------
+    title : str
+        The title of the figure
+    series : dict[str : tuple[numpy.ndarray, numpy.ndarray]]
+        A mapping of dinosaur names to the dates (as numpy.datetime64) and amounts of their points
+    output_file : str
+        The path of the image file
+    figure_size : tuple[float, float]
+        The width and height of the figure in inches
+    dpi : int
+        The resolution of the figure
+
+    Returns
+    -------
+    str
+        The path of the image file
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figure_size, dpi=dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    for dino_name, (dates, amounts) in series.items():
+        axes.plot(dates, amounts, label=dino_name, linewidth=1)
+    axes.set_title(title)
+    axes.set_ylabel("Needed DNA")
+    if 0 < len(series) <= MAX_LEGEND_ENTRIES:
+        axes.legend(fontsize="small")
+    figure.autofmt_xdate()
+    figure.savefig(output_file)
+    return output_file
+
+
+def _render_figure(figure: tuple) -> str:
+    """
+    Renders one figure in a worker process (see render_figure())
+
+    Parameters
+    ----------
+    figure : tuple
+        The arguments of render_figure()
+
+    Returns
+    -------
+    str
+        The path of the image file
+    """
+    return render_figure(*figure)
+
+
+def render_figures(figures: list[tuple], max_workers: int = None) -> list[str]:
+    """
+    Renders several figures, spreading them across worker processes
+
+    Parameters
+    ----------
+    figures : list[tuple]
+        The arguments of render_figure() for each figure
+    max_workers : int
+        The number of worker processes (as many as there are CPUs if None, and no extra processes if 1)
+
+    Returns
+    -------
+    list[str]
+        The path of each image file, in the same order
+    """
+    if max_workers == 1 or len(figures) <= 1:
+        return [_render_figure(figure) for figure in figures]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render_figure, figures))
@@ -0,0 +1,493 @@
+"""
+A compiled, binary copy of AmountHistory.txt
+
+The text history is parsed into a vector of dates, a dense dino x day matrix of needed amounts, and an index of dinosaur names,
+which are saved as .npy files in a snapshot directory next to the history. The matrix is loaded with a memory map, so loading
+the history no longer depends on how long it is. The snapshot remembers the size and modification time of the text file and
+is rebuilt automatically whenever the text file changes.
+
+Archiving a dinosaur appends a line to a small archive index instead of rewriting the text history. The index is applied
+whenever the text history is parsed, and compact_history() can fold it back into the text history.
+"""
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+import Stats
+
+HISTORY_FILE = "AmountHistory.txt"
+SNAPSHOT_VERSION = 2
+
+
+class AmountHistory(Mapping):
+    """
+    A read-mostly mapping of dinosaur names to their amount history, backed by a dino x day matrix
+    Days before a dinosaur first appeared are not part of its history, so each history ends on the latest day
+    ...
+
+    Attributes
+    ----------
+    amounts : numpy.ndarray
+        A dino x day matrix of amounts (possibly memory mapped)
+    first_days : numpy.ndarray
+        The index of the first day each dinosaur appears in the history
+    rows : dict[str : int]
+        A mapping of dinosaur names to their row in amounts
+    added : dict[str : list[int]]
+        A mapping of dinosaur names to amounts added since the matrix was loaded
+    """
+
+    def __init__(self, names: list[str], first_days: np.ndarray, amounts: np.ndarray) -> None:
+        """
+        Initializes the mapping from the name index, first days, and amount matrix
+
+        Parameters
+        ----------
+        names : list[str]
+            The dinosaur names in row order
+        first_days : numpy.ndarray
+            The index of the first day each dinosaur appears in the history
+        amounts : numpy.ndarray
+            A dino x day matrix of amounts
+        """
+        self.amounts = amounts
+        self.first_days = first_days
+        self.rows = {dino_name: row for row, dino_name in enumerate(names)}
+        self.added = {}
+
+    def __getitem__(self, dino_name: str) -> list[int]:
+        if dino_name in self.rows:
+            row = self.rows[dino_name]
+            history = self.amounts[row, self.first_days[row]:].tolist()
+        elif dino_name in self.added:
+            history = []
+        else:
+            raise KeyError(dino_name)
+        return history + self.added.get(dino_name, [])
+
+    def __iter__(self):
+        yield from self.rows
+        for dino_name in self.added:
+            if dino_name not in self.rows:
+                yield dino_name
+
+    def __len__(self) -> int:
+        return len(self.rows) + sum(dino_name not in self.rows for dino_name in self.added)
+
+    def __contains__(self, dino_name: str) -> bool:
+        return dino_name in self.rows or dino_name in self.added
+
+    def last(self, dino_name: str) -> int:
+        """
+        Returns the most recent amount of a dinosaur without copying its whole history
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+
+        Returns
+        -------
+        int
+            The latest amount in the dinosaur's history
+        """
+        if self.added.get(dino_name):
+            return self.added[dino_name][-1]
+        return int(self.amounts[self.rows[dino_name], -1])
+
+    def append(self, dino_name: str, amount: int) -> None:
+        """
+        Adds a new latest amount to a dinosaur's history (in memory only)
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur
+        amount : int
+            The new amount
+        """
+        self.added.setdefault(dino_name, []).append(amount)
+
+
+def get_archive_file(history_file: str = HISTORY_FILE) -> str:
+    """
+    Returns the path of the archive index that sits next to a text history
+    Each line of the archive index is a dinosaur name and the size of the text history when the dinosaur was archived,
+    and every entry for that dinosaur before that point in the text history is treated as commented out
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    str
+        The path of the archive index
+    """
+    return os.path.splitext(history_file)[0] + ".archive"
+
+
+def read_archive(history_file: str = HISTORY_FILE) -> dict[str : int]:
+    """
+    Returns the archived dinosaurs of a text history and the point in the text history they were archived at
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    dict[str : int]
+        A mapping of archived dinosaur names to the byte offset in the text history that their entries are archived up to
+    """
+    archive_file = get_archive_file(history_file)
+    archived_offsets = {}
+    if not os.path.exists(archive_file):
+        return archived_offsets
+    archive_reader = open(archive_file, "r")
+    for line in archive_reader:
+        if line.strip():
+            dino_name, offset = line.split()
+            archived_offsets[dino_name] = max(archived_offsets.get(dino_name, 0), int(offset))
+    archive_reader.close()
+    return archived_offsets
+
+
+def archive_dinos(dino_names: list[str], history_file: str = HISTORY_FILE) -> None:
+    """
+    Archives all of the history recorded so far for each of the given dinosaurs with a single append to the archive index
+
+    Parameters
+    ----------
+    dino_names : list[str]
+        The names of the dinosaurs to archive
+    history_file : str
+        The path of the text history
+    """
+    if not dino_names:
+        return
+    offset = str(os.path.getsize(history_file))
+    archive_writer = open(get_archive_file(history_file), "a")
+    archive_writer.write(''.join(dino_name + ' ' + offset + '\n' for dino_name in dino_names))
+    archive_writer.close()
+
+
+def iter_history_entries(history_file: str = HISTORY_FILE):
+    """
+    Reads the text history one line at a time and yields each day and each recorded amount
+    Days are yielded with a dinosaur name and amount of None, before the amounts recorded on them
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Yields
+    ------
+    tuple[int, str, str, int, bool]
+        The index of the day, the date, the dinosaur name, the amount, and whether the amount has been archived
+    """
+    archived_offsets = read_archive(history_file)
+    amount_reader = open(history_file, "rb")
+    offset = 0
+    day_index = -1
+    date = None
+    for raw_line in amount_reader:
+        line_offset = offset
+        offset += len(raw_line)
+        line = raw_line.decode().rstrip('\r\n')
+        if not line:
+            date = None
+            continue
+        if date is None:
+            day_index += 1
+            date = line
+            yield day_index, date, None, None, False
+            continue
+        dino_name, amount = line.split(': ')
+        amount = int(amount)
+        if dino_name[0] == '#':
+            yield day_index, date, dino_name.lstrip('# '), amount, True
+        else:
+            yield day_index, date, dino_name, amount, line_offset < archived_offsets.get(dino_name, 0)
+    amount_reader.close()
+
+
+def fill_history(entries) -> tuple[list[str], dict[str : list[int]]]:
+    """
+    Collects history entries into a list of dates and a mapping of dinosaur names to their amounts,
+    carrying each dinosaur's last amount forward on days it was not recorded
+    Archived amounts are skipped
+
+    Parameters
+    ----------
+    entries : Iterable[tuple[int, str, str, int, bool]]
+        History entries in the format yielded by iter_history_entries()
+
+    Returns
+    -------
+    list[str]
+        The dates in the history
+    dict[str : list[int]]
+        A mapping of dinosaur names to their amounts on each day since they first appeared
+    """
+    dates = []
+    amount_history = {}
+    amount_changed = {}
+    for day_index, date, dino_name, amount, archived in entries:
+        if dino_name is None:
+            for changed_name in amount_changed:
+                if not amount_changed[changed_name]:
+                    amount_history[changed_name].append(amount_history[changed_name][-1])
+            dates.append(date)
+            amount_changed = {name: False for name in amount_history}
+        elif archived:
+            continue
+        elif dino_name not in amount_history:
+            amount_history[dino_name] = [amount]
+        else:
+            amount_history[dino_name].append(amount)
+            amount_changed[dino_name] = True
+    for changed_name in amount_changed:
+        if not amount_changed[changed_name]:
+            amount_history[changed_name].append(amount_history[changed_name][-1])
+    return dates, amount_history
+
+
+def parse_history_text(history_file: str = HISTORY_FILE) -> tuple[list[str], dict[str : list[int]]]:
+    """
+    Parses the text history into a list of dates and a mapping of dinosaur names to their amounts,
+    carrying each dinosaur's last amount forward on days it was not recorded
+    Archived amounts are skipped
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    list[str]
+        The dates in the history
+    dict[str : list[int]]
+        A mapping of dinosaur names to their amounts on each day since they first appeared
+    """
+    return fill_history(iter_history_entries(history_file))
+
+
+def to_matrix(dates: list[str], amount_history: dict[str : list[int]]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    Packs a mapping of dinosaur names to their amounts into a dense dino x day matrix
+
+    Parameters
+    ----------
+    dates : list[str]
+        The dates in the history
+    amount_history : dict[str : list[int]]
+        A mapping of dinosaur names to their amounts on each day since they first appeared
+
+    Returns
+    -------
+    list[str]
+        The dinosaur names in row order
+    numpy.ndarray
+        The index of the first day each dinosaur appears in the history
+    numpy.ndarray
+        A dino x day matrix of amounts (int32, unless an amount is too large for it)
+    """
+    day_count = len(dates)
+    names = list(amount_history)
+    largest = max((abs(amount) for history in amount_history.values() for amount in history), default=0)
+    amounts = np.zeros((len(names), day_count), dtype=np.int32 if largest <= np.iinfo(np.int32).max else np.int64)
+    first_days = np.zeros(len(names), dtype=np.int32)
+    for row, dino_name in enumerate(names):
+        history = amount_history[dino_name][-day_count:] if day_count else []
+        first_days[row] = day_count - len(history)
+        amounts[row, first_days[row]:] = history
+    return names, first_days, amounts
+
+
+def compact_history(history_file: str = HISTORY_FILE) -> int:
+    """
+    Folds the archive index into the text history by commenting out every archived amount, then clears the archive index
+    Only lines whose name matches an archived dinosaur exactly are commented out
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    int
+        The number of lines that were commented out
+    """
+    archived_offsets = read_archive(history_file)
+    if not archived_offsets:
+        return 0
+    amount_reader = open(history_file, "rb")
+    lines = amount_reader.readlines()
+    amount_reader.close()
+
+    offset = 0
+    commented = 0
+    for i, raw_line in enumerate(lines):
+        line_offset = offset
+        offset += len(raw_line)
+        line = raw_line.decode()
+        if ': ' in line and line_offset < archived_offsets.get(line.split(': ')[0], 0):
+            lines[i] = b'# ' + raw_line
+            commented += 1
+
+    history_writer = open(history_file + ".tmp", "wb")
+    history_writer.writelines(lines)
+    history_writer.close()
+    os.replace(history_file + ".tmp", history_file)
+    os.remove(get_archive_file(history_file))
+    return commented
+
+
+def get_snapshot_dir(history_file: str = HISTORY_FILE) -> str:
+    """
+    Returns the directory the snapshot of a text history is stored in
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    str
+        The path of the snapshot directory
+    """
+    return os.path.splitext(history_file)[0] + ".snapshot"
+
+
+def get_source_info(history_file: str = HISTORY_FILE) -> dict:
+    """
+    Returns the information used to tell whether a snapshot still matches the text history
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    dict
+        The snapshot version along with the size and modification time of the text history and its archive index
+    """
+    stat = os.stat(history_file)
+    source_info = {"version": SNAPSHOT_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    archive_file = get_archive_file(history_file)
+    if os.path.exists(archive_file):
+        archive_stat = os.stat(archive_file)
+        source_info["archive_size"] = archive_stat.st_size
+        source_info["archive_mtime_ns"] = archive_stat.st_mtime_ns
+    return source_info
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    """
+    Saves an array by writing a new file and moving it into place, so any existing memory maps of the old file stay valid
+
+    Parameters
+    ----------
+    path : str
+        The path of the .npy file
+    array : numpy.ndarray
+        The array to save
+    """
+    array_writer = open(path + ".tmp", "wb")
+    np.save(array_writer, array)
+    array_writer.close()
+    os.replace(path + ".tmp", path)
+
+
+def build_snapshot(history_file: str = HISTORY_FILE) -> None:
+    """
+    Parses the text history and saves it as a snapshot
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+    """
+    source_info = get_source_info(history_file)
+    dates, amount_history = parse_history_text(history_file)
+    names, first_days, amounts = to_matrix(dates, amount_history)
+
+    snapshot_dir = get_snapshot_dir(history_file)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # The source information is written last and removed first, so a partly written snapshot is never treated as current
+    source_path = os.path.join(snapshot_dir, "source.json")
+    if os.path.exists(source_path):
+        os.remove(source_path)
+    _save_array(os.path.join(snapshot_dir, "dates.npy"), np.array(dates, dtype=str))
+    _save_array(os.path.join(snapshot_dir, "names.npy"), np.array(names, dtype=str))
+    _save_array(os.path.join(snapshot_dir, "first_days.npy"), first_days)
+    _save_array(os.path.join(snapshot_dir, "amounts.npy"), amounts)
+    source_writer = open(source_path, "w")
+    json.dump(source_info, source_writer)
+    source_writer.close()
+
+
+def is_snapshot_current(history_file: str = HISTORY_FILE) -> bool:
+    """
+    Returns whether the snapshot exists and matches the current text history
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    bool
+        Whether or not the snapshot can be used
+    """
+    source_path = os.path.join(get_snapshot_dir(history_file), "source.json")
+    if not os.path.exists(source_path):
+        return False
+    source_reader = open(source_path, "r")
+    try:
+        saved_info = json.load(source_reader)
+    except ValueError:
+        return False
+    finally:
+        source_reader.close()
+    return saved_info == get_source_info(history_file)
+
+
+def load_history(history_file: str = HISTORY_FILE) -> tuple[list[str], AmountHistory]:
+    """
+    Loads the history from its snapshot, rebuilding the snapshot first if the text history has changed
+
+    Parameters
+    ----------
+    history_file : str
+        The path of the text history
+
+    Returns
+    -------
+    list[str]
+        The dates in the history
+    AmountHistory
+        A mapping of dinosaur names to their amounts on each day since they first appeared
+    """
+    snapshot_current = is_snapshot_current(history_file)
+    Stats.cache_lookup("history_snapshot", snapshot_current)
+    if not snapshot_current:
+        build_snapshot(history_file)
+    snapshot_dir = get_snapshot_dir(history_file)
+    dates = np.load(os.path.join(snapshot_dir, "dates.npy")).tolist()
+    names = np.load(os.path.join(snapshot_dir, "names.npy")).tolist()
+    first_days = np.load(os.path.join(snapshot_dir, "first_days.npy"))
+    # An empty matrix can't be memory mapped, but there is nothing to map anyway
+    amounts = np.load(os.path.join(snapshot_dir, "amounts.npy"), mmap_mode="r" if len(names) and len(dates) else None)
+    return dates, AmountHistory(names, first_days, amounts)
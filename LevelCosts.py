@@ -0,0 +1,182 @@
+"""
+Precomputed DNA costs for leveling up and fusing dinosaurs
+
+The cost of a single level only depends on the rarity of the dinosaur and how far the level is from its activation level,
+so the costs are worked out once per rarity when this module is imported. Alongside each table, a cumulative prefix sum
+is kept so that the DNA required between any two levels is a single subtraction.
+"""
+from bisect import bisect_right
+
+RARITY_RANKS = {"C": 0, "R": 1, "E": 2, "L": 3, "U": 4, "A": 5}
+MAX_LEVEL = 35
+DNA_PER_FUSE = 20
+
+# Bump this whenever a change to the leveling or fusing rules (or to how needed DNA is worked out) changes the results,
+# so that results saved by ResultCache under the old rules are no longer used
+COST_MODEL_VERSION = 1
+
+
+def rarity_rank(rarity: str) -> int:
+    """
+    Returns a integer value of the rarity, with Apex being highest at 5, and Common being lowest at 0
+
+    Parameters
+    ----------
+    rarity : str
+        The rarity represented as the first letter of the rarity (e.g. Epic -> E)
+
+    Returns
+    -------
+    int
+        The integer value of the rarity
+    """
+    return RARITY_RANKS.get(rarity, 0)
+
+
+def compute_DNA_for_one_lvl(rank: int, lvl: int) -> int:
+    """
+    Returns the amount of DNA required at a given level to level up, computed directly from the leveling rules
+
+    Parameters
+    ----------
+    rank : int
+        The rarity rank of the dinosaur
+    lvl : int
+        The hypothetical level the dinosaur is at
+
+    Returns
+    -------
+    int
+        The amount of DNA required to level up
+    """
+    diff = lvl - 5*rank
+    multiplier = 1
+    while diff >= 17:
+        diff -= 10
+        multiplier *= 10
+    if diff == 0:
+        return multiplier*50*(rank+1)
+    if diff < 8:
+        return multiplier*((50*diff)+50)
+    if diff < 9:
+        return multiplier*((100*diff)-300)
+    if diff < 13:
+        return multiplier*((250*diff)-1500)
+    return multiplier*((500*diff)-4500)
+
+
+def _build_tables() -> tuple[list[list[int]], list[list[int]]]:
+    """
+    Builds the per-level cost table and its cumulative prefix sums for every rarity
+
+    Returns
+    -------
+    list[list[int]]
+        For each rarity rank, the DNA needed to go from each level to the next
+    list[list[int]]
+        For each rarity rank, the DNA needed to go from level 0 to each level
+    """
+    costs = []
+    prefix_sums = []
+    for rank in range(len(RARITY_RANKS)):
+        rank_costs = [compute_DNA_for_one_lvl(rank, lvl) for lvl in range(MAX_LEVEL)]
+        rank_prefix = [0]
+        for cost in rank_costs:
+            rank_prefix.append(rank_prefix[-1] + cost)
+        costs.append(rank_costs)
+        prefix_sums.append(rank_prefix)
+    return costs, prefix_sums
+
+
+LEVEL_COSTS, LEVEL_PREFIX_SUMS = _build_tables()
+
+
+def DNA_for_one_lvl(rank: int, lvl: int) -> int:
+    """
+    Returns the amount of DNA required at a given level to level up
+
+    Parameters
+    ----------
+    rank : int
+        The rarity rank of the dinosaur
+    lvl : int
+        The hypothetical level the dinosaur is at
+
+    Returns
+    -------
+    int
+        The amount of DNA required to level up
+    """
+    if 0 <= lvl < MAX_LEVEL:
+        return LEVEL_COSTS[rank][lvl]
+    return compute_DNA_for_one_lvl(rank, lvl)
+
+
+def DNA_between_levels(rank: int, start_level: int, final_level: int) -> int:
+    """
+    Returns the amount of DNA needed to get a dinosaur from one level to another
+
+    Parameters
+    ----------
+    rank : int
+        The rarity rank of the dinosaur
+    start_level : int
+        The level the dinosaur is currently at
+    final_level : int
+        The level the dinosaur needs to get to
+
+    Returns
+    -------
+    int
+        The amount of DNA required to reach the final level (0 if it has already been reached)
+    """
+    if start_level >= final_level:
+        return 0
+    if 0 <= start_level and final_level <= MAX_LEVEL:
+        prefix = LEVEL_PREFIX_SUMS[rank]
+        return prefix[final_level] - prefix[start_level]
+    return sum(DNA_for_one_lvl(rank, lvl) for lvl in range(start_level, final_level))
+
+
+def levels_for_DNA(rank: int, start_level: int, amount: int) -> int:
+    """
+    Returns the highest level a dinosaur can reach from its current level with the given amount of DNA
+
+    Parameters
+    ----------
+    rank : int
+        The rarity rank of the dinosaur
+    start_level : int
+        The level the dinosaur is currently at
+    amount : int
+        The amount of DNA available for leveling (the dinosaur is assumed to be at or above its activation level)
+
+    Returns
+    -------
+    int
+        The highest affordable level (capped at MAX_LEVEL)
+    """
+    if not 0 <= start_level <= MAX_LEVEL:
+        raise ValueError("Level " + str(start_level) + " is outside of the level table")
+    prefix = LEVEL_PREFIX_SUMS[rank]
+    return max(start_level, bisect_right(prefix, prefix[start_level] + amount, lo=start_level) - 1)
+
+
+def parent_DNA_per_fuse(parent_rank: int, child_rank: int) -> int:
+    """
+    Returns the amount of parent DNA used in a single fuse of the child dinosaur
+
+    Parameters
+    ----------
+    parent_rank : int
+        The rarity rank of the parent dinosaur
+    child_rank : int
+        The rarity rank of the child dinosaur
+
+    Returns
+    -------
+    int
+        The amount of parent DNA needed for one fuse
+    """
+    parent_rank_diff = child_rank - parent_rank
+    return 10*(5 if parent_rank_diff%2 else 2)*10**int(parent_rank_diff/2)
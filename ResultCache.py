@@ -0,0 +1,180 @@
+"""
+An on-disk cache of the results DNAAnalytics works out when it starts
+
+Each entry is keyed by a SHA-256 hash of the roster inputs (CurrentDinos.txt, DinoRecipes.txt and DinosToGet.txt, or the
+database with the SQLite backend), the engine, and LevelCosts.COST_MODEL_VERSION. If none of these have changed since an
+earlier run, its results are loaded instead of worked out again. Entries are pickled into a cache directory, and the least
+recently used ones are removed once the directory grows past MAX_CACHE_BYTES.
+"""
+import hashlib
+import os
+import pickle
+
+import FileFunctions
+import LevelCosts
+import Stats
+
+CACHE_DIR = "AnalyticsCache"
+MAX_CACHE_BYTES = 16*1024*1024
+
+
+def get_input_files() -> list[str]:
+    """
+    Returns the files the roster is loaded from with the selected storage backend
+
+    Returns
+    -------
+    list[str]
+        The paths of the input files
+    """
+    if FileFunctions.STORAGE_BACKEND == "sqlite":
+        import SQLiteStorage
+        return [SQLiteStorage.DATABASE_FILE]
+    return [FileFunctions.CURRENT_DINOS_FILE, FileFunctions.RECIPES_FILE, FileFunctions.NEEDED_DINOS_FILE]
+
+
+def get_input_key(engine: str, input_files: list[str] = None) -> str:
+    """
+    Returns the cache key for the current contents of the input files
+
+    Parameters
+    ----------
+    engine : str
+        The engine used to work out needed DNA
+    input_files : list[str]
+        The paths of the input files (the selected backend's files if None)
+
+    Returns
+    -------
+    str
+        A hex digest of the inputs, the engine, and the cost model version
+    """
+    digest = hashlib.sha256()
+    digest.update(("cost model " + str(LevelCosts.COST_MODEL_VERSION) + "\nengine " + engine + "\n").encode())
+    for file_name in get_input_files() if input_files is None else input_files:
+        digest.update((os.path.basename(file_name) + "\n").encode())
+        if os.path.exists(file_name):
+            file_reader = open(file_name, "rb")
+            for chunk in iter(lambda: file_reader.read(1 << 16), b""):
+                digest.update(chunk)
+            file_reader.close()
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_entry_file(key: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Returns the path of the entry for a key
+
+    Parameters
+    ----------
+    key : str
+        The cache key
+    cache_dir : str
+        The cache directory
+
+    Returns
+    -------
+    str
+        The path of the entry
+    """
+    return os.path.join(cache_dir, key + ".pickle")
+
+
+def load(key: str, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Returns the results stored for a key, or None if there are none
+
+    Parameters
+    ----------
+    key : str
+        The cache key
+    cache_dir : str
+        The cache directory
+
+    Returns
+    -------
+    dict
+        The stored results
+    """
+    entry_file = get_entry_file(key, cache_dir)
+    try:
+        entry_reader = open(entry_file, "rb")
+    except FileNotFoundError:
+        Stats.cache_lookup("results", False)
+        return None
+    try:
+        results = pickle.load(entry_reader)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # A damaged or outdated entry is treated as a miss and replaced on the next store
+        results = None
+    entry_reader.close()
+    Stats.cache_lookup("results", results is not None)
+    if results is not None:
+        # Mark the entry as recently used
+        os.utime(entry_file)
+    return results
+
+
+def store(key: str, results: dict, cache_dir: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES) -> None:
+    """
+    Stores the results for a key, then evicts the least recently used entries if the cache has grown too large
+
+    Parameters
+    ----------
+    key : str
+        The cache key
+    results : dict
+        The results to store
+    cache_dir : str
+        The cache directory
+    max_bytes : int
+        The most the entries in the cache directory may take up
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_file = get_entry_file(key, cache_dir)
+    entry_writer = open(entry_file + ".tmp", "wb")
+    pickle.dump(results, entry_writer, protocol=pickle.HIGHEST_PROTOCOL)
+    entry_writer.close()
+    os.replace(entry_file + ".tmp", entry_file)
+    evict(max_bytes, cache_dir, keep=entry_file)
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES, cache_dir: str = CACHE_DIR, keep: str = None) -> int:
+    """
+    Removes the least recently used entries until the cache takes up no more than max_bytes
+
+    Parameters
+    ----------
+    max_bytes : int
+        The most the entries in the cache directory may take up
+    cache_dir : str
+        The cache directory
+    keep : str
+        The path of an entry that should never be removed (such as the one just stored)
+
+    Returns
+    -------
+    int
+        The number of entries removed
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith(".pickle"):
+            entry_file = os.path.join(cache_dir, file_name)
+            entry_stat = os.stat(entry_file)
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_file))
+
+    total_bytes = sum(size for mtime, size, entry_file in entries)
+    removed = 0
+    for mtime, size, entry_file in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if entry_file == keep:
+            continue
+        os.remove(entry_file)
+        total_bytes -= size
+        removed += 1
+    return removed
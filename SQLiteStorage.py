@@ -0,0 +1,319 @@
+"""
+An SQLite storage backend for the roster, recipes, needed dinosaurs, and amount history
+
+Everything is kept in one local database file with indexed tables, so saves only touch the rows that changed and analytics
+can load just the recipe trees they need. Select this backend by setting the JWA_STORAGE environment variable to "sqlite"
+(see FileFunctions), after running this module once to import the existing .txt files.
+"""
+import argparse
+from contextlib import closing
+import os
+import sqlite3
+from Dino import Dino
+from DinoRoster import DinoRoster
+import HistorySnapshot
+
+DATABASE_FILE = "JWA.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dinos (
+    name TEXT PRIMARY KEY,
+    lvl INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    rarity TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipes (
+    child TEXT PRIMARY KEY,
+    first TEXT NOT NULL,
+    second TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recipes_first ON recipes (first);
+CREATE INDEX IF NOT EXISTS recipes_second ON recipes (second);
+CREATE TABLE IF NOT EXISTS needed (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS history_days (
+    day INTEGER PRIMARY KEY,
+    date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    day INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS history_day ON history (day);
+CREATE INDEX IF NOT EXISTS history_name ON history (name, day);
+"""
+
+
+def connect(database_file: str = DATABASE_FILE) -> sqlite3.Connection:
+    """
+    Opens the database, creating its tables if they don't exist yet
+
+    Parameters
+    ----------
+    database_file : str
+        The path of the database
+
+    Returns
+    -------
+    sqlite3.Connection
+        A connection to the database
+    """
+    connection = sqlite3.connect(database_file)
+    try:
+        connection.executescript(SCHEMA)
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+# ROSTER FUNCTIONS ------------------------------------------------------------------------------
+
+def create_dino_info(database_file: str = DATABASE_FILE, targets: set[str] = None) -> tuple[DinoRoster, set[str]]:
+    """
+    Grabs current dinosaur information, recipes, and needed dinosaurs from the database
+    If targets are provided, only those needed dinosaurs and the dinosaurs in their recipe trees are loaded
+
+    Parameters
+    ----------
+    database_file : str
+        The path of the database
+    targets : set[str]
+        The names of the needed dinosaurs to load (all of them if None)
+
+    Returns
+    -------
+    DinoRoster
+        A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
+    set[str]
+        A set of needed dinosaur names
+    """
+    with closing(connect(database_file)) as connection:
+        if targets is None:
+            dino_rows = connection.execute("SELECT name, lvl, amount, rarity FROM dinos").fetchall()
+            recipe_rows = connection.execute("SELECT child, first, second FROM recipes").fetchall()
+            needed_dinos = set(row[0] for row in connection.execute("SELECT name FROM needed"))
+        else:
+            connection.execute("CREATE TEMP TABLE targets (name TEXT PRIMARY KEY)")
+            connection.executemany("INSERT OR IGNORE INTO targets VALUES (?)", [(target,) for target in targets])
+            tree = """
+                WITH RECURSIVE tree(name) AS (
+                    SELECT name FROM targets
+                    UNION
+                    SELECT parents.parent FROM tree JOIN (
+                        SELECT child, first AS parent FROM recipes UNION ALL SELECT child, second FROM recipes
+                    ) AS parents ON parents.child = tree.name
+                )
+            """
+            dino_rows = connection.execute(tree + "SELECT dinos.name, lvl, amount, rarity FROM dinos JOIN tree ON dinos.name = tree.name").fetchall()
+            recipe_rows = connection.execute(tree + "SELECT child, first, second FROM recipes JOIN tree ON recipes.child = tree.name").fetchall()
+            needed_dinos = set(row[0] for row in connection.execute("SELECT needed.name FROM needed JOIN targets ON needed.name = targets.name"))
+
+    current_dinos = DinoRoster((row[0], Dino(list(row))) for row in dino_rows)
+    for child, first, second in recipe_rows:
+        current_dinos.set_parents(child, (first, second))
+    return current_dinos, needed_dinos
+
+
+def save_dino_info(current_dinos: dict[str: Dino], needed_dinos: set[str], database_file: str = DATABASE_FILE,
+                   remove_missing: bool = True) -> int:
+    """
+    Saves the dinosaurs, their recipes, and the needed dinosaurs to the database in a single transaction
+    Each record is upserted on its own, and rows that haven't changed are left alone
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
+    needed_dinos : set[str]
+        A set of needed dinosaur names
+    database_file : str
+        The path of the database
+    remove_missing : bool
+        Whether to delete rows for dinosaurs that are no longer in current_dinos or needed_dinos
+        (turn this off when saving a roster that was loaded for only some targets)
+
+    Returns
+    -------
+    int
+        The number of rows that were inserted, updated, or deleted
+    """
+    with closing(connect(database_file)) as connection:
+        changes_before = connection.total_changes
+        with connection:
+            write_dino_info(connection, current_dinos, needed_dinos, remove_missing)
+        return connection.total_changes - changes_before
+
+
+def write_dino_info(connection: sqlite3.Connection, current_dinos: dict[str: Dino], needed_dinos: set[str],
+                    remove_missing: bool = True) -> None:
+    """
+    Upserts the dinosaurs, their recipes, and the needed dinosaurs as part of the connection's current transaction
+    (see save_dino_info())
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        A connection to the database
+    current_dinos : dict[str : Dino]
+        A dictionary that stores keys as names of current dinosaurs, and the values as the corresponding Dino objects
+    needed_dinos : set[str]
+        A set of needed dinosaur names
+    remove_missing : bool
+        Whether to delete rows for dinosaurs that are no longer in current_dinos or needed_dinos
+        (turn this off when writing a roster that was loaded for only some targets)
+    """
+    connection.executemany(
+        """INSERT INTO dinos (name, lvl, amount, rarity) VALUES (?, ?, ?, ?)
+           ON CONFLICT (name) DO UPDATE SET lvl = excluded.lvl, amount = excluded.amount, rarity = excluded.rarity
+           WHERE lvl != excluded.lvl OR amount != excluded.amount OR rarity != excluded.rarity""",
+        [(dino.name, dino.lvl, dino.amount, dino.rarity) for dino in current_dinos.values()])
+    connection.executemany(
+        """INSERT INTO recipes (child, first, second) VALUES (?, ?, ?)
+           ON CONFLICT (child) DO UPDATE SET first = excluded.first, second = excluded.second
+           WHERE first != excluded.first OR second != excluded.second""",
+        [(dino.name, dino.first, dino.second) for dino in current_dinos.values() if dino.is_hybrid()])
+    connection.executemany("INSERT OR IGNORE INTO needed (name) VALUES (?)", [(dino_name,) for dino_name in needed_dinos])
+
+    if remove_missing:
+        stored_dinos = set(row[0] for row in connection.execute("SELECT name FROM dinos"))
+        stored_recipes = set(row[0] for row in connection.execute("SELECT child FROM recipes"))
+        stored_needed = set(row[0] for row in connection.execute("SELECT name FROM needed"))
+        hybrids = set(dino_name for dino_name in current_dinos if current_dinos[dino_name].is_hybrid())
+        connection.executemany("DELETE FROM dinos WHERE name = ?", [(dino_name,) for dino_name in stored_dinos - set(current_dinos)])
+        connection.executemany("DELETE FROM recipes WHERE child = ?", [(dino_name,) for dino_name in stored_recipes - hybrids])
+        connection.executemany("DELETE FROM needed WHERE name = ?", [(dino_name,) for dino_name in stored_needed - needed_dinos])
+    else:
+        # The dinosaurs that were loaded are brought up to date, including any that are no longer needed
+        connection.executemany("DELETE FROM needed WHERE name = ?",
+                               [(dino_name,) for dino_name in current_dinos if dino_name not in needed_dinos])
+
+
+# HISTORY FUNCTIONS -----------------------------------------------------------------------------
+
+def iter_history_entries(database_file: str = DATABASE_FILE):
+    """
+    Reads the amount history from the database and yields each day and each recorded amount, in the same format as
+    HistorySnapshot.iter_history_entries()
+
+    Parameters
+    ----------
+    database_file : str
+        The path of the database
+
+    Yields
+    ------
+    tuple[int, str, str, int, bool]
+        The index of the day, the date, the dinosaur name, the amount, and whether the amount has been archived
+    """
+    with closing(connect(database_file)) as connection:
+        rows = connection.execute(
+            """SELECT history_days.day, history_days.date, history.name, history.amount, history.archived
+               FROM history_days LEFT JOIN history ON history.day = history_days.day
+               ORDER BY history_days.day, history.rowid""")
+        current_day = None
+        for day, date, dino_name, amount, archived in rows:
+            if day != current_day:
+                current_day = day
+                yield day, date, None, None, False
+            if dino_name is not None:
+                yield day, date, dino_name, amount, bool(archived)
+
+
+def load_history(database_file: str = DATABASE_FILE) -> tuple[list[str], HistorySnapshot.AmountHistory]:
+    """
+    Loads the amount history from the database
+
+    Parameters
+    ----------
+    database_file : str
+        The path of the database
+
+    Returns
+    -------
+    list[str]
+        The dates in the history
+    HistorySnapshot.AmountHistory
+        A mapping of dinosaur names to their amounts on each day since they first appeared
+    """
+    dates, amount_history = HistorySnapshot.fill_history(iter_history_entries(database_file))
+    return dates, HistorySnapshot.AmountHistory(*HistorySnapshot.to_matrix(dates, amount_history))
+
+
+def add_history_day(date: str, amounts: dict[str : int], database_file: str = DATABASE_FILE) -> None:
+    """
+    Adds a day of amounts to the history in a single transaction
+
+    Parameters
+    ----------
+    date : str
+        The date of the new day
+    amounts : dict[str : int]
+        A mapping of dinosaur names to the amounts recorded on that day
+    database_file : str
+        The path of the database
+    """
+    with closing(connect(database_file)) as connection, connection:
+        day = connection.execute("INSERT INTO history_days (date) VALUES (?)", (date,)).lastrowid
+        connection.executemany("INSERT INTO history (day, name, amount) VALUES (?, ?, ?)",
+                               [(day, dino_name, amount) for dino_name, amount in amounts.items()])
+
+
+def archive_dinos(dino_names: list[str], database_file: str = DATABASE_FILE) -> None:
+    """
+    Archives all of the history recorded so far for each of the given dinosaurs
+
+    Parameters
+    ----------
+    dino_names : list[str]
+        The names of the dinosaurs to archive
+    database_file : str
+        The path of the database
+    """
+    with closing(connect(database_file)) as connection, connection:
+        connection.executemany("UPDATE history SET archived = 1 WHERE name = ?", [(dino_name,) for dino_name in dino_names])
+
+
+# IMPORT FUNCTIONS ------------------------------------------------------------------------------
+
+def import_text_files(database_file: str = DATABASE_FILE, history_file: str = HistorySnapshot.HISTORY_FILE) -> None:
+    """
+    Replaces the contents of the database with the roster, recipes, needed dinosaurs, and history from the .txt files,
+    in a single transaction
+
+    Parameters
+    ----------
+    database_file : str
+        The path of the database
+    history_file : str
+        The path of the text history
+    """
+    import FileFunctions
+    current_dinos, needed_dinos = FileFunctions.read_text_dino_info()
+    days = []
+    entries = []
+    if os.path.exists(history_file):
+        for day, date, dino_name, amount, archived in HistorySnapshot.iter_history_entries(history_file):
+            if dino_name is None:
+                days.append((day, date))
+            else:
+                entries.append((day, dino_name, amount, int(archived)))
+
+    # Everything is replaced in one transaction, so a failure partway leaves the database as it was
+    with closing(connect(database_file)) as connection, connection:
+        for table in ("dinos", "recipes", "needed", "history_days", "history"):
+            connection.execute("DELETE FROM " + table)
+        write_dino_info(connection, current_dinos, needed_dinos)
+        connection.executemany("INSERT INTO history_days (day, date) VALUES (?, ?)", days)
+        connection.executemany("INSERT INTO history (day, name, amount, archived) VALUES (?, ?, ?, ?)", entries)
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Import CurrentDinos.txt, DinoRecipes.txt, DinosToGet.txt and AmountHistory.txt into an SQLite database")
+    parser.add_argument("--database", default=DATABASE_FILE, help="the database file to create or replace")
+    args = parser.parse_args()
+    import_text_files(args.database)
+    print("Imported the .txt files into " + args.database)
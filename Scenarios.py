@@ -0,0 +1,199 @@
+"""
+What-if evaluation of hypothetical DNA gains and level ups
+
+A scenario is a set of overrides (gains, new amounts, or new levels for some dinos). Each scenario is applied with
+DNAAnalytics.update_dinos(), which works out again only the needed dinos that depend on the overridden ones, and the
+overridden dinos are put back afterwards, so scenarios never affect each other or the roster. The needed dinos are always
+worked out in name order, so a scenario gives the same result in whichever worker runs it. Scenarios are spread across
+worker processes; the roster is sent to each worker once when it starts, the worker's DNAAnalytics works out the baseline
+it compares against, and each task only carries its overrides:
+
+    python Scenarios.py "+2000 TyrannosaurusRex, +500 Spinosaurus2" "+1000 Velociraptor, L21 Velociraptor"
+"""
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from Dino import Dino
+from DNAAnalytics import DNAAnalytics, ENGINES
+import FileFunctions
+
+# The analytics each worker evaluates scenarios with, and copies of the baseline results they are compared against
+_worker_state = None
+
+
+def parse_scenario(text: str, name: str = None) -> dict:
+    """
+    Parses a scenario written as comma separated overrides:
+        "+2000 TyrannosaurusRex": TyrannosaurusRex gains 2000 DNA
+        "2000 TyrannosaurusRex": TyrannosaurusRex has exactly 2000 DNA
+        "L21 TyrannosaurusRex": TyrannosaurusRex is at level 21
+
+    Parameters
+    ----------
+    text : str
+        The overrides
+    name : str
+        The name of the scenario (the text itself if None)
+
+    Returns
+    -------
+    dict
+        The scenario, with a "name" and mappings of dinosaur names to "gains", "amounts", and "levels"
+    """
+    scenario = {"name": text if name is None else name, "gains": {}, "amounts": {}, "levels": {}}
+    for override in text.split(","):
+        fields = override.split()
+        if not fields:
+            continue
+        if len(fields) != 2:
+            raise ValueError("Expected an override like '+2000 TyrannosaurusRex' but got '" + override.strip() + "'")
+        value, dino_name = fields
+        try:
+            if value.startswith("+"):
+                scenario["gains"][dino_name] = scenario["gains"].get(dino_name, 0) + int(value[1:])
+            elif value.upper().startswith("L"):
+                scenario["levels"][dino_name] = int(value[1:])
+            else:
+                scenario["amounts"][dino_name] = int(value)
+        except ValueError:
+            raise ValueError("Expected an override like '+2000 TyrannosaurusRex' but got '" + override.strip() + "'")
+    return scenario
+
+
+def _init_worker(current_dinos: dict[str: Dino], needed_dinos: set[str], engine: str) -> None:
+    """
+    Sets up a worker process with the roster and the baseline results, once per worker
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A current collection of dinosaur names mapped to their corresponding Dino objects
+    needed_dinos : set[str]
+        A set of names of dinosaurs that need to be unlocked
+    engine : str
+        The engine used to work out needed DNA
+    """
+    global _worker_state
+    analytics = DNAAnalytics(current_dinos, set(needed_dinos), engine)
+    _worker_state = (analytics, Counter(analytics.total_needed_DNA), dict(analytics.target_needed_DNA))
+
+
+def _evaluate(scenario: dict) -> dict:
+    """
+    Evaluates a single scenario against the worker's baseline
+
+    Parameters
+    ----------
+    scenario : dict
+        The scenario (see parse_scenario())
+
+    Returns
+    -------
+    dict
+        The "name" of the scenario, the change in needed DNA for each dinosaur ("total_needed_DNA_diff"), the resulting
+        "total_needed_DNA", and the needed dinosaurs that no longer need any DNA ("newly_unlockable")
+    """
+    analytics, base_total_needed_DNA, base_target_needed_DNA = _worker_state
+    updates = {}
+    for dino_name, amount in scenario.get("amounts", {}).items():
+        updates[dino_name] = (amount, None)
+    for dino_name, gain in scenario.get("gains", {}).items():
+        amount = updates.get(dino_name, (analytics.current_dinos[dino_name].get_amount(), None))[0]
+        updates[dino_name] = (amount + gain, None)
+    for dino_name, level in scenario.get("levels", {}).items():
+        updates[dino_name] = (updates.get(dino_name, (None, None))[0], level)
+
+    # Only the targets that depend on the overridden dinos are worked out again, and putting the dinos back afterwards
+    # restores the baseline for the next scenario
+    originals = {dino_name: (analytics.current_dinos[dino_name].get_amount(), analytics.current_dinos[dino_name].get_level())
+                 for dino_name in updates}
+    try:
+        analytics.update_dinos(updates)
+        total_needed_DNA = Counter(analytics.total_needed_DNA)
+        target_needed_DNA = dict(analytics.target_needed_DNA)
+    finally:
+        analytics.update_dinos(originals)
+
+    total_needed_DNA_diff = {}
+    for dino_name in set(total_needed_DNA) | set(base_total_needed_DNA):
+        change = total_needed_DNA[dino_name] - base_total_needed_DNA[dino_name]
+        if change:
+            total_needed_DNA_diff[dino_name] = change
+    newly_unlockable = sorted(dino_name for dino_name, needed_DNA in target_needed_DNA.items()
+                              if not needed_DNA and base_target_needed_DNA[dino_name])
+    return {
+        "name": scenario.get("name"),
+        "total_needed_DNA_diff": dict(sorted(total_needed_DNA_diff.items())),
+        "total_needed_DNA": total_needed_DNA,
+        "newly_unlockable": newly_unlockable,
+    }
+
+
+def evaluate_scenarios(current_dinos: dict[str: Dino], needed_dinos: set[str], scenarios: list[dict],
+                       engine: str = "recursive", max_workers: int = None) -> list[dict]:
+    """
+    Evaluates each scenario on its own copy of the working levels and amounts, and compares it against the current state
+
+    Parameters
+    ----------
+    current_dinos : dict[str : Dino]
+        A current collection of dinosaur names mapped to their corresponding Dino objects
+    needed_dinos : set[str]
+        A set of names of dinosaurs that need to be unlocked
+    scenarios : list[dict]
+        The scenarios (see parse_scenario())
+    engine : str
+        The engine used to work out needed DNA
+    max_workers : int
+        The number of worker processes (as many as there are CPUs if None, and no extra processes if 1)
+
+    Returns
+    -------
+    list[dict]
+        The results of each scenario, in the same order (see _evaluate())
+
+    Raises
+    ------
+    ValueError
+        If the engine is unknown, or a scenario names a dinosaur that isn't in the roster (checked before any worker starts)
+    """
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine " + engine + ", expected one of " + ", ".join(ENGINES))
+    for scenario in scenarios:
+        for override in ("gains", "amounts", "levels"):
+            for dino_name in scenario.get(override, {}):
+                if dino_name not in current_dinos:
+                    raise ValueError("Unknown dinosaur " + dino_name + " in scenario " + str(scenario.get("name")))
+    initargs = (current_dinos, needed_dinos, engine)
+    if max_workers == 1 or len(scenarios) <= 1:
+        _init_worker(*initargs)
+        return [_evaluate(scenario) for scenario in scenarios]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as executor:
+        return list(executor.map(_evaluate, scenarios))
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Compare hypothetical DNA gains and level ups against the current state")
+    parser.add_argument("scenarios", nargs="+", help="scenarios such as \"+2000 TyrannosaurusRex, +500 Spinosaurus2\" (use 'L21 name' for a level)")
+    parser.add_argument("--engine", choices=ENGINES, default="recursive", help="the engine used to work out needed DNA")
+    parser.add_argument("--workers", type=int, default=None, help="the number of worker processes")
+    parser.add_argument("--targets", nargs="+", help="compare only these needed dinosaurs, loading only their recipe trees")
+    args = parser.parse_args()
+
+    current_dinos, needed_dinos = FileFunctions.create_dino_info(set(args.targets) if args.targets else None)
+    if args.targets and set(args.targets) - needed_dinos:
+        parser.exit(1, "Not needed dinosaurs: " + ", ".join(sorted(set(args.targets) - needed_dinos)) + "\n")
+    try:
+        scenarios = [parse_scenario(text) for text in args.scenarios]
+        results = evaluate_scenarios(current_dinos, needed_dinos, scenarios, args.engine, args.workers)
+    except ValueError as error:
+        parser.exit(1, str(error) + "\n")
+    for result in results:
+        print(result["name"])
+        for dino_name, change in result["total_needed_DNA_diff"].items():
+            print("    " + dino_name + ": " + ("+" if change > 0 else "") + str(change))
+        if result["newly_unlockable"]:
+            print("    Unlockable: " + ", ".join(result["newly_unlockable"]))
+        print()
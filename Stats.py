@@ -0,0 +1,161 @@
+"""
+Optional instrumentation for finding out which phase of a run is slow
+
+Instrumentation is off by default. While it is off, phase() hands back a shared no-op context manager and the counting
+functions return straight away, so instrumented code pays for little more than a function call. Hot loops check the
+enabled flag themselves before counting. Turn it on with enable() (or the --profile flag of DNAAnalytics.py and main.py),
+then read the results with get_stats() or format_stats().
+"""
+import contextlib
+import time
+from collections import Counter, defaultdict
+
+enabled = False
+
+# The total time and number of runs of each phase, the value of each counter, and the hits and misses of each cache
+phase_times = defaultdict(float)
+phase_calls = Counter()
+counters = Counter()
+cache_hits = Counter()
+cache_misses = Counter()
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+class _Phase:
+    """
+    A context manager that adds the time spent inside it to a phase
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        phase_times[self.name] += time.perf_counter() - self.start
+        phase_calls[self.name] += 1
+
+
+def enable() -> None:
+    """
+    Turns instrumentation on
+    """
+    global enabled
+    enabled = True
+
+
+def disable() -> None:
+    """
+    Turns instrumentation off, keeping anything recorded so far
+    """
+    global enabled
+    enabled = False
+
+
+def reset() -> None:
+    """
+    Clears everything recorded so far
+    """
+    phase_times.clear()
+    phase_calls.clear()
+    counters.clear()
+    cache_hits.clear()
+    cache_misses.clear()
+
+
+def phase(name: str):
+    """
+    Returns a context manager that times the code inside it as part of a phase (a no-op when instrumentation is off)
+
+    Parameters
+    ----------
+    name : str
+        The name of the phase
+
+    Returns
+    -------
+    context manager
+        The context manager to wrap the phase in
+    """
+    return _Phase(name) if enabled else _NO_PHASE
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Adds to a counter, such as the calls to a recursive function or the nodes it visited
+
+    Parameters
+    ----------
+    name : str
+        The name of the counter
+    amount : int
+        The amount to add
+    """
+    if enabled:
+        counters[name] += amount
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Records a hit or a miss for a cache
+
+    Parameters
+    ----------
+    cache : str
+        The name of the cache
+    hit : bool
+        Whether the lookup was a hit
+    """
+    if enabled:
+        if hit:
+            cache_hits[cache] += 1
+        else:
+            cache_misses[cache] += 1
+
+
+def get_stats() -> dict:
+    """
+    Returns everything recorded so far as a structured dictionary
+
+    Returns
+    -------
+    dict
+        "phases": a mapping of phase names to their total "seconds" and number of "calls"
+        "counters": a mapping of counter names to their values
+        "caches": a mapping of cache names to their "hits", "misses", and "hit_rate"
+    """
+    caches = {}
+    for cache in sorted(set(cache_hits) | set(cache_misses)):
+        lookups = cache_hits[cache] + cache_misses[cache]
+        caches[cache] = {"hits": cache_hits[cache], "misses": cache_misses[cache], "hit_rate": cache_hits[cache]/lookups}
+    return {
+        "phases": {name: {"seconds": phase_times[name], "calls": phase_calls[name]} for name in sorted(phase_calls)},
+        "counters": dict(sorted(counters.items())),
+        "caches": caches,
+    }
+
+
+def format_stats() -> str:
+    """
+    Returns everything recorded so far as a readable report
+
+    Returns
+    -------
+    str
+        The report
+    """
+    stats = get_stats()
+    lines = ["Phases:"]
+    for name, phase_stats in stats["phases"].items():
+        lines.append("    " + name + ": " + format(phase_stats["seconds"]*1000, ".2f") + " ms over " + str(phase_stats["calls"]) + " run(s)")
+    lines.append("Counters:")
+    for name, value in stats["counters"].items():
+        lines.append("    " + name + ": " + str(value))
+    lines.append("Caches:")
+    for name, cache_stats in stats["caches"].items():
+        lines.append("    " + name + ": " + format(cache_stats["hit_rate"], ".1%") + " hits (" + str(cache_stats["hits"]) + " of " +
+                     str(cache_stats["hits"] + cache_stats["misses"]) + ")")
+    return '\n'.join(lines)
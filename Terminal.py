@@ -0,0 +1,53 @@
+"""
+Terminal helpers shared by the interactive menus
+
+Screens are cleared with ANSI escape sequences written straight to stdout instead of starting a shell for 'cls'/'clear'.
+When stdout isn't a terminal (for example when output is piped to a file), clearing just separates screens with a blank line.
+"""
+import os
+import sys
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Whether ANSI escape sequences can be used, worked out the first time the screen is cleared
+_ansi_supported = None
+
+
+def _enable_ansi() -> bool:
+    """
+    Returns whether stdout is a terminal that understands ANSI escape sequences
+    On Windows, this turns on escape sequence processing for the console if it isn't on already
+
+    Returns
+    -------
+    bool
+        Whether ANSI escape sequences can be written to stdout
+    """
+    if not sys.stdout.isatty():
+        return False
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
+
+
+def clear_screen() -> None:
+    """
+    Clears the terminal and moves the cursor to the top left corner, or prints a blank line if stdout isn't a terminal
+    """
+    global _ansi_supported
+    if _ansi_supported is None:
+        _ansi_supported = _enable_ansi()
+    if _ansi_supported:
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+    else:
+        print()
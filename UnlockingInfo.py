@@ -1,7 +1,9 @@
-import os
+import Terminal
 from Dino import Dino
+from DinoRoster import DinoRoster
 from HistoryPlotting import HistoryPlotting
 import FileFunctions
+import Stats
 
 class UnlockingInfo:
     """
@@ -10,15 +12,15 @@ class UnlockingInfo:
 
     Attributes
     ----------
-    current_dinos : dict[str : Dino]
-        A current collection of dinosaur names mapped to their corresponding Dino objects
+    current_dinos : DinoRoster
+        A current collection of dinosaur names mapped to their corresponding Dino objects, indexed by parent
     needed_dinos : set[str]
         A set of names of dinosaurs that need to be unlocked
     """
     
-    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str]) -> None:
+    def __init__(self, c_dinos: dict[str: Dino], n_dinos: set[str], unlocked_dinos: set[str] = None) -> None:
         """
-        Initializes class variables and runs the user input process
+        Initializes class variables and runs the user input process, or removes the given unlocked dinos without any prompts
 
         Parameters
         ----------
@@ -26,55 +28,117 @@ class UnlockingInfo:
             A current collection of dinosaur names mapped to their corresponding Dino objects
         n_dinos : set[str]
             A set of names of dinosaurs that need to be unlocked
+        unlocked_dinos : set[str]
+            A set of names of dinosaurs that have been unlocked
         history : HistoryPlotting
             A class instantiation to keep track of amount history
         """
-        self.current_dinos = c_dinos
+        self.current_dinos = c_dinos if isinstance(c_dinos, DinoRoster) else DinoRoster(c_dinos)
         self.needed_dinos = n_dinos
         self.history = HistoryPlotting()
 
-        self.ask_for_unlocked()
+        if unlocked_dinos is None:
+            self.ask_for_unlocked()
+        else:
+            self.unlock_dinos(unlocked_dinos)
 
     def ask_for_unlocked(self) -> None:
         """
-        Prompts the user to input dinos that have been unlocked and starts the removal process
+        Prompts the user to input dinos that have been unlocked, then removes all of them at once
+        The dinos entered so far are still removed if the prompts are interrupted
         """
-        while True:
-            wanted_input = input('What dinosaur have you unlocked? (Type \'quit\' to quit): ')
-            if (wanted_input == 'quit'):
-                break
-            print()
-            self.clear_dino(wanted_input)
-            self.needed_dinos.remove(wanted_input)
-            os.system('cls')
+        unlocked_dinos = set()
+        try:
+            while True:
+                wanted_input = input('What dinosaur have you unlocked? (Type \'quit\' to quit): ')
+                if (wanted_input == 'quit'):
+                    break
+                print()
+                if wanted_input not in self.needed_dinos:
+                    print(wanted_input + ' is not a needed dinosaur, so nothing was unlocked.')
+                    print()
+                    continue
+                unlocked_dinos.add(wanted_input)
+                Terminal.clear_screen()
+        finally:
+            self.unlock_dinos(unlocked_dinos)
+
+    def unlock_dinos(self, unlocked_dinos: set[str]) -> list[str]:
+        """
+        Marks dinosaurs as unlocked, clearing them and any dinosaurs no longer needed from the database
+
+        Parameters
+        ----------
+        unlocked_dinos : set[str]
+            The names of the recently unlocked dinos
+
+        Returns
+        -------
+        list[str]
+            The names of the dinosaurs that were cleared
+
+        Raises
+        ------
+        KeyError
+            If any of the dinos isn't a needed dinosaur, in which case nothing is cleared
+        """
+        unknown_dinos = set(unlocked_dinos) - self.needed_dinos
+        if unknown_dinos:
+            raise KeyError(', '.join(sorted(unknown_dinos)))
+        cleared_dinos = self.clear_dinos(unlocked_dinos)
+        self.needed_dinos.difference_update(unlocked_dinos)
+        return cleared_dinos
 
     def clear_dino(self, unlocked_dino: str) -> None:
         """
         Takes the name of a recently unlocked dinosaur and clears it from the database if it is no longer used for any other dinosaur.
-        This process is then recursively repeated with any dinos that are part of the first dinosaur's tree
+        This process is then repeated with any dinos that are part of the first dinosaur's tree
 
         Parameters
         ----------
         unlocked_dino : str
             The name of the recently unlocked dino
         """
-        has_other_child = False
-        for dino_name in self.current_dinos:
-            dino = self.current_dinos[dino_name]
-            if dino.is_hybrid():
-                if unlocked_dino in dino.get_parents():
-                    has_other_child = True
-        
-        if not has_other_child:
-            self.history.archive_dino(unlocked_dino)
-            first = None
-            if self.current_dinos[unlocked_dino].is_hybrid():
-                first, second = self.current_dinos[unlocked_dino].get_parents()
-
-            self.current_dinos.pop(unlocked_dino)
-            if first:
-                self.clear_dino(first)
-                self.clear_dino(second)
+        self.clear_dinos({unlocked_dino})
+
+    def clear_dinos(self, unlocked_dinos: set[str]) -> list[str]:
+        """
+        Takes the names of recently unlocked dinosaurs and clears every dinosaur that is no longer used for any other dinosaur from the database
+        Each dinosaur keeps a count of the hybrids still using it, and once that count reaches 0 it is cleared and its parents' counts go down,
+        so the whole batch takes a single pass over the affected trees and a single write to the history archive
+
+        Parameters
+        ----------
+        unlocked_dinos : set[str]
+            The names of the recently unlocked dinos
+
+        Returns
+        -------
+        list[str]
+            The names of the dinosaurs that were cleared, in the order they were cleared
+        """
+        with Stats.phase("clear_dinos"):
+            child_counts = {}
+            to_clear = [dino_name for dino_name in sorted(unlocked_dinos)
+                        if dino_name in self.current_dinos and not self.current_dinos.has_children(dino_name)]
+            cleared_dinos = []
+            while to_clear:
+                dino_name = to_clear.pop()
+                cleared_dinos.append(dino_name)
+                dino = self.current_dinos[dino_name]
+                if dino.is_hybrid():
+                    for parent in set(dino.get_parents()):
+                        if parent not in child_counts:
+                            child_counts[parent] = len(self.current_dinos.get_children(parent))
+                        child_counts[parent] -= 1
+                        if not child_counts[parent]:
+                            to_clear.append(parent)
+
+            for dino_name in cleared_dinos:
+                self.current_dinos.pop(dino_name)
+            self.history.archive_dinos(cleared_dinos)
+        Stats.count("clear_dinos.cleared", len(cleared_dinos))
+        return cleared_dinos
 
     def get_all_dino_info(self) -> tuple[dict[str: Dino], set[str]]:
         """
@@ -1,4 +1,4 @@
-import os
+import Terminal
 from Dino import Dino
 import FileFunctions
 
@@ -13,11 +13,13 @@ class UpdatingInfo:
         A current collection of dinosaur names mapped to their corresponding Dino objects
     needed_dinos : set[str]
         A set of names of dinosaurs that need to be unlocked
+    unknown_dinos : list[str]
+        The names in the last batch of updates that didn't match a current dinosaur
     """
     
-    def __init__(self, c_dinos, n_dinos) -> None:
+    def __init__(self, c_dinos, n_dinos, update_file: str = None) -> None:
         """
-        Initializes class variables and runs the user input process
+        Initializes class variables and runs the user input process, or applies the updates in update_file without any prompts
 
         Parameters
         ----------
@@ -25,12 +27,19 @@ class UpdatingInfo:
             A current collection of dinosaur names mapped to their corresponding Dino objects
         n_dinos : set[str]
             A set of names of dinosaurs that need to be unlocked
+        update_file : str
+            A CSV, JSON, or JSON Lines file of "name, amount[, level]" rows to apply instead of asking the user
+            (see FileFunctions.iter_update_records)
         """
 
         self.current_dinos = c_dinos
         self.needed_dinos = n_dinos
+        self.unknown_dinos = []
 
-        self.update_dinos()
+        if update_file is None:
+            self.update_dinos()
+        else:
+            self.update_dinos_from_file(update_file)
 
     def generate_sorted_dinos_list(self) -> list[str]:
         """
@@ -76,14 +85,14 @@ class UpdatingInfo:
             current_dino = self.current_dinos[current_name]
 
             # Display the next dinosaur
-            os.system('cls')
+            Terminal.clear_screen()
             user_input = input(current_name + '\nLevel: ' + str(current_dino.get_level()) + '\nAmount: ' + str(current_dino.get_amount()) + '\n')
 
             # Check info
             if user_input == '': # All correct information
                 sorted_dinos.pop()
             elif user_input == 'c': # Correct dinosaur, but incorrect information
-                os.system('cls')
+                Terminal.clear_screen()
                 user_input = input('Enter the correct amount for ' + current_name + ', and the level if it has changed.\nAmount: ').split(' ')
                 amount = int(user_input[0])
                 level = current_dino.get_level() if len(user_input) == 1 else int(user_input[1])
@@ -92,19 +101,63 @@ class UpdatingInfo:
                 self.current_dinos[current_name].set_level(level)
                 self.current_dinos[current_name].set_amount(amount)
             elif user_input == 'w': # Wrong dinosaur
-                os.system('cls')
+                Terminal.clear_screen()
                 actual_name = input('Enter the name of the dino that should be next.\nName: ')
-                os.system('cls')
+                Terminal.clear_screen()
                 level = int(input('Enter the correct level for ' + actual_name + '.\nLevel: '))
-                os.system('cls')
+                Terminal.clear_screen()
                 amount = int(input('Enter the correct amount for ' + actual_name + '.\nAmount: '))
 
-                if actual_name in self.needed_dinos and level > self.current_dinos[actual_name].activation_level():
-                    self.needed_dinos.remove(actual_name)
-
                 sorted_dinos.remove(actual_name)
-                self.current_dinos[actual_name].set_level(level)
-                self.current_dinos[actual_name].set_amount(amount)
+                self.apply_update(actual_name, amount, level)
+
+    def apply_update(self, dino_name: str, amount: int, level: int = None) -> None:
+        """
+        Sets the amount, and the level if given, of a dinosaur, and removes it from the needed dinosaurs if the new level unlocks it
+
+        Parameters
+        ----------
+        dino_name : str
+            The name of the dinosaur to update
+        amount : int
+            The new amount of DNA
+        level : int
+            The new level, or None to keep the current level
+        """
+        dino = self.current_dinos[dino_name]
+        if level is not None:
+            if dino_name in self.needed_dinos and level > dino.activation_level():
+                self.needed_dinos.remove(dino_name)
+            dino.set_level(level)
+        dino.set_amount(amount)
+
+    def update_dinos_from_file(self, update_file: str) -> int:
+        """
+        Applies every update in a CSV, JSON, or JSON Lines file in one pass, and reports any names that don't match a current dinosaur
+
+        Parameters
+        ----------
+        update_file : str
+            The file of "name, amount[, level]" rows to apply
+
+        Returns
+        -------
+        int
+            The number of dinosaurs that were updated
+        """
+        updated_count = 0
+        self.unknown_dinos = []
+        for row_number, dino_name, amount, level in FileFunctions.iter_update_records(update_file):
+            if dino_name not in self.current_dinos:
+                self.unknown_dinos.append(dino_name)
+                continue
+            self.apply_update(dino_name, amount, level)
+            updated_count += 1
+
+        print('Updated ' + str(updated_count) + ' dinos from ' + update_file + '.')
+        if self.unknown_dinos:
+            print('Unknown dinos (not updated): ' + ', '.join(self.unknown_dinos))
+        return updated_count
 
     def get_all_dino_info(self) -> tuple[dict[str: Dino], set[str]]:
         """
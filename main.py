@@ -1,20 +1,61 @@
+import argparse
 import FileFunctions
+import Stats
 from GettingInfo import GettingInfo
 from UnlockingInfo import UnlockingInfo
 from UpdatingInfo import UpdatingInfo
 
-try:
-    current_dinos, needed_dinos = FileFunctions.create_dino_info()
 
-    getting_info = GettingInfo(current_dinos, needed_dinos)
-    current_dinos, needed_dinos = getting_info.get_all_dino_info()
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Returns the parser for the command line arguments of main.py
 
-    unlocking_info = UnlockingInfo(current_dinos, needed_dinos)
-    current_dinos, needed_dinos = unlocking_info.get_all_dino_info()
+    Returns
+    -------
+    argparse.ArgumentParser
+        The argument parser
+    """
+    parser = argparse.ArgumentParser(description="Get, unlock, and update dinosaurs")
+    parser.add_argument("--recipes", help="import the recipes in this file (formatted like DinoRecipes.txt) without any prompts, then save")
+    parser.add_argument("--stats", help="import the dinosaurs in this file (formatted like CurrentDinos.txt) without any prompts, then save")
+    parser.add_argument("--updates", help="apply the amounts and levels in this CSV, JSON, or JSON Lines file without any prompts, then save")
+    parser.add_argument("--profile", action="store_true", help="print timings, call counts, and cache hit rates before exiting")
+    return parser
 
-    updating_info = UpdatingInfo(current_dinos, needed_dinos)
-    current_dinos, needed_dinos = updating_info.get_all_dino_info()
 
-    FileFunctions.save_dino_info(current_dinos, needed_dinos)
-except:
-    FileFunctions.save_dino_info(current_dinos, needed_dinos)
\ No newline at end of file
+if __name__=='__main__':
+    args = build_parser().parse_args()
+    if args.profile:
+        Stats.enable()
+
+    if args.recipes or args.stats or args.updates:
+        current_dinos, needed_dinos = FileFunctions.create_dino_info()
+
+        if args.recipes or args.stats:
+            getting_info = GettingInfo(current_dinos, needed_dinos, args.recipes, args.stats)
+            current_dinos, needed_dinos = getting_info.get_all_dino_info()
+
+        if args.updates:
+            updating_info = UpdatingInfo(current_dinos, needed_dinos, args.updates)
+            current_dinos, needed_dinos = updating_info.get_all_dino_info()
+
+        FileFunctions.save_dino_info(current_dinos, needed_dinos)
+    else:
+        try:
+            current_dinos, needed_dinos = FileFunctions.create_dino_info()
+
+            getting_info = GettingInfo(current_dinos, needed_dinos)
+            current_dinos, needed_dinos = getting_info.get_all_dino_info()
+
+            unlocking_info = UnlockingInfo(current_dinos, needed_dinos)
+            current_dinos, needed_dinos = unlocking_info.get_all_dino_info()
+
+            updating_info = UpdatingInfo(current_dinos, needed_dinos)
+            current_dinos, needed_dinos = updating_info.get_all_dino_info()
+
+            FileFunctions.save_dino_info(current_dinos, needed_dinos)
+        except:
+            FileFunctions.save_dino_info(current_dinos, needed_dinos)
+
+    if args.profile:
+        print(Stats.format_stats())
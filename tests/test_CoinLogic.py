@@ -0,0 +1,36 @@
+import pytest
+
+import CoinLogic
+import LevelCosts
+from Dino import Dino
+
+
+def test_coins_stop_at_the_last_known_level():
+    legendary = Dino(["ZqLegendary", 20, 0, "L"])
+    assert CoinLogic.coins_between_levels(legendary, 24, CoinLogic.MAX_COIN_LEVEL) == CoinLogic.LEVELING_COST[CoinLogic.MAX_COIN_LEVEL]
+    assert not CoinLogic.has_unknown_coin_cost(legendary, 24, CoinLogic.MAX_COIN_LEVEL)
+
+    # The levels above the table are left out and reported, up to the level cap
+    assert CoinLogic.coins_between_levels(legendary, 24, LevelCosts.MAX_LEVEL) == CoinLogic.LEVELING_COST[CoinLogic.MAX_COIN_LEVEL]
+    assert CoinLogic.coins_between_levels(legendary, 27, 30) == 0
+    assert CoinLogic.has_unknown_coin_cost(legendary, 24, CoinLogic.MAX_COIN_LEVEL+1)
+    with pytest.raises(ValueError):
+        CoinLogic.coins_between_levels(legendary, 24, LevelCosts.MAX_LEVEL+1)
+
+
+def test_unlocking_past_the_last_known_level_is_free_and_not_reported():
+    apex = Dino(["ZqApex", 25, 0, "A"])
+    assert apex.activation_level() == CoinLogic.MAX_COIN_LEVEL
+    assert CoinLogic.coins_between_levels(apex, 25, 26) == 0
+    assert not CoinLogic.has_unknown_coin_cost(apex, 25, 26)
+
+
+def test_coin_totals_report_dinos_leveled_past_the_last_known_level():
+    current_dinos = {"ZqFirst": Dino(["ZqFirst", 24, 10**6, "L"]), "ZqSecond": Dino(["ZqSecond", 26, 10**6, "L"]),
+                     "ZqHybrid": Dino(["ZqHybrid", 25, 0, "A", "ZqFirst", "ZqSecond"])}
+    coin_logic = CoinLogic.CoinLogic(current_dinos, {"ZqHybrid"})
+    assert coin_logic.get_coin_totals()["ZqHybrid"] > 0
+    assert coin_logic.unknown_cost_dinos == set()
+
+    assert coin_logic.get_unlock_cost("ZqFirst", 27) == CoinLogic.LEVELING_COST[CoinLogic.MAX_COIN_LEVEL]
+    assert coin_logic.unknown_cost_dinos == {"ZqFirst"}
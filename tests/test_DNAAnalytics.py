@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import FileFunctions
+from DNAAnalytics import DNAAnalytics, ENGINES
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    monkeypatch.setattr(FileFunctions, "STORAGE_BACKEND", "text")
+    return FileFunctions.create_dino_info()
+
+
+def assert_same_results(analytics, fresh):
+    assert analytics.total_needed_DNA == fresh.total_needed_DNA
+    assert analytics.target_needed_DNA == fresh.target_needed_DNA
+    assert analytics.print_tags() == fresh.print_tags()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_incremental_updates_match_a_fresh_analytics(roster, engine):
+    current_dinos, needed_dinos = roster
+    analytics = DNAAnalytics(current_dinos, set(needed_dinos), engine)
+
+    # A root shared by many targets, a hybrid partway up a tree, and a level change
+    analytics.update_dino("Velociraptor", amount=current_dinos["Velociraptor"].get_amount() + 50000)
+    hybrid = next(dino_name for dino_name in sorted(needed_dinos)
+                  if current_dinos[dino_name].is_hybrid() and current_dinos[current_dinos[dino_name].first].is_hybrid())
+    parent = current_dinos[hybrid].first
+    analytics.update_dinos({parent: (current_dinos[parent].get_amount() + 3000, current_dinos[parent].get_level() + 1)})
+    assert_same_results(analytics, DNAAnalytics(current_dinos, set(needed_dinos), engine))
+
+    analytics.unlock_dino(hybrid)
+    assert_same_results(analytics, DNAAnalytics(current_dinos, set(needed_dinos) - {hybrid}, engine))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_wavefront_engine_matches_the_recursive_engine(tmp_path, monkeypatch, seed):
+    import Benchmarks
+    Benchmarks.generate_dataset(str(tmp_path), 500, 1, seed)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FileFunctions, "STORAGE_BACKEND", "text")
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+
+    recursive = DNAAnalytics(current_dinos, set(needed_dinos), "recursive")
+    wavefront = DNAAnalytics(current_dinos, set(needed_dinos), "wavefront")
+    assert_same_results(wavefront, recursive)
+    assert wavefront.updated_levels == recursive.updated_levels
+    assert wavefront.updated_amounts == recursive.updated_amounts
+
+
+def test_wavefront_engine_matches_the_recursive_engine_on_the_roster(roster):
+    current_dinos, needed_dinos = roster
+    recursive = DNAAnalytics(current_dinos, set(needed_dinos), "recursive")
+    wavefront = DNAAnalytics(current_dinos, set(needed_dinos), "wavefront")
+    assert_same_results(wavefront, recursive)
+    assert wavefront.updated_levels == recursive.updated_levels
+    assert wavefront.updated_amounts == recursive.updated_amounts
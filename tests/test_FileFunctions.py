@@ -0,0 +1,115 @@
+import os
+import shutil
+
+import pytest
+
+import FileFunctions
+
+ROSTER_FILES = (FileFunctions.CURRENT_DINOS_FILE, FileFunctions.RECIPES_FILE, FileFunctions.NEEDED_DINOS_FILE)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def roster_dir(tmp_path, monkeypatch):
+    for file_name in ROSTER_FILES:
+        shutil.copy(os.path.join(REPO_DIR, file_name), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FileFunctions, "STORAGE_BACKEND", "text")
+    monkeypatch.setattr(FileFunctions, "saved_files", {})
+    # Save once so every file is in the order save_dino_info writes it
+    FileFunctions.save_dino_info(*FileFunctions.create_dino_info())
+    FileFunctions.saved_files.clear()
+    return tmp_path
+
+
+def read_files() -> dict[str : bytes]:
+    contents = {}
+    for file_name in ROSTER_FILES:
+        with open(file_name, "rb") as file_reader:
+            contents[file_name] = file_reader.read()
+    return contents
+
+
+@pytest.mark.parametrize("trailing_newline", [False, True])
+def test_unchanged_load_then_save_writes_nothing(roster_dir, trailing_newline):
+    if trailing_newline:
+        for file_name in ROSTER_FILES:
+            with open(file_name, "a") as file_writer:
+                file_writer.write("\n")
+    before = read_files()
+    inodes = {file_name: os.stat(file_name).st_ino for file_name in ROSTER_FILES}
+
+    assert FileFunctions.save_dino_info(*FileFunctions.create_dino_info()) == 0
+    assert read_files() == before
+    assert {file_name: os.stat(file_name).st_ino for file_name in ROSTER_FILES} == inodes
+
+
+def test_save_without_load_writes_nothing(roster_dir):
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+    FileFunctions.saved_files.clear()
+    before = read_files()
+
+    assert FileFunctions.save_dino_info(current_dinos, needed_dinos) == 0
+    assert read_files() == before
+
+
+def test_save_reads_each_file_at_most_once(roster_dir, monkeypatch):
+    read_file_names = []
+    read_lines = FileFunctions.read_lines
+    monkeypatch.setattr(FileFunctions, "read_lines", lambda file_name: read_file_names.append(file_name) or read_lines(file_name))
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+    current_dinos[sorted(current_dinos)[0]].amount += 1
+
+    # The lines kept from the load are compared against, so nothing is read again
+    assert FileFunctions.save_dino_info(current_dinos, needed_dinos) == 1
+    assert read_file_names == []
+
+    FileFunctions.saved_files.clear()
+    assert FileFunctions.save_dino_info(current_dinos, needed_dinos) == 0
+    assert sorted(read_file_names) == sorted(ROSTER_FILES)
+
+
+def test_files_are_told_apart_by_directory(roster_dir, tmp_path_factory, monkeypatch):
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+    other_dir = tmp_path_factory.mktemp("other")
+    for file_name in ROSTER_FILES:
+        shutil.copy(file_name, other_dir)
+    with open(other_dir / FileFunctions.CURRENT_DINOS_FILE, "a") as file_writer:
+        file_writer.write("\nZqExtra 1 0 C")
+    monkeypatch.chdir(other_dir)
+
+    # The file names match the ones loaded from the first directory, but this directory's roster has an extra record
+    assert FileFunctions.save_dino_info(current_dinos, needed_dinos) == 1
+
+
+def test_changed_record_is_written(roster_dir):
+    current_dinos, needed_dinos = FileFunctions.create_dino_info()
+    dino = current_dinos[sorted(current_dinos)[0]]
+    dino.amount += 1
+
+    assert FileFunctions.save_dino_info(current_dinos, needed_dinos) == 1
+    assert FileFunctions.create_dino_info()[0][dino.name].amount == dino.amount
+
+
+@pytest.mark.parametrize("backend", ["text", "sqlite"])
+def test_partial_roster_saves_only_its_trees(roster_dir, monkeypatch, backend):
+    if backend == "sqlite":
+        import SQLiteStorage
+        SQLiteStorage.import_text_files()
+        monkeypatch.setattr(FileFunctions, "STORAGE_BACKEND", "sqlite")
+    all_dinos, all_needed_dinos = FileFunctions.create_dino_info()
+    target = sorted(dino_name for dino_name in all_needed_dinos if all_dinos[dino_name].is_hybrid())[0]
+
+    current_dinos, needed_dinos = FileFunctions.create_dino_info({target})
+    assert needed_dinos == {target}
+    assert target in current_dinos and set(all_dinos[target].get_parents()) <= set(current_dinos)
+    assert len(current_dinos) < len(all_dinos)
+    parent = current_dinos[current_dinos[target].first]
+    parent.amount += 1
+    needed_dinos.discard(target)
+    FileFunctions.save_dino_info(current_dinos, needed_dinos, remove_missing=False)
+
+    saved_dinos, saved_needed_dinos = FileFunctions.create_dino_info()
+    assert set(saved_dinos) == set(all_dinos)
+    assert saved_needed_dinos == all_needed_dinos - {target}
+    assert saved_dinos[parent.name].amount == parent.amount
@@ -0,0 +1,38 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import Benchmarks
+import FileFunctions
+import Forecasting
+from HistoryPlotting import HistoryPlotting
+
+
+@pytest.mark.parametrize("added_days", [0, 3, 80])
+def test_windowed_fit_matches_the_full_history(tmp_path, monkeypatch, added_days):
+    Benchmarks.generate_dataset(str(tmp_path), 300, 200, 1)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FileFunctions, "STORAGE_BACKEND", "text")
+    history = HistoryPlotting()
+    names = sorted(history.amount_history)[:50] + ["NotInTheHistory"]
+    last_date = datetime.datetime.strptime(history.dates[-1], Forecasting.DATE_FORMAT).date()
+    for day in range(added_days):
+        history.dates.append((last_date + datetime.timedelta(days=day+1)).strftime(Forecasting.DATE_FORMAT))
+        for dino_name in names[::5]:
+            history.amount_history.append(dino_name, 1000 - day)
+
+    day_numbers = Forecasting.get_day_numbers(history.dates)
+    full_amounts, full_first_days = Forecasting.get_history_matrix(history.amount_history, names, len(history.dates))
+    for window in (1, 10, Forecasting.FORECAST_WINDOW, 100000):
+        start = Forecasting.get_window_start(day_numbers, window)
+        amounts, first_days = Forecasting.get_history_matrix(history.amount_history, names, len(history.dates), start)
+        assert np.array_equal(amounts, full_amounts[:, start:])
+        assert np.array_equal(first_days, full_first_days)
+        assert np.array_equal(Forecasting.fit_rates(amounts, first_days, day_numbers, window),
+                              Forecasting.fit_rates(full_amounts, full_first_days, day_numbers, window), equal_nan=True)
+
+
+def test_projected_date_counts_from_the_last_day_in_the_history():
+    assert Forecasting.get_projected_date(2.5, "12/30/2020") == "01/02/2021"
+    assert Forecasting.get_projected_date(float("inf"), "12/30/2020") is None
@@ -0,0 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_in_fresh_interpreter(modules: list[str]) -> list[str]:
+    code = "import json, sys; import " + ", ".join(modules) + "; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def test_startup_does_not_load_matplotlib():
+    for module in ("HistoryPlotting", "main"):
+        loaded = import_in_fresh_interpreter([module])
+        assert not [name for name in loaded if name.split(".")[0] == "matplotlib"], module + " loads matplotlib on import"
+
+
+def test_main_parser_builds():
+    import main
+    args = main.build_parser().parse_args(["--stats", "stats.txt", "--profile"])
+    assert args.stats == "stats.txt" and args.profile